@@ -0,0 +1,108 @@
+from collections import namedtuple
+
+import numpy as np
+
+from rumor_spreading_simulator.engine.numpy_kernel import NOT_ARRIVED
+
+# Distance of a cell from the origin by its row and col distances
+DISTANCE_METRICS = {
+    'chebyshev': np.maximum,        # rings of friends, the front moves at most one ring per generation
+    'euclidean': np.hypot,
+}
+
+ReachedCluster = namedtuple(
+    "ReachedCluster",
+    [
+        "size",             # persons the rumor reached
+        "spans_rows",       # reached persons on the first and the last rows (percolates top to bottom)
+        "spans_cols",       # reached persons on the first and the last cols (percolates left to right)
+    ]
+)
+
+
+def arrival_origin(arrival_times):
+    """
+    Cell of the first person to spread the rumor (arrived at generation 0).
+
+    :param arrival_times: arrival times plane of a simulator (see arrival_times)
+    :type arrival_times: numpy.ndarray
+    :rtype: tuple
+    """
+    return tuple(int(index[0]) for index in np.nonzero(arrival_times == 0))
+
+
+def front_radius(arrival_times, generations=None, metric='chebyshev', wrap=False):
+    """
+    Radius of the spread front at every generation: the largest distance from the origin of a person reached by then.
+
+    :param arrival_times: arrival times plane of a grid world
+    :type arrival_times: numpy.ndarray
+    :param generations: last generation (the last arrival by default)
+    :type generations: int
+    :param metric: one of DISTANCE_METRICS
+    :type metric: str
+    :param wrap: distances wrap around the board edges (torus worlds)
+    :type wrap: bool
+    :returns: radius by generation, 0 to generations
+    :rtype: numpy.ndarray
+    """
+    if generations is None:
+        generations = int(arrival_times.max())
+
+    reached = (arrival_times != NOT_ARRIVED) & (arrival_times <= generations)
+    rows, cols = np.nonzero(reached)
+    origin_row, origin_col = arrival_origin(arrival_times)
+    row_distances, col_distances = np.abs(rows - origin_row), np.abs(cols - origin_col)
+    if wrap:
+        row_distances = np.minimum(row_distances, arrival_times.shape[0] - row_distances)
+        col_distances = np.minimum(col_distances, arrival_times.shape[1] - col_distances)
+
+    radius = np.zeros(generations + 1)
+    np.maximum.at(radius, arrival_times[rows, cols], DISTANCE_METRICS[metric](row_distances, col_distances))
+    return np.maximum.accumulate(radius)
+
+
+def spread_velocity(radius):
+    """
+    Mean speed of the spread front (cells per generation), the least squares slope of the radius while it grows.
+
+    The speed of every generation is np.diff(radius).
+
+    :param radius: front radius by generation (see front_radius)
+    :type radius: numpy.ndarray
+    :rtype: float
+    """
+    growing = np.flatnonzero(np.diff(radius))
+    if not len(growing):
+        return 0.0
+
+    last_growth = growing[-1] + 1
+    slope, _ = np.polyfit(np.arange(last_growth + 1), radius[:last_growth + 1], 1)
+    return float(slope)
+
+
+def reached_cluster(arrival_times, generation=None):
+    """
+    Cluster of the persons the rumor reached (by a generation), connected through friends by construction.
+
+    Spanning is only defined for grid worlds, graph worlds which are not embedded get None.
+
+    :param arrival_times: arrival times plane (or arrival time by node)
+    :type arrival_times: numpy.ndarray
+    :param generation: count the persons reached until this generation (all generations by default)
+    :type generation: int
+    :rtype: ReachedCluster
+    """
+    reached = arrival_times != NOT_ARRIVED
+    if generation is not None:
+        reached &= arrival_times <= generation
+
+    if reached.ndim != 2:
+        return ReachedCluster(size=int(np.count_nonzero(reached)), spans_rows=None, spans_cols=None)
+
+    reached_rows, reached_cols = reached.any(axis=1), reached.any(axis=0)
+    return ReachedCluster(
+        size=int(np.count_nonzero(reached)),
+        spans_rows=bool(reached_rows[0] and reached_rows[-1]),
+        spans_cols=bool(reached_cols[0] and reached_cols[-1]),
+    )
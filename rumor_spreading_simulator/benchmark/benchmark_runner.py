@@ -0,0 +1,261 @@
+import itertools
+import json
+import multiprocessing
+import platform
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from rumor_spreading_simulator.engine import world_generation
+from rumor_spreading_simulator.engine.engines import ENGINE_VERSION, create_simulator
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.random_stream import CounterRandom
+
+try:
+    import resource
+except ImportError:         # not available on Windows, peak RSS is not measured
+    resource = None
+
+BenchmarkCase = namedtuple(
+    "BenchmarkCase",
+    [
+        "engine",
+        "world_size",
+        "population_density",
+        "rumor_cool_down",
+        "skepticism_dist",      # tuple of S1 S2 S3 S4 densities
+        "layout",               # 'random' or 'slow' (WorldBoard2D.generate_slow_board)
+    ]
+)
+
+BenchmarkResult = namedtuple(
+    "BenchmarkResult",
+    [
+        "case",
+        "setup_seconds",            # best world generation time
+        "generations_per_second",   # best generations evaluation rate
+        "peak_rss_bytes",           # peak resident memory of the case process (None if not measured)
+        "base_rss_bytes",           # resident memory of the case process before the world generation
+    ]
+)
+
+Regression = namedtuple("Regression", ["case", "metric", "baseline", "current", "change"])
+
+LAYOUTS = ('random', 'slow')
+
+# Engines able to generate the *slow* layout
+SLOW_LAYOUT_ENGINES = ('object', 'sparse')
+
+# Metrics compared between runs, and whether a higher value is better
+METRICS = {
+    "setup_seconds": False,
+    "generations_per_second": True,
+    "peak_rss_bytes": False,
+}
+
+RESULTS_VERSION = 1
+
+# World layout target (persons placement and the skepticism and order planes, shared by the array engines): a
+# 4000x4000 world in under 2 seconds. The object and sparse engines build a Person per cell on top of the placement
+# (seconds for a 1000x1000 world), the target does not apply to them.
+LAYOUT_TARGET_SIZE = 4000
+LAYOUT_TARGET_SECONDS = 2.0
+
+
+def benchmark_matrix(engines, world_sizes, population_densities, rumor_cool_downs, skepticism_dists, layouts):
+    """
+    All the cases of a benchmark matrix (the slow layout only for the engines supporting it).
+
+    :rtype: list[BenchmarkCase]
+    """
+    return [
+        BenchmarkCase(*params)
+        for params in itertools.product(
+            engines, world_sizes, population_densities, rumor_cool_downs,
+            [tuple(dist) for dist in skepticism_dists], layouts
+        )
+        if params[-1] != 'slow' or params[0] in SLOW_LAYOUT_ENGINES
+    ]
+
+
+def run_benchmark(cases, generations, repeats=3, seed=0):
+    """
+    Measure every case, each repeat in a fresh process so its peak RSS is its own.
+
+    Timings are the best of the repeats, the peak RSS is the highest.
+
+    :type cases: list[BenchmarkCase]
+    :type generations: int
+    :type repeats: int
+    :type seed: int
+    :rtype: iter[BenchmarkResult]
+    """
+    context = multiprocessing.get_context("spawn")
+    for case in cases:
+        measures = []
+        for _ in range(repeats):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                measures.append(executor.submit(measure_case, case, generations, seed).result())
+
+        setup_seconds, generations_per_second, peak_rss_bytes, base_rss_bytes = zip(*measures)
+        yield BenchmarkResult(
+            case=case,
+            setup_seconds=min(setup_seconds),
+            generations_per_second=max(generations_per_second),
+            peak_rss_bytes=None if resource is None else max(peak_rss_bytes),
+            base_rss_bytes=None if resource is None else min(base_rss_bytes),
+        )
+
+
+def measure_case(case, generations, seed):
+    """
+    Measure a single case in the current process.
+
+    :returns: setup seconds, generations per second, peak and base RSS bytes
+    :rtype: (float, float, int, int)
+    """
+    simulator_params = dict(
+        world_size=case.world_size,
+        population_density=case.population_density,
+        rumor_cool_down=case.rumor_cool_down,
+        skepticism_dist=dict(zip(SkepticismLevel, case.skepticism_dist)),
+    )
+    if case.layout == 'slow':
+        simulator_params.update(slow_layout=True)
+
+    base_rss_bytes = peak_rss_bytes()
+    start = time.perf_counter()
+    simulator = create_simulator(case.engine, seed=seed, **simulator_params)
+    setup_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    simulator.jump_generation(generations)
+    generations_per_second = generations / (time.perf_counter() - start)
+
+    close = getattr(simulator, "close", None)
+    if close is not None:
+        close()
+
+    return setup_seconds, generations_per_second, peak_rss_bytes(), base_rss_bytes
+
+
+def measure_layout(world_size=LAYOUT_TARGET_SIZE, population_density=0.8, repeats=3, seed=0):
+    """
+    Best time to lay a world out (world_generation.place_persons and layout_planes), uniform skepticism.
+
+    :type world_size: int
+    :type population_density: float
+    :type repeats: int
+    :type seed: int
+    :rtype: float
+    """
+    skepticism_dist = {skepticism_level: 1 / len(SkepticismLevel) for skepticism_level in SkepticismLevel}
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        world_generation.layout_planes(
+            world_size,
+            *world_generation.place_persons(world_size, population_density, skepticism_dist, CounterRandom(seed))
+        )
+        seconds.append(time.perf_counter() - start)
+
+    return min(seconds)
+
+
+def peak_rss_bytes():
+    """
+    Peak resident memory of the current process and its finished children (worker processes), None if unknown.
+
+    :rtype: int
+    """
+    if resource is None:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return unit * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+
+def save_results(path, results, generations, repeats):
+    """
+    Save benchmark results to a JSON file.
+
+    :type path: str
+    :type results: list[BenchmarkResult]
+    """
+    document = dict(
+        version=RESULTS_VERSION,
+        engine_version=ENGINE_VERSION,
+        python=platform.python_version(),
+        numpy=np.__version__,
+        machine=platform.machine(),
+        generations=generations,
+        repeats=repeats,
+        results=[
+            dict(result._replace(case=None)._asdict(), case=result.case._asdict())
+            for result in results
+        ],
+    )
+    with open(path, "w") as results_file:
+        json.dump(document, results_file, indent=2)
+
+
+def load_results(path):
+    """
+    Load benchmark results saved by save_results.
+
+    :type path: str
+    :rtype: list[BenchmarkResult]
+    """
+    with open(path) as results_file:
+        document = json.load(results_file)
+
+    if document["version"] != RESULTS_VERSION:
+        raise ValueError(f"Unsupported benchmark results version: {document['version']}")
+
+    results = []
+    for result in document["results"]:
+        case = BenchmarkCase(**dict(result["case"], skepticism_dist=tuple(result["case"]["skepticism_dist"])))
+        results.append(BenchmarkResult(**dict(result, case=case)))
+
+    return results
+
+
+def compare_results(baseline, current, threshold=0.1, ignore_engine=False):
+    """
+    Find the metrics of the cases in both runs that got worse by more than the threshold.
+
+    :type baseline: list[BenchmarkResult]
+    :type current: list[BenchmarkResult]
+    :param threshold: relative change tolerated (0.1 for 10%)
+    :type threshold: float
+    :param ignore_engine: match cases by parameters only, comparing two engine implementations
+    :type ignore_engine: bool
+    :rtype: list[Regression]
+    """
+    def case_key(result):
+        return result.case._replace(engine=None) if ignore_engine else result.case
+
+    baseline_results = {case_key(result): result for result in baseline}
+    regressions = []
+    for result in current:
+        baseline_result = baseline_results.get(case_key(result))
+        if baseline_result is None:
+            continue
+
+        for metric, higher_is_better in METRICS.items():
+            baseline_value, current_value = getattr(baseline_result, metric), getattr(result, metric)
+            if not baseline_value or current_value is None:
+                continue
+
+            change = (current_value - baseline_value) / baseline_value
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(Regression(result.case, metric, baseline_value, current_value, change))
+
+    return regressions
@@ -0,0 +1,51 @@
+import functools
+
+from rumor_spreading_simulator.engine.simulator import RumorSpreadingSimulator
+from rumor_spreading_simulator.engine.graph_simulator import GraphRumorSpreadingSimulator, GraphWorldBoard
+from rumor_spreading_simulator.engine.mapped_simulator import MappedRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.packed_simulator import PackedRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.tiled_simulator import TiledRumorSpreadingSimulator
+
+# Simulator engines by name, all sharing the RumorSpreadingSimulator public surface
+ENGINES = {
+    'object': RumorSpreadingSimulator,
+    'sparse': functools.partial(RumorSpreadingSimulator, sparse=True),
+    'numpy': NumpyRumorSpreadingSimulator,
+    'tiled': TiledRumorSpreadingSimulator,
+    'packed': PackedRumorSpreadingSimulator,
+    'mapped': MappedRumorSpreadingSimulator,
+    'torus': functools.partial(GraphRumorSpreadingSimulator, topology='torus'),
+}
+DEFAULT_ENGINE = 'object'
+
+# Version of the simulation rules, bump whenever a change alters the results of a seeded run
+ENGINE_VERSION = 3
+
+
+def create_simulator(engine, seed=None, **simulator_params):
+    """
+    Create a simulator by engine name, optionally seeded for reproducible runs.
+
+    :type engine: str
+    :type seed: int
+    """
+    return ENGINES[engine](seed=seed, **simulator_params)
+
+
+def simulator_planes(simulator):
+    """
+    State planes of the world of a simulator, for any engine (the object engines export them from the persons, see
+    RumorSpreadingSimulator.state_planes).
+
+    :rtype: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+    """
+    if isinstance(simulator, RumorSpreadingSimulator):
+        return simulator.state_planes()
+
+    world_board = simulator.world_board
+
+    if isinstance(world_board, GraphWorldBoard):
+        return world_board.grid_planes()
+
+    return world_board.planes
@@ -0,0 +1,152 @@
+import numpy as np
+
+from rumor_spreading_simulator.engine import numpy_kernel
+from rumor_spreading_simulator.engine.numpy_kernel import StatePlanes
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyWorldBoard2D
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.random_stream import CounterRandom, counter_uniform, spawn_seeds
+
+
+class EnsembleRumorSpreadingSimulator:
+    """
+    Simulator engine for many independent replicas of the same 2D population world.
+
+    All replicas are kept as stacked R x M x M planes and advanced together by a single
+    vectorized update, following the rules of the NumPy engine. A replica evolves exactly
+    as a NumpyRumorSpreadingSimulator with the same seed.
+    """
+    def __init__(
+            self,
+            replicas=10,
+            world_size=100,
+            population_density=0.8,
+            rumor_cool_down=5,
+            skepticism_dist=None,
+            seed=None,
+            seeds=None
+    ):
+        """
+        :type replicas: int
+        :type world_size: int
+        :type population_density: float
+        :type rumor_cool_down: int
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :param seed: seed the replicas seeds are spawned from
+        :type seed: int
+        :param seeds: seed of every replica (overrides replicas and seed)
+        :type seeds: list[int]
+        """
+        if skepticism_dist is None:
+            skepticism_dist = {s: 1 / len(SkepticismLevel) for s in SkepticismLevel}
+
+        if seeds is None:
+            seeds = spawn_seeds(seed, replicas)
+        replicas = len(seeds)
+
+        self._generation = 0                                    # Current generation number
+        self._rumor_count = np.ones(replicas, dtype=np.int64)   # Number of person the rumor spread to, per replica
+        self._rumors_spread_count = [self._rumor_count.copy()]  # Count of spread rumors per generation, per replica
+
+        self._rumor_cool_down = rumor_cool_down
+        self._skepticism_dist = skepticism_dist
+        self._randoms = [CounterRandom(replica_seed) for replica_seed in seeds]
+        self._keys = np.array([random_stream.key for random_stream in self._randoms]).reshape(-1, 1, 1)
+
+        world_boards = [
+            NumpyWorldBoard2D.generate_board(
+                world_size, population_density, skepticism_dist, random_stream, rumor_cool_down
+            )
+            for random_stream in self._randoms
+        ]
+        for world_board, random_stream in zip(world_boards, self._randoms):
+            # Force a random person to be the first one to spread the rumor for all friends
+            world_board.plant_rumor(world_board.get_random_person(random_stream))
+
+        self._world_size = world_size
+        self._cells = world_boards[0].cells
+        self._population_size = np.array([world_board.population_size for world_board in world_boards])
+        self._planes = StatePlanes(*(
+            np.stack(replica_planes) for replica_planes in zip(*(board.planes for board in world_boards))
+        ))
+
+        spread_probability = numpy_kernel.spread_probability(self._planes.skepticism)
+        self._planes.should_spread[...] = counter_uniform(self._keys, 0, self._cells) < spread_probability
+
+    def next_generation(self):
+        """
+        Simulate a single generation evaluation of all replicas.
+        """
+        spreaders = numpy_kernel.spreaders_mask(self._planes)
+        self._planes, new_exposures, _ = numpy_kernel.advance(
+            self._planes,
+            spreaders,
+            numpy_kernel.grid_neighbour_sum(spreaders),
+            self.rumor_cool_down,
+            counter_uniform(self._keys, self._generation + 1, self._cells)
+        )
+
+        spread_rumor_count = np.count_nonzero(new_exposures, axis=(1, 2))
+        self._rumor_count += spread_rumor_count
+        self._rumors_spread_count.append(spread_rumor_count)
+        self._generation += 1
+
+    def jump_generation(self, steps):
+        """
+        Simulate X steps generation evaluation.
+        """
+        for _ in range(steps):
+            self.next_generation()
+
+    @property
+    def replicas(self):
+        return len(self._population_size)
+
+    @property
+    def seeds(self):
+        return [random_stream.seed for random_stream in self._randoms]
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def planes(self):
+        return self._planes
+
+    @property
+    def world_size(self):
+        return self._world_size
+
+    @property
+    def skepticism_dist(self):
+        return self._skepticism_dist
+
+    @property
+    def rumor_cool_down(self):
+        return self._rumor_cool_down
+
+    @property
+    def rumor_count(self):
+        return self._rumor_count
+
+    @property
+    def population_size(self):
+        """
+        Population size of every replica world.
+
+        :rtype: numpy.ndarray
+        """
+        return self._population_size
+
+    @property
+    def rumor_relative(self):
+        return self.rumor_count / self._population_size
+
+    @property
+    def rumors_spread_count(self):
+        """
+        Count of spread rumors per replica per generation.
+
+        :rtype: numpy.ndarray
+        """
+        return np.stack(self._rumors_spread_count, axis=1)
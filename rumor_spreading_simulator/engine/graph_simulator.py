@@ -0,0 +1,526 @@
+import numpy as np
+
+from rumor_spreading_simulator.engine import numpy_kernel, snapshot, world_generation
+from rumor_spreading_simulator.engine.numpy_kernel import EMPTY_CELL, NOT_ARRIVED, SKEPTICISM_LEVELS, StatePlanes
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator, PersonView
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+
+TOPOLOGIES = ('torus', 'k_nearest', 'edge_list')
+
+_FRIENDS_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# Spreading friends counts saturate, the rules only tell no friend, a single friend and more apart
+_MAX_SPREADER_COUNT = np.iinfo(np.int8).max
+
+
+class GraphWorldBoard:
+    """
+    This class implemented the population world as a sparse friends graph.
+
+    Persons are the graph nodes, numbered by evaluation order, and the friends relation is a symmetric
+    CSR adjacency: the friends of node i are indices[indptr[i]:indptr[i + 1]] (sorted).
+    The state planes hold a single entry per node. A graph embedded in a grid (torus) also keeps
+    the cell of every node, to be drawn as a 2D board.
+    """
+    def __init__(self, planes, indptr, indices, cells=None, size=None, labels=None):
+        """
+        :param planes: state planes of the nodes
+        :type planes: StatePlanes
+        :param indptr: CSR offsets of the friends of every node
+        :type indptr: numpy.ndarray
+        :param indices: CSR friends of all nodes
+        :type indices: numpy.ndarray
+        :param cells: flat cell index (row * size + col) of every node, for a graph embedded in a grid
+        :type cells: numpy.ndarray
+        :param size: size of the grid the graph is embedded in
+        :type size: int
+        :param labels: original label of every node (loaded graphs only)
+        :type labels: numpy.ndarray
+        """
+        self._planes = planes                       # state planes of the current generation, by node
+        self._indptr = indptr                       # CSR offsets of the friends of every node
+        self._indices = indices                     # CSR friends of all nodes
+        self._degrees = np.diff(indptr)             # number of friends of every node
+        self._cells = cells                         # grid cell of every node (embedded graphs only)
+        self._size = size                           # grid size (embedded graphs only)
+        self._labels = labels                       # original label of every node (loaded graphs only)
+
+    @classmethod
+    def generate_torus(cls, size, density, skepticism_dist, random_stream, rumor_cool_down):
+        """
+        Generate a grid world (same layout as WorldBoard2D) where friends wrap around the board edges.
+
+        :type size: int
+        :type density: float
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        :type rumor_cool_down: int
+        :rtype: GraphWorldBoard
+        """
+        cells, levels, keys = world_generation.place_persons(size, density, skepticism_dist, random_stream)
+        evaluation = np.argsort(keys, kind="stable")
+        cells, levels = cells[evaluation], levels[evaluation]
+        order = np.full(size ** 2, -1, dtype=np.int64)
+        order[cells] = np.arange(len(cells))
+        order = order.reshape(size, size)
+        rows, cols = np.divmod(cells, size)
+
+        sources = []
+        targets = []
+        for row, col in _FRIENDS_OFFSETS:
+            friends = order[(rows + row) % size, (cols + col) % size]
+            exists = friends >= 0
+            sources.append(np.flatnonzero(exists))
+            targets.append(friends[exists])
+
+        indptr, indices = graph_adjacency(len(cells), np.concatenate(sources), np.concatenate(targets))
+        return cls.from_adjacency(levels, indptr, indices, rumor_cool_down, cells=cells, size=size)
+
+    @classmethod
+    def generate_k_nearest(cls, population_size, k, skepticism_dist, random_stream, rumor_cool_down):
+        """
+        Generate a ring lattice world, every person is a friend of its k nearest persons (k / 2 on each side).
+
+        :type population_size: int
+        :param k: number of friends of every person (even)
+        :type k: int
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        :type rumor_cool_down: int
+        :rtype: GraphWorldBoard
+        """
+        if k % 2:
+            raise ValueError(f"k nearest lattice needs an even k, got {k}")
+
+        offsets = np.arange(1, k // 2 + 1)
+        sources = np.repeat(np.arange(population_size), len(offsets))
+        targets = (sources + np.tile(offsets, population_size)) % max(population_size, 1)
+
+        indptr, indices = graph_adjacency(population_size, sources, targets)
+        levels = node_levels(population_size, skepticism_dist, random_stream)
+        return cls.from_adjacency(levels, indptr, indices, rumor_cool_down)
+
+    @classmethod
+    def load_edge_list(cls, path, skepticism_dist, random_stream, rumor_cool_down):
+        """
+        Load a world from an edge list file, a "node node" pair of integer labels per line ('#' for comments).
+
+        Nodes are numbered by sorted label (see labels), edges are undirected.
+
+        :type path: str
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        :type rumor_cool_down: int
+        :rtype: GraphWorldBoard
+        """
+        edges = np.loadtxt(path, dtype=np.int64, comments="#", usecols=(0, 1), ndmin=2)
+        labels, nodes = np.unique(edges, return_inverse=True)
+        nodes = nodes.reshape(edges.shape)
+
+        indptr, indices = graph_adjacency(len(labels), nodes[:, 0], nodes[:, 1])
+        levels = node_levels(len(labels), skepticism_dist, random_stream)
+        return cls.from_adjacency(levels, indptr, indices, rumor_cool_down, labels=labels)
+
+    @classmethod
+    def from_adjacency(cls, levels, indptr, indices, rumor_cool_down, cells=None, size=None, labels=None):
+        """
+        Create a world with nobody holding the rumor.
+
+        :param levels: base skepticism level index of every node
+        :type levels: numpy.ndarray
+        :type indptr: numpy.ndarray
+        :type indices: numpy.ndarray
+        :type rumor_cool_down: int
+        :rtype: GraphWorldBoard
+        """
+        nodes = np.arange(len(levels))
+        spread_before = np.zeros(len(levels), dtype=bool)
+        spread_after = np.zeros(len(levels), dtype=bool)
+        if len(indices):
+            # Friends are sorted, so the first / last friend tells whether any is evaluated before / after
+            has_friends = np.diff(indptr) > 0
+            spread_before = has_friends & (indices[np.minimum(indptr[:-1], len(indices) - 1)] < nodes)
+            spread_after = has_friends & (indices[np.maximum(indptr[1:] - 1, 0)] > nodes)
+
+        planes = numpy_kernel.empty_planes(levels.shape, rumor_cool_down)._replace(
+            skepticism=levels,
+            curr_skepticism=levels.copy(),
+            spread_before=spread_before,
+            spread_after=spread_after,
+        )
+        return cls(planes, indptr, indices, cells, size, labels)
+
+    def plant_rumor(self, node):
+        """
+        Force a person to be the first one to spread the rumor for all friends.
+
+        :type node: int
+        """
+        self._planes.rumor_count[node] = 1
+        self._planes.has_rumor[node] = True
+        self._planes.ever_has_rumor[node] = True
+        self._planes.curr_skepticism[node] = SKEPTICISM_LEVELS.index(SkepticismLevel.S1)
+
+    def get_random_person(self, random_stream):
+        """
+        Get random person from the world.
+
+        Persons of a graph embedded in a grid are drawn by their rank row by row, as in the grid engines.
+
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        :rtype: int
+        """
+        rank = int(random_stream.generator.integers(self.population_size))
+        if self.embedded:
+            return int(np.argsort(self._cells, kind="stable")[rank])
+
+        return rank
+
+    def person_by_id(self, node):
+        """
+        Get a read only view of a person by node.
+
+        :type node: int
+        :rtype: PersonView
+        """
+        if not 0 <= node < self.population_size:
+            return None
+
+        return PersonView(
+            has_rumor=bool(self._planes.has_rumor[node]),
+            curr_skepticism=SKEPTICISM_LEVELS[self._planes.curr_skepticism[node]],
+            ever_has_rumor=bool(self._planes.ever_has_rumor[node]),
+        )
+
+    def friends_of(self, node):
+        """
+        Get the friends of a given node.
+
+        :type node: int
+        :rtype: numpy.ndarray
+        """
+        return self._indices[self._indptr[node]:self._indptr[node + 1]]
+
+    def spreader_counts(self, spreaders):
+        """
+        Count the spreading friends of every node, as the sparse adjacency product with the spreaders vector.
+
+        Only the friends of the spreaders are visited (the adjacency is symmetric).
+
+        :type spreaders: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        spreading = np.flatnonzero(spreaders)
+        degrees = self._degrees[spreading]
+        ends = np.cumsum(degrees)
+        total = int(ends[-1]) if len(ends) else 0
+        positions = np.repeat(self._indptr[spreading] - ends + degrees, degrees) + np.arange(total)
+        counts = np.bincount(self._indices[positions], minlength=self.population_size)
+        return np.minimum(counts, _MAX_SPREADER_COUNT).astype(np.int8)
+
+    def world_iterator(self):
+        """
+        Iterate over all persons in the world (evaluation order).
+
+        :rtype: iter
+        """
+        return iter(range(self.population_size))
+
+    def grid_planes(self):
+        """
+        State planes of the grid an embedded graph lives on (a copy, for drawing).
+
+        :rtype: StatePlanes
+        """
+        return StatePlanes(*(
+            self.grid_plane(plane, EMPTY_CELL if field in ("skepticism", "curr_skepticism") else 0)
+            for field, plane in zip(StatePlanes._fields, self._planes)
+        ))
+
+    def grid_plane(self, values, empty):
+        """
+        Lay the values of every node on the grid an embedded graph lives on.
+
+        :param values: value of every node
+        :type values: numpy.ndarray
+        :param empty: value of the cells without a person
+        :rtype: numpy.ndarray
+        """
+        if self._size is None:
+            raise ValueError("The graph world is not embedded in a grid")
+
+        grid_plane = np.full(self._size ** 2, empty, dtype=values.dtype)
+        grid_plane[self._cells] = values
+        return grid_plane.reshape(self._size, self._size)
+
+    @property
+    def cells(self):
+        """
+        Counter of every node in the random stream (its grid cell for an embedded graph).
+
+        :rtype: numpy.ndarray
+        """
+        if self._cells is not None:
+            return self._cells
+
+        return np.arange(self.population_size)
+
+    @property
+    def labels(self):
+        """
+        Original label of every node (the node itself for a generated graph).
+
+        :rtype: numpy.ndarray
+        """
+        if self._labels is not None:
+            return self._labels
+
+        return np.arange(self.population_size)
+
+    @property
+    def indptr(self):
+        return self._indptr
+
+    @property
+    def indices(self):
+        return self._indices
+
+    @property
+    def planes(self):
+        return self._planes
+
+    @planes.setter
+    def planes(self, planes):
+        self._planes = planes
+
+    @property
+    def embedded(self):
+        return self._size is not None
+
+    @property
+    def loaded(self):
+        return self._labels is not None
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def board_size(self):
+        return self._size ** 2 if self.embedded else self.population_size
+
+    @property
+    def edges_count(self):
+        return len(self._indices) // 2
+
+    @property
+    def population_size(self):
+        return len(self._planes.skepticism)
+
+    @property
+    def population_density(self):
+        return self.population_size / self.board_size
+
+
+class GraphRumorSpreadingSimulator(NumpyRumorSpreadingSimulator):
+    """
+    Vectorized simulator engine for spreading rumors over a sparse friends graph.
+
+    Keeps the exact rules of person.py (the NumPy kernel), every generation propagating the rumor
+    as a sparse adjacency product with the spreaders vector. Topologies:
+        torus - the world_size grid world with population_density, friends wrapping around the board edges
+        k_nearest - int(population_density * world_size ** 2) persons on a ring, each a friend of its k nearest
+        edge_list - the graph of an edge list file (world_size and population_density are ignored)
+    """
+    def __init__(
+            self,
+            world_size=100,
+            population_density=0.8,
+            rumor_cool_down=5,
+            skepticism_dist=None,
+            topology='torus',
+            k=8,
+            edge_list=None,
+            seed=None
+    ):
+        """
+        :type world_size: int
+        :type population_density: float
+        :type rumor_cool_down: int
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :param topology: one of TOPOLOGIES
+        :type topology: str
+        :param k: number of friends of every person (k_nearest only)
+        :type k: int
+        :param edge_list: path of the edge list file (edge_list only)
+        :type edge_list: str
+        :type seed: int
+        """
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown graph topology: {topology}")
+
+        self._topology = topology
+        self._k = k
+        self._edge_list = edge_list
+        self._world_size = world_size
+        super().__init__(world_size, population_density, rumor_cool_down, skepticism_dist, seed)
+
+    @classmethod
+    def load_snapshot(cls, path, seed=None):
+        """
+        Resume a simulator from a snapshot file of a graph world (see save_snapshot).
+
+        :type path: str
+        :param seed: seed of the continuation random stream, forks a new what-if run (saved stream if not given)
+        :type seed: int
+        :rtype: GraphRumorSpreadingSimulator
+        """
+        saved = snapshot.load_snapshot(path, graph=True)
+        simulator = cls._from_snapshot(saved, seed)
+        simulator._topology = saved.header["topology"]
+        simulator._k = saved.header["k"]
+        simulator._edge_list = saved.header["edge_list"]
+        simulator._world_size = saved.header["world_size"]
+        simulator._population_density = saved.header["population_density"]
+        return simulator
+
+    def save_snapshot(self, path):
+        """
+        Save the simulator state to a compact binary snapshot file, the state planes by node and the
+        CSR friends adjacency.
+
+        :type path: str
+        """
+        world_board = self._world_board
+        header = snapshot.simulator_header(
+            self,
+            topology=self._topology,
+            k=self._k,
+            edge_list=self._edge_list,
+            world_size=self._world_size,
+            population_density=self._population_density,
+            size=world_board.size,
+        )
+        graph = dict(indptr=world_board.indptr, indices=world_board.indices)
+        if world_board.embedded:
+            graph["cells"] = world_board.cells
+        if world_board.loaded:
+            graph["labels"] = world_board.labels
+
+        # Nodes are numbered by evaluation order, no evaluation rank plane is needed
+        snapshot.save_snapshot(
+            path,
+            snapshot.Snapshot(
+                header, world_board.planes, np.empty(0, dtype=np.int64), self.rumors_spread_count,
+                self._arrival_times, graph
+            )
+        )
+
+    def generate_new_age(self):
+        """
+        Generate new simulator with same parameters.
+
+        :rtype: GraphRumorSpreadingSimulator
+        """
+        return GraphRumorSpreadingSimulator(
+            world_size=self._world_size,
+            population_density=self._population_density,
+            rumor_cool_down=self.rumor_cool_down,
+            skepticism_dist=self.skepticism_dist,
+            topology=self._topology,
+            k=self._k,
+            edge_list=self._edge_list,
+            seed=self._random.spawn_seed()
+        )
+
+    def _generate_board(self, world_size, population_density):
+        self._population_density = population_density
+        if self._topology == 'torus':
+            return GraphWorldBoard.generate_torus(
+                world_size, population_density, self._skepticism_dist, self._random, self._rumor_cool_down
+            )
+
+        if self._topology == 'k_nearest':
+            return GraphWorldBoard.generate_k_nearest(
+                int(population_density * world_size ** 2), self._k, self._skepticism_dist, self._random,
+                self._rumor_cool_down
+            )
+
+        return GraphWorldBoard.load_edge_list(
+            self._edge_list, self._skepticism_dist, self._random, self._rumor_cool_down
+        )
+
+    @classmethod
+    def _board_from_snapshot(cls, saved):
+        return GraphWorldBoard(
+            saved.planes, saved.graph["indptr"], saved.graph["indices"], saved.graph.get("cells"),
+            saved.header["size"], saved.graph.get("labels")
+        )
+
+    def _record_generation(self):
+        if self._recorder is not None:
+            self._recorder.record(self._generation, self._world_board.grid_planes())
+
+    @property
+    def arrival_times(self):
+        """
+        Generation every person first heard the rumor (NOT_ARRIVED if never), on the grid for an embedded graph
+        (NOT_ARRIVED for no person) and by node otherwise.
+
+        :rtype: numpy.ndarray
+        """
+        if not self._world_board.embedded:
+            return self._arrival_times
+
+        return self._world_board.grid_plane(self._arrival_times, NOT_ARRIVED)
+
+    @property
+    def topology(self):
+        return self._topology
+
+
+def graph_adjacency(node_count, sources, targets):
+    """
+    Symmetric CSR adjacency of undirected edges (self loops and duplicates dropped, friends sorted).
+
+    :type node_count: int
+    :param sources: first node of every edge
+    :type sources: numpy.ndarray
+    :param targets: second node of every edge
+    :type targets: numpy.ndarray
+    :returns: indptr and indices of the adjacency
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    sources, targets = (
+        np.concatenate((sources, targets)).astype(np.int64), np.concatenate((targets, sources)).astype(np.int64)
+    )
+    not_loop = sources != targets
+    edges = np.unique(sources[not_loop] * node_count + targets[not_loop])
+    sources, targets = np.divmod(edges, max(node_count, 1))
+
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=indptr[1:])
+    return indptr, targets.astype(np.int32 if node_count < 2 ** 31 else np.int64)
+
+
+def node_levels(node_count, skepticism_dist, random_stream):
+    """
+    Skepticism level index of every node, levels given in skepticism_dist proportions to nodes in random order.
+
+    Every node gets a level: the level counts are the largest remainder apportionment of the nodes to the
+    distribution (normalized when it does not sum to 1), so rounding favors no level.
+
+    :type node_count: int
+    :type skepticism_dist: dict[SkepticismLevel, float]
+    :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+    :rtype: numpy.ndarray
+    """
+    densities = np.array(list(skepticism_dist.values()), dtype=np.float64)
+    quotas = densities / densities.sum() * node_count
+    counts = np.floor(quotas).astype(np.int64)
+    counts[np.argsort(counts - quotas, kind="stable")[:node_count - counts.sum()]] += 1
+
+    levels = np.array(
+        [SKEPTICISM_LEVELS.index(skepticism_level) for skepticism_level in skepticism_dist], dtype=np.int8
+    )
+    return random_stream.generator.permutation(np.repeat(levels, counts))
@@ -0,0 +1,125 @@
+import functools
+import time
+from collections import namedtuple
+
+from rumor_spreading_simulator.engine.person import Person
+from rumor_spreading_simulator.engine.world_board_2D import WorldBoard2D
+
+GenerationMetrics = namedtuple(
+    "GenerationMetrics",
+    [
+        "generation",           # number of the evaluated generation
+        "evaluated_persons",    # persons evaluated (less than the population in sparse mode)
+        "spreads",              # rumors spread from a person to a friend (notify_rumor calls)
+        "new_exposures",        # persons hearing the rumor for the first time
+        "prepare_seconds",      # wall time preparing the next board and drawing the spread decisions
+        "evaluate_seconds",     # wall time evaluating the persons
+        "finish_seconds",       # wall time swapping the boards, collecting the active persons and recording
+    ]
+)
+
+HotPathStats = namedtuple("HotPathStats", ["name", "calls", "seconds"])
+
+# Methods wrapped by HotPathProfile, by class
+HOT_PATHS = {
+    Person: (
+        "notify_generation_start",
+        "should_spread_rumor",
+        "notify_rumor",
+        "notify_spread_rumor",
+    ),
+    WorldBoard2D: (
+        "prepare_next_board",
+        "swap_boards",
+        "friends_of",
+        "get_person_friends",
+        "person_by_id",
+    ),
+}
+
+
+class HotPathProfile:
+    """
+    Opt-in counter (and timer) layer over the Person and WorldBoard2D hot paths.
+
+    The hot path methods are wrapped only inside the profile context and restored when it exits,
+    so no instrumentation is left in the code path of a run outside of it. The methods are wrapped on
+    the classes, so every instance (in every thread) is counted while a profile is active, and a single
+    profile may be active at a time: entering another one (or the same one again) raises a RuntimeError.
+
+        with HotPathProfile() as profile:
+            simulator.jump_generation(10)
+        print(profile.stats)
+    """
+    _active = None                  # the profile whose wrappers are installed
+
+    def __init__(self, timed=False, hot_paths=None):
+        """
+        :param timed: time every call as well (much heavier than counting)
+        :type timed: bool
+        :param hot_paths: methods names to wrap by class (HOT_PATHS if not given)
+        :type hot_paths: dict[type, tuple[str]]
+        """
+        self._timed = timed
+        self._hot_paths = HOT_PATHS if hot_paths is None else hot_paths
+        self._calls = {}            # calls count by method name
+        self._seconds = {}          # total wall time by method name (timed only)
+        self._originals = []        # (class, method name, original method) of the wrapped methods
+
+    def __enter__(self):
+        if HotPathProfile._active is not None:
+            raise RuntimeError("A hot path profile is already active, profiles may not be nested")
+        HotPathProfile._active = self
+
+        for cls, method_names in self._hot_paths.items():
+            for method_name in method_names:
+                method = cls.__dict__[method_name]
+                name = f"{cls.__name__}.{method_name}"
+                self._calls.setdefault(name, 0)
+                self._seconds.setdefault(name, 0.0)
+                self._originals.append((cls, method_name, method))
+                setattr(cls, method_name, self._wrap(name, method))
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        while self._originals:
+            cls, method_name, method = self._originals.pop()
+            setattr(cls, method_name, method)
+        HotPathProfile._active = None
+
+    def _wrap(self, name, method):
+        calls = self._calls
+        if not self._timed:
+            @functools.wraps(method)
+            def counted(*args, **kwargs):
+                calls[name] += 1
+                return method(*args, **kwargs)
+
+            return counted
+
+        seconds = self._seconds
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            calls[name] += 1
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds[name] += time.perf_counter() - start
+
+        return timed
+
+    @property
+    def stats(self):
+        """
+        Calls count and wall time (0 when not timed) of every hot path method, most called first.
+
+        :rtype: list[HotPathStats]
+        """
+        return sorted(
+            (HotPathStats(name, calls, self._seconds[name]) for name, calls in self._calls.items()),
+            key=lambda stats: stats.calls,
+            reverse=True
+        )
@@ -0,0 +1,173 @@
+import mmap
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+from rumor_spreading_simulator.engine import packed_kernel
+from rumor_spreading_simulator.engine.packed_simulator import PackedRumorSpreadingSimulator, PackedWorldBoard2D
+
+
+class MappedWorldBoard2D(PackedWorldBoard2D):
+    """
+    This class implemented the 2D population world as a bit-packed cell array in a memory-mapped file.
+
+    The board may be larger than the memory: it is generated straight into the file and evaluated one band
+    of rows at a time, and the pages of every band are released once it is done with, so the resident
+    memory is bounded by a few bands whatever the board size.
+    """
+    def __init__(self, path, size, layout, population_size=None, remove=False):
+        """
+        :param path: board file, size ** 2 packed cells
+        :type path: str
+        :type size: int
+        :type layout: rumor_spreading_simulator.engine.packed_kernel.PackedLayout
+        :param population_size: number of persons in the board (counted if not given)
+        :type population_size: int
+        :param remove: remove the board file when the board is closed (or garbage collected)
+        :type remove: bool
+        """
+        board_mmap = _map_file(path)
+        self._path = path                                                   # board file
+        self._finalizer = weakref.finalize(self, _unmap, board_mmap, path if remove else None)
+        self._mmap = board_mmap
+        super().__init__(np.ndarray((size, size), dtype=layout.dtype, buffer=board_mmap), layout, population_size)
+
+    @classmethod
+    def generate_board(cls, path, size, density, skepticism_dist, random_stream, rumor_cool_down, remove=False):
+        """
+        Generate a new board into a file, band by band (see PackedWorldBoard2D.generate_board).
+
+        :param path: board file, created or overwritten
+        :type path: str
+        :type size: int
+        :type density: float
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        :type rumor_cool_down: int
+        :param remove: remove the board file when the board is closed (or garbage collected)
+        :type remove: bool
+        :returns: the board and the ID of the first person to spread the rumor
+        :rtype: (MappedWorldBoard2D, PersonWorldID)
+        """
+        layout = packed_kernel.packed_layout(rumor_cool_down)
+        with open(path, "wb") as board_file:
+            board_file.truncate(size ** 2 * layout.dtype.itemsize)
+        world_board = cls(path, size, layout, population_size=0, remove=remove)
+        return world_board, world_board._pack_new_world(density, skepticism_dist, random_stream)
+
+    def release_rows(self, start, end):
+        """
+        Drop the pages of the rows start <= row < end (and the rows before) from the resident memory.
+
+        The pages are shared with the file, dirty ones are written back by the system and read again when used.
+
+        :type start: int
+        :type end: int
+        """
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+
+        row_bytes = self.size * self._layout.dtype.itemsize
+        first_page = start * row_bytes // mmap.PAGESIZE * mmap.PAGESIZE
+        last_page = end * row_bytes // mmap.PAGESIZE * mmap.PAGESIZE      # shared with the next rows, kept
+        if last_page > first_page:
+            self._mmap.madvise(mmap.MADV_DONTNEED, first_page, last_page - first_page)
+
+    def close(self):
+        """
+        Unmap the board file (removed if temporary), the board may not be used anymore.
+        """
+        self._packed = None
+        self._finalizer()
+
+    @property
+    def path(self):
+        return self._path
+
+
+class MappedRumorSpreadingSimulator(PackedRumorSpreadingSimulator):
+    """
+    Out of core simulator engine for 2D population worlds larger than the memory.
+
+    The bit-packed engine over a board in a memory-mapped file: every generation streams through the
+    file sequentially, band by band with a rolling halo, releasing the pages of every band when done.
+    The world is generated band by band straight into the file (the same world as the other engines).
+    """
+    def __init__(
+            self,
+            world_size=100,
+            population_density=0.8,
+            rumor_cool_down=5,
+            skepticism_dist=None,
+            directory=None,
+            seed=None
+    ):
+        """
+        :type world_size: int
+        :type population_density: float
+        :type rumor_cool_down: int
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :param directory: directory of the (temporary) board file, the system temporary directory by default
+        :type directory: str
+        :type seed: int
+        """
+        self._directory = directory
+        super().__init__(world_size, population_density, rumor_cool_down, skepticism_dist, seed)
+
+    def generate_new_age(self):
+        """
+        Generate new simulator with same parameters.
+
+        :rtype: MappedRumorSpreadingSimulator
+        """
+        return MappedRumorSpreadingSimulator(
+            world_size=self.world_board.size,
+            population_density=self.world_board.population_density,
+            rumor_cool_down=self.rumor_cool_down,
+            skepticism_dist=self.skepticism_dist,
+            directory=self._directory,
+            seed=self._random.spawn_seed()
+        )
+
+    def close(self):
+        """
+        Unmap and remove the board file.
+        """
+        self._world_board.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _generate_board(self, world_size, population_density):
+        board_file, path = tempfile.mkstemp(suffix=".board", dir=self._directory)
+        os.close(board_file)
+        return MappedWorldBoard2D.generate_board(
+            path, world_size, population_density, self._skepticism_dist, self._random, self._rumor_cool_down,
+            remove=True
+        )
+
+    @property
+    def directory(self):
+        return self._directory
+
+
+def _map_file(path):
+    with open(path, "r+b") as board_file:
+        board_mmap = mmap.mmap(board_file.fileno(), 0)
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        board_mmap.madvise(mmap.MADV_SEQUENTIAL)
+    return board_mmap
+
+
+def _unmap(board_mmap, path):
+    try:
+        board_mmap.close()
+    except BufferError:
+        pass                # still viewed by an array, the mapping goes with it
+    if path is not None:
+        os.remove(path)
@@ -0,0 +1,230 @@
+from collections import namedtuple
+
+import numpy as np
+
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+
+# Skepticism levels are stored as their index in SkepticismLevel, -1 marks an empty cell
+SKEPTICISM_LEVELS = tuple(SkepticismLevel)
+EMPTY_CELL = -1
+
+# Arrival times are the generation a person first heard the rumor, -1 marks a person never reached (or no person)
+ARRIVAL_DTYPE = np.int32
+NOT_ARRIVED = -1
+
+_SPREAD_PROBABILITY = np.array([level.value for level in SKEPTICISM_LEVELS] + [0.0])    # [-1] is the empty cell
+_DECREASED_SKEPTICISM = np.array([0, 0, 1, 2, EMPTY_CELL], dtype=np.int8)              # S1->S1, S2->S1, S3->S2, S4->S3
+
+_FRIENDS_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+StatePlanes = namedtuple(
+    "StatePlanes",
+    [
+        "skepticism",           # base skepticism level index (EMPTY_CELL for no person)
+        "curr_skepticism",      # current skepticism level index
+        "cool_down",            # current cool down until next spread
+        "rumor_count",          # number of times hearing rumor right now
+        "has_rumor",            # is keeping rumor right now
+        "ever_has_rumor",       # is getting rumor until now (all generations)
+        "should_spread",        # should spread rumor in current generation
+        "spread_before",        # some friend is evaluated before the person (static)
+        "spread_after",         # some friend is evaluated after the person (static)
+    ]
+)
+
+
+# Change of the population aggregates over a generation (see population_metrics.PopulationCounts)
+CountChanges = namedtuple(
+    "CountChanges",
+    [
+        "holding_rumor",        # persons keeping the rumor, next minus current generation
+        "cooling_down",         # persons in cool down, next minus current generation
+        "skepticism_counts",    # persons by current skepticism level, next minus current generation
+    ]
+)
+
+
+def cool_down_dtype(rumor_cool_down):
+    """
+    Smallest signed integer type able to hold the cool down counter.
+    """
+    return np.min_scalar_type(-max(rumor_cool_down, 1))
+
+
+def empty_planes(shape, rumor_cool_down, empty=np.empty):
+    """
+    State planes of a world without persons.
+
+    :type shape: tuple
+    :type rumor_cool_down: int
+    :param empty: allocator of every plane, called as numpy.empty(shape, dtype)
+    :type empty: callable
+    :rtype: StatePlanes
+    """
+    planes = StatePlanes(
+        skepticism=empty(shape, np.int8),
+        curr_skepticism=empty(shape, np.int8),
+        cool_down=empty(shape, cool_down_dtype(rumor_cool_down)),
+        rumor_count=empty(shape, np.int8),
+        has_rumor=empty(shape, bool),
+        ever_has_rumor=empty(shape, bool),
+        should_spread=empty(shape, bool),
+        spread_before=empty(shape, bool),
+        spread_after=empty(shape, bool),
+    )
+    for plane in planes:
+        plane.fill(0)
+    planes.skepticism.fill(EMPTY_CELL)
+    planes.curr_skepticism.fill(EMPTY_CELL)
+    return planes
+
+
+def grid_neighbour_sum(plane):
+    """
+    Sum the 8 neighbours of every cell over the two last axes (no wrap around).
+
+    :type plane: numpy.ndarray
+    :rtype: numpy.ndarray
+    """
+    counts = np.zeros(plane.shape, dtype=np.int8)
+    for row, col in _FRIENDS_OFFSETS:
+        target, source = _shifted_slices(row, col)
+        counts[target] += plane[source]
+
+    return counts
+
+
+def grid_evaluation_order(order, occupied):
+    """
+    Find, for every cell, whether an existing friend is evaluated before / after it.
+
+    The object engine evaluates persons one by one, and a spreader cool down depends on
+    whether its friends were evaluated before or after it, so the order must be kept.
+
+    :param order: evaluation rank (or key) of every cell
+    :param occupied: mask of cells holding a person
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    before = np.zeros(order.shape, dtype=bool)
+    after = np.zeros(order.shape, dtype=bool)
+    scratch = np.empty(order.shape, dtype=bool)
+    for row, col in _FRIENDS_OFFSETS:
+        target, source = _shifted_slices(row, col)
+        friend = scratch[target]
+        np.less(order[source], order[target], out=friend)
+        friend &= occupied[source]
+        before[target] |= friend
+        np.greater(order[source], order[target], out=friend)
+        friend &= occupied[source]
+        after[target] |= friend
+
+    before &= occupied
+    after &= occupied
+    return before, after
+
+
+def spread_probability(skepticism):
+    """
+    Spread probability of every cell by its skepticism level index (0 for an empty cell).
+
+    :type skepticism: numpy.ndarray
+    :rtype: numpy.ndarray
+    """
+    return _SPREAD_PROBABILITY[skepticism]
+
+
+def spreaders_mask(planes):
+    """
+    Persons spreading the rumor to all friends in the coming generation.
+
+    :type planes: StatePlanes
+    :rtype: numpy.ndarray
+    """
+    return planes.has_rumor & planes.should_spread & (planes.cool_down == 0)
+
+
+def advance(planes, spreaders, spreader_counts, rumor_cool_down, draws):
+    """
+    Evaluate a single generation, following the rules in person.py.
+
+    :param planes: state of the current generation
+    :param spreaders: spreaders_mask of the current generation
+    :param spreader_counts: number of spreading friends of every cell
+    :param rumor_cool_down: cool down time between spreading rumor again
+    :param draws: uniform [0, 1) numbers for the spread decisions
+    :returns: state of the next generation, mask of persons hearing the rumor for the first time and
+        the change of the population aggregates
+    :rtype: (StatePlanes, numpy.ndarray, CountChanges)
+    """
+    occupied = planes.skepticism != EMPTY_CELL
+    spread_cool_down = max(rumor_cool_down - 1, 0)
+
+    # notify_generation_start
+    cool_down = np.maximum(planes.cool_down - 1, 0).astype(planes.cool_down.dtype)
+    has_rumor = planes.has_rumor & (planes.rumor_count != 0)
+    restored = planes.rumor_count > 1
+    curr_skepticism = np.where(restored, planes.skepticism, planes.curr_skepticism)
+    should_spread = draws < spread_probability(curr_skepticism)
+
+    # A spreader which friend was evaluated before it already got its cool down when evaluated
+    spread_before = spreaders & planes.spread_before
+    evaluated_cool_down = np.where(spread_before, spread_cool_down, cool_down)
+
+    # notify_rumor
+    notified = occupied & (spreader_counts > 0) & (evaluated_cool_down == 0)
+    holding_rumor_change = np.count_nonzero(notified & ~has_rumor) - np.count_nonzero(planes.has_rumor & ~has_rumor)
+    has_rumor |= notified
+    decreased = notified & (spreader_counts > 1)
+    curr_skepticism = np.where(
+        decreased,
+        _DECREASED_SKEPTICISM[planes.skepticism],
+        curr_skepticism
+    ).astype(planes.curr_skepticism.dtype)
+    rumor_count = np.where(notified, spreader_counts, 0).astype(planes.rumor_count.dtype)
+    new_exposures = notified & ~planes.ever_has_rumor
+
+    # notify_spread_rumor (spreaders are not cooling down, spread_after is applied last)
+    spread_after = spreaders & planes.spread_after
+    cooling_down_change = -np.count_nonzero(planes.cool_down == 1)
+    if spread_cool_down:
+        cooling_down_change += np.count_nonzero(spread_before & ~spread_after)
+    if rumor_cool_down:
+        cooling_down_change += np.count_nonzero(spread_after)
+    cool_down[spread_before] = spread_cool_down
+    cool_down[spread_after] = rumor_cool_down
+
+    # Only the restored and decreased persons may change their current skepticism level
+    changed = np.flatnonzero(restored | decreased)
+    levels = len(SKEPTICISM_LEVELS)
+    skepticism_change = (
+        np.bincount(curr_skepticism.ravel()[changed], minlength=levels)
+        - np.bincount(planes.curr_skepticism.ravel()[changed], minlength=levels)
+    )
+
+    return planes._replace(
+        curr_skepticism=curr_skepticism,
+        cool_down=cool_down,
+        rumor_count=rumor_count,
+        has_rumor=has_rumor,
+        ever_has_rumor=planes.ever_has_rumor | notified,
+        should_spread=should_spread,
+    ), new_exposures, CountChanges(
+        holding_rumor=int(holding_rumor_change),
+        cooling_down=int(cooling_down_change),
+        skepticism_counts=tuple(skepticism_change.tolist()),
+    )
+
+
+def _shifted_slices(row, col):
+    """
+    Slices over the two last axes mapping cell (r, c) to its friend (r + row, c + col).
+    """
+    def axis(offset):
+        if offset > 0:
+            return slice(None, -offset), slice(offset, None)
+        if offset < 0:
+            return slice(-offset, None), slice(None, offset)
+        return slice(None), slice(None)
+
+    (target_row, source_row), (target_col, source_col) = axis(row), axis(col)
+    return (Ellipsis, target_row, target_col), (Ellipsis, source_row, source_col)
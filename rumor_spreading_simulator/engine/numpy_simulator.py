@@ -0,0 +1,455 @@
+import itertools
+from collections import namedtuple
+
+import numpy as np
+
+from rumor_spreading_simulator.engine import numpy_kernel, snapshot, world_generation
+from rumor_spreading_simulator.engine.numpy_kernel import ARRIVAL_DTYPE, EMPTY_CELL, NOT_ARRIVED, SKEPTICISM_LEVELS
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.population_metrics import (
+    add_counts, count_population, population_metrics, rumor_extinct
+)
+from rumor_spreading_simulator.engine.random_stream import CounterRandom
+from rumor_spreading_simulator.engine.world_board_2D import PersonWorldID
+
+PersonView = namedtuple("PersonView", ["has_rumor", "curr_skepticism", "ever_has_rumor"])
+
+
+class NumpyWorldBoard2D:
+    """
+    This class implemented the 2D population world as typed NumPy planes.
+    """
+    def __init__(self, planes, order):
+        """
+        :type planes: StatePlanes
+        :param order: evaluation key (or rank) of every cell, -1 for no person
+        :type order: numpy.ndarray
+        """
+        self._planes = planes                   # state planes of the current generation
+        self._order = order                     # evaluation key of every cell (-1 for no person)
+        self._population_size = int(np.count_nonzero(planes.skepticism != EMPTY_CELL))
+
+    @classmethod
+    def generate_board(cls, size, density, skepticism_dist, random_stream, rumor_cool_down, empty=np.empty):
+        """
+        Generate a new board based on basic population attributes (same layout as WorldBoard2D).
+
+        The layout is drawn and written into the planes band by band (see world_generation.place_band_persons),
+        so no full board temporary is made besides the planes themselves.
+
+        :type size: int
+        :type density: float
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        :type rumor_cool_down: int
+        :param empty: allocator of the state planes, called as numpy.empty(shape, dtype)
+        :type empty: callable
+        """
+        planes = numpy_kernel.empty_planes((size, size), rumor_cool_down, empty)
+        order = np.full((size, size), -1, dtype=np.int64)
+        bands = []
+        for rows, cells, levels, keys in world_generation.place_band_persons(
+                size, density, skepticism_dist, random_stream
+        ):
+            start, end = rows
+            planes.skepticism[start:end], order[start:end] = world_generation.layout_planes(
+                size, cells, levels, keys, start, end
+            )
+            planes.curr_skepticism[start:end] = planes.skepticism[start:end]
+            bands.append(rows)
+
+        # The evaluation order of a band needs the rows around it (halo), so it follows the whole layout
+        for start, end in bands:
+            halo_start, halo_end = max(start - 1, 0), min(end + 1, size)
+            spread_before, spread_after = numpy_kernel.grid_evaluation_order(
+                order[halo_start:halo_end], planes.skepticism[halo_start:halo_end] != EMPTY_CELL
+            )
+            planes.spread_before[start:end] = spread_before[start - halo_start:end - halo_start]
+            planes.spread_after[start:end] = spread_after[start - halo_start:end - halo_start]
+
+        return cls(planes, order)
+
+    @classmethod
+    def from_skepticism(cls, skepticism, order, rumor_cool_down):
+        """
+        Create a board with nobody holding the rumor.
+
+        :param skepticism: base skepticism level index of every cell
+        :param order: evaluation key (or rank) of every cell
+        :type rumor_cool_down: int
+        """
+        spread_before, spread_after = numpy_kernel.grid_evaluation_order(order, skepticism != EMPTY_CELL)
+        planes = numpy_kernel.empty_planes(skepticism.shape, rumor_cool_down)._replace(
+            skepticism=skepticism,
+            curr_skepticism=skepticism.copy(),
+            spread_before=spread_before,
+            spread_after=spread_after,
+        )
+        return cls(planes, order)
+
+    def plant_rumor(self, person_id):
+        """
+        Force a person to be the first one to spread the rumor for all friends.
+
+        :type person_id: PersonWorldID
+        """
+        self._planes.rumor_count[person_id] = 1
+        self._planes.has_rumor[person_id] = True
+        self._planes.ever_has_rumor[person_id] = True
+        self._planes.curr_skepticism[person_id] = SKEPTICISM_LEVELS.index(SkepticismLevel.S1)
+
+    def get_random_person(self, random_stream):
+        """
+        Get random person from the world.
+
+        Persons are drawn by their rank row by row, so every engine draws the same person.
+
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        :rtype: PersonWorldID
+        """
+        rank = random_stream.generator.integers(self.population_size)
+        return PersonWorldID(*divmod(int(np.flatnonzero(self._order.ravel() >= 0)[rank]), self.size))
+
+    def person_by_id(self, person_id):
+        """
+        Get a read only view of a person by person ID.
+
+        :type person_id: PersonWorldID
+        :rtype: PersonView
+        """
+        if not (0 <= person_id.row < self.size and 0 <= person_id.col < self.size):
+            return None
+
+        skepticism = self._planes.skepticism[person_id]
+        if skepticism == EMPTY_CELL:
+            return None
+
+        return PersonView(
+            has_rumor=bool(self._planes.has_rumor[person_id]),
+            curr_skepticism=SKEPTICISM_LEVELS[self._planes.curr_skepticism[person_id]],
+            ever_has_rumor=bool(self._planes.ever_has_rumor[person_id]),
+        )
+
+    def spreader_counts(self, spreaders):
+        """
+        Count the spreading friends of every cell.
+
+        :type spreaders: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        return numpy_kernel.grid_neighbour_sum(spreaders)
+
+    def world_iterator(self):
+        """
+        Iterate over all persons in the world (evaluation order).
+
+        :rtype: iter
+        """
+        cells = np.flatnonzero(self._order >= 0)
+        cells = cells[np.argsort(self._order.ravel()[cells])]
+        return (PersonWorldID(*divmod(int(cell), self.size)) for cell in cells)
+
+    @property
+    def cells(self):
+        """
+        Flat index (row * size + col) of every cell.
+
+        :rtype: numpy.ndarray
+        """
+        return np.arange(self.board_size).reshape(self._order.shape)
+
+    @property
+    def order(self):
+        return self._order
+
+    @property
+    def planes(self):
+        return self._planes
+
+    @planes.setter
+    def planes(self, planes):
+        self._planes = planes
+
+    @property
+    def size(self):
+        return self._order.shape[-1]
+
+    @property
+    def board_size(self):
+        return self._order.size
+
+    @property
+    def population_size(self):
+        return self._population_size
+
+    @property
+    def population_density(self):
+        return self.population_size / self.board_size
+
+
+class NumpyRumorSpreadingSimulator:
+    """
+    Vectorized simulator engine for spreading rumors in a 2D population world.
+
+    Keeps the exact rules of person.py, over a structure-of-arrays world board.
+    """
+    def __init__(
+            self,
+            world_size=100,
+            population_density=0.8,
+            rumor_cool_down=5,
+            skepticism_dist=None,
+            seed=None
+    ):
+        """
+        :type world_size: int
+        :type population_density: float
+        :type rumor_cool_down: int
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :type seed: int
+        """
+        if skepticism_dist is None:
+            skepticism_dist = {s: 1 / len(SkepticismLevel) for s in SkepticismLevel}
+
+        self._generation = 0                # Current generation number
+        self._rumor_count = 1               # Number of person the rumor spread to
+        self._rumors_spread_count = [1]     # Count of spread rumors per generation
+
+        self._rumor_cool_down = rumor_cool_down
+        self._skepticism_dist = skepticism_dist
+        self._random = CounterRandom(seed)
+        self._world_board = self._generate_board(world_size, population_density)
+
+        planes = self._world_board.planes
+        skepticism, should_spread = planes.skepticism.reshape(-1), planes.should_spread.reshape(-1)
+        for start in range(0, skepticism.size, world_generation.LAYOUT_BAND_CELLS):
+            band = slice(start, start + world_generation.LAYOUT_BAND_CELLS)
+            cells = np.arange(start, min(start + world_generation.LAYOUT_BAND_CELLS, skepticism.size))
+            should_spread[band] = self._random.uniform(0, cells) < numpy_kernel.spread_probability(skepticism[band])
+
+        # Force a random person to be the first one to spread the rumor for all friends
+        self._world_board.plant_rumor(self._world_board.get_random_person(self._random))
+        self._arrival_times = self._empty_plane(planes.skepticism.shape, ARRIVAL_DTYPE)
+        self._arrival_times.fill(NOT_ARRIVED)
+        self._arrival_times[planes.ever_has_rumor] = 0
+        self._recorder = None               # Trajectory recorder of the generations (opt-in)
+        self._population_counts = count_population(planes)     # Population aggregates of the current generation
+        self._extinction_generation = None  # First generation nobody holds the rumor nor cools down
+
+    @classmethod
+    def load_snapshot(cls, path, seed=None):
+        """
+        Resume a simulator from a snapshot file (see save_snapshot).
+
+        The state planes stay memory-mapped (copy-on-write) until evolved, so many forks share the file pages.
+
+        :type path: str
+        :param seed: seed of the continuation random stream, forks a new what-if run (saved stream if not given)
+        :type seed: int
+        :rtype: NumpyRumorSpreadingSimulator
+        """
+        return cls._from_snapshot(snapshot.load_snapshot(path), seed)
+
+    @classmethod
+    def _from_snapshot(cls, saved, seed=None):
+        """
+        Resume a simulator from a loaded snapshot (the board is created by _board_from_snapshot).
+
+        :type saved: rumor_spreading_simulator.engine.snapshot.Snapshot
+        :type seed: int
+        :rtype: NumpyRumorSpreadingSimulator
+        """
+        header = saved.header
+
+        simulator = cls.__new__(cls)
+        simulator._generation = header["generation"]
+        simulator._rumor_count = header["rumor_count"]
+        simulator._rumors_spread_count = saved.rumors_spread_count
+        simulator._rumor_cool_down = header["rumor_cool_down"]
+        simulator._skepticism_dist = snapshot.skepticism_dist_from_header(header)
+        simulator._random = snapshot.random_stream_from_header(header, seed)
+        simulator._world_board = cls._board_from_snapshot(saved)
+        simulator._arrival_times = saved.arrival_times
+        simulator._recorder = None
+        simulator._population_counts = count_population(saved.planes)
+        simulator._extinction_generation = header.get("extinction_generation")
+        simulator._update_extinction()
+        return simulator
+
+    @classmethod
+    def _board_from_snapshot(cls, saved):
+        return NumpyWorldBoard2D(saved.planes, saved.order)
+
+    def save_snapshot(self, path):
+        """
+        Save the simulator state to a compact binary snapshot file.
+
+        :type path: str
+        """
+        header = snapshot.simulator_header(self)
+        snapshot.save_snapshot(
+            path,
+            snapshot.Snapshot(
+                header, self._world_board.planes, self._world_board.order, self.rumors_spread_count,
+                self._arrival_times
+            )
+        )
+
+    def attach_recorder(self, recorder):
+        """
+        Record the current generation and every following one (None detaches).
+
+        :type recorder: rumor_spreading_simulator.engine.trajectory.TrajectoryRecorder
+        """
+        self._recorder = recorder
+        self._record_generation()
+
+    def generate_new_age(self):
+        """
+        Generate new simulator with same parameters.
+
+        :rtype: NumpyRumorSpreadingSimulator
+        """
+        return NumpyRumorSpreadingSimulator(
+            world_size=self.world_board.size,
+            population_density=self.world_board.population_density,
+            rumor_cool_down=self.rumor_cool_down,
+            skepticism_dist=self.skepticism_dist,
+            seed=self._random.spawn_seed()
+        )
+
+    def next_generation(self):
+        """
+        Simulate a single generation evaluation.
+        """
+        planes = self._world_board.planes
+        spreaders = numpy_kernel.spreaders_mask(planes)
+        new_planes, new_exposures, count_changes = numpy_kernel.advance(
+            planes,
+            spreaders,
+            self._world_board.spreader_counts(spreaders),
+            self.rumor_cool_down,
+            self._random.uniform(self._generation + 1, self._world_board.cells)
+        )
+
+        spread_rumor_count = int(np.count_nonzero(new_exposures))
+        if spread_rumor_count:
+            self._arrival_times[new_exposures] = self._generation + 1
+        self._rumor_count += spread_rumor_count
+        self._rumors_spread_count.append(spread_rumor_count)
+        self._world_board.planes = new_planes
+        self._population_counts = add_counts(self._population_counts, count_changes)
+        self._generation += 1
+        self._update_extinction()
+        self._record_generation()
+
+    def jump_generation(self, steps):
+        """
+        Simulate X steps generation evaluation.
+
+        Once the rumor is extinct the remaining generations are fast-forwarded, unless recorded.
+        """
+        for step in range(steps):
+            if self.extinct and self._recorder is None:
+                self._fast_forward(steps - step)
+                return
+
+            self.next_generation()
+
+    def _fast_forward(self, steps):
+        """
+        Skip X generations of an extinct world, in which nobody hears the rumor (see rumor_extinct).
+        """
+        self._rumors_spread_count.extend(itertools.repeat(0, steps))
+        self._generation += steps
+
+    def _update_extinction(self):
+        if self._extinction_generation is None and rumor_extinct(self._population_counts):
+            self._extinction_generation = self._generation
+
+    def _generate_board(self, world_size, population_density):
+        return NumpyWorldBoard2D.generate_board(
+            world_size, population_density, self._skepticism_dist, self._random, self._rumor_cool_down,
+            empty=self._empty_plane
+        )
+
+    def _empty_plane(self, shape, dtype):
+        """
+        Allocate a board plane (state planes and arrival times), engines keeping their planes elsewhere override it.
+
+        :type shape: tuple
+        :type dtype: numpy.dtype
+        :rtype: numpy.ndarray
+        """
+        return np.empty(shape, dtype)
+
+    def _record_generation(self):
+        if self._recorder is not None:
+            self._recorder.record(self._generation, self._world_board.planes)
+
+    @property
+    def population_metrics(self):
+        """
+        Population aggregates of the current generation, updated with the changes of every generation step.
+
+        :rtype: rumor_spreading_simulator.engine.population_metrics.PopulationMetrics
+        """
+        return population_metrics(self, self._population_counts)
+
+    @property
+    def arrival_times(self):
+        """
+        Generation every cell first heard the rumor (NOT_ARRIVED if never, or no person).
+
+        :rtype: numpy.ndarray
+        """
+        return self._arrival_times
+
+    @property
+    def extinct(self):
+        return self._extinction_generation is not None
+
+    @property
+    def extinction_generation(self):
+        """
+        First generation nobody holds the rumor nor cools down (None while the rumor is alive).
+
+        :rtype: int
+        """
+        return self._extinction_generation
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def seed(self):
+        return self._random.seed
+
+    @property
+    def random_stream(self):
+        return self._random
+
+    @property
+    def world_board(self):
+        return self._world_board
+
+    @property
+    def skepticism_dist(self):
+        return self._skepticism_dist
+
+    @property
+    def rumor_cool_down(self):
+        return self._rumor_cool_down
+
+    @property
+    def rumor_count(self):
+        return self._rumor_count
+
+    @property
+    def rumor_relative(self):
+        return self.rumor_count / self.world_board.population_size
+
+    @property
+    def rumors_spread_count(self):
+        return self._rumors_spread_count
@@ -0,0 +1,101 @@
+from collections import namedtuple
+
+import numpy as np
+
+from rumor_spreading_simulator.engine import numpy_kernel
+from rumor_spreading_simulator.engine.numpy_kernel import EMPTY_CELL, StatePlanes
+
+PackedField = namedtuple("PackedField", ["shift", "bits"])
+PackedLayout = namedtuple("PackedLayout", ["fields", "dtype", "rumor_cool_down"])
+
+# Fixed cell bits, the cool down counter takes the bits above them (as many as rumor_cool_down needs)
+_FIXED_FIELDS = {
+    "occupied": PackedField(0, 1),
+    "skepticism": PackedField(1, 2),            # base skepticism level index
+    "curr_skepticism": PackedField(3, 2),
+    "rumor_count": PackedField(5, 2),           # saturates at 3, the rules only tell 0, 1 and more apart
+    "has_rumor": PackedField(7, 1),
+    "ever_has_rumor": PackedField(8, 1),
+    "should_spread": PackedField(9, 1),
+    "spread_before": PackedField(10, 1),
+    "spread_after": PackedField(11, 1),
+}
+_COOL_DOWN_SHIFT = 12
+
+
+def packed_layout(rumor_cool_down):
+    """
+    Bit layout of a packed cell: 12 fixed bits and a cool down counter wide enough for rumor_cool_down.
+
+    A cell takes 2 bytes while rumor_cool_down <= 15, and 4 bytes above it.
+
+    :type rumor_cool_down: int
+    :rtype: PackedLayout
+    """
+    cool_down_bits = max(rumor_cool_down, 1).bit_length()
+    total_bits = _COOL_DOWN_SHIFT + cool_down_bits
+    if total_bits > 32:
+        raise ValueError(f"rumor cool down {rumor_cool_down} does not fit a packed cell")
+
+    fields = dict(_FIXED_FIELDS, cool_down=PackedField(_COOL_DOWN_SHIFT, cool_down_bits))
+    return PackedLayout(fields=fields, dtype=np.dtype(np.uint16 if total_bits <= 16 else np.uint32),
+                        rumor_cool_down=rumor_cool_down)
+
+
+def pack(planes, layout):
+    """
+    Pack state planes into a cell array.
+
+    :type planes: StatePlanes
+    :type layout: PackedLayout
+    :rtype: numpy.ndarray
+    """
+    occupied = planes.skepticism != EMPTY_CELL
+    values = dict(
+        planes._asdict(),
+        occupied=occupied,
+        skepticism=np.where(occupied, planes.skepticism, 0),
+        curr_skepticism=np.where(occupied, planes.curr_skepticism, 0),
+        rumor_count=np.minimum(planes.rumor_count, 3),
+    )
+
+    packed = np.zeros(occupied.shape, dtype=layout.dtype)
+    for name, field in layout.fields.items():
+        packed |= values[name].astype(layout.dtype) << layout.dtype.type(field.shift)
+
+    return packed
+
+
+def unpack(packed, layout):
+    """
+    Unpack a cell array into state planes (the dtypes of the NumPy engine).
+
+    :type packed: numpy.ndarray
+    :type layout: PackedLayout
+    :rtype: StatePlanes
+    """
+    def field(name):
+        shift, bits = layout.fields[name]
+        return (packed >> layout.dtype.type(shift)) & layout.dtype.type(2 ** bits - 1)
+
+    occupied = field("occupied").astype(bool)
+    return StatePlanes(
+        skepticism=np.where(occupied, field("skepticism"), EMPTY_CELL).astype(np.int8),
+        curr_skepticism=np.where(occupied, field("curr_skepticism"), EMPTY_CELL).astype(np.int8),
+        cool_down=field("cool_down").astype(numpy_kernel.cool_down_dtype(layout.rumor_cool_down)),
+        rumor_count=field("rumor_count").astype(np.int8),
+        has_rumor=field("has_rumor").astype(bool),
+        ever_has_rumor=field("ever_has_rumor").astype(bool),
+        should_spread=field("should_spread").astype(bool),
+        spread_before=field("spread_before").astype(bool),
+        spread_after=field("spread_after").astype(bool),
+    )
+
+
+def occupied_mask(packed, layout):
+    """
+    Mask of the cells holding a person.
+
+    :rtype: numpy.ndarray
+    """
+    return (packed & layout.dtype.type(1 << layout.fields["occupied"].shift)).astype(bool)
@@ -0,0 +1,501 @@
+import itertools
+
+import numpy as np
+
+from rumor_spreading_simulator.engine import numpy_kernel, packed_kernel, world_generation
+from rumor_spreading_simulator.engine.numpy_kernel import ARRIVAL_DTYPE, NOT_ARRIVED, SKEPTICISM_LEVELS
+from rumor_spreading_simulator.engine.numpy_simulator import PersonView
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.population_metrics import (
+    add_counts, count_population, population_metrics, rumor_extinct
+)
+from rumor_spreading_simulator.engine.random_stream import CounterRandom
+from rumor_spreading_simulator.engine.world_board_2D import PersonWorldID
+
+# Cells unpacked at once when evaluating a band of rows
+_BAND_CELLS = 2 ** 20
+
+
+class PackedWorldBoard2D:
+    """
+    This class implemented the 2D population world as a single bit-packed cell array.
+
+    A cell takes 2 bytes (4 bytes when rumor_cool_down > 15), see packed_kernel.packed_layout.
+    The evaluation order is kept only as the spread_before / spread_after bits of every cell.
+    """
+    def __init__(self, packed, layout, population_size=None):
+        """
+        :param packed: packed cell array
+        :type packed: numpy.ndarray
+        :type layout: rumor_spreading_simulator.engine.packed_kernel.PackedLayout
+        :param population_size: number of persons in the board (counted if not given)
+        :type population_size: int
+        """
+        self._packed = packed                                                           # packed cells
+        self._layout = layout                                                           # bit layout of a cell
+        self._population_size = population_size                                         # number of persons
+        if population_size is None:
+            self._population_size = sum(self.count_population().skepticism_counts)
+
+    @classmethod
+    def generate_board(cls, size, density, skepticism_dist, random_stream, rumor_cool_down):
+        """
+        Generate a new board based on basic population attributes (same layout as WorldBoard2D).
+
+        The layout is drawn and packed one band of rows at a time, so the setup memory is bounded by a band.
+
+        :type size: int
+        :type density: float
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        :type rumor_cool_down: int
+        :returns: the board and the ID of the first person to spread the rumor
+        :rtype: (PackedWorldBoard2D, PersonWorldID)
+        """
+        layout = packed_kernel.packed_layout(rumor_cool_down)
+        world_board = cls(np.empty((size, size), dtype=layout.dtype), layout, population_size=0)
+        return world_board, world_board._pack_new_world(density, skepticism_dist, random_stream)
+
+    def plant_rumor(self, person_id):
+        """
+        Force a person to be the first one to spread the rumor for all friends.
+
+        :type person_id: PersonWorldID
+        """
+        cell = self._packed[person_id.row:person_id.row + 1, person_id.col:person_id.col + 1]
+        planes = packed_kernel.unpack(cell, self._layout)
+        planes.rumor_count[...] = 1
+        planes.has_rumor[...] = True
+        planes.ever_has_rumor[...] = True
+        planes.curr_skepticism[...] = SKEPTICISM_LEVELS.index(SkepticismLevel.S1)
+        cell[...] = packed_kernel.pack(planes, self._layout)
+
+    def person_by_id(self, person_id):
+        """
+        Get a read only view of a person by person ID.
+
+        :type person_id: PersonWorldID
+        :rtype: PersonView
+        """
+        if not (0 <= person_id.row < self.size and 0 <= person_id.col < self.size):
+            return None
+
+        planes = packed_kernel.unpack(self._packed[person_id], self._layout)
+        if planes.skepticism == numpy_kernel.EMPTY_CELL:
+            return None
+
+        return PersonView(
+            has_rumor=bool(planes.has_rumor),
+            curr_skepticism=SKEPTICISM_LEVELS[planes.curr_skepticism],
+            ever_has_rumor=bool(planes.ever_has_rumor),
+        )
+
+    def world_iterator(self):
+        """
+        Iterate over all persons in the world (row by row).
+
+        :rtype: iter
+        """
+        for start, end in self.bands():
+            occupied = packed_kernel.occupied_mask(self._packed[start:end], self._layout)
+            cells = np.flatnonzero(occupied) + start * self.size
+            yield from (PersonWorldID(*divmod(cell, self.size)) for cell in cells.tolist())
+
+    def count_population(self):
+        """
+        Count the population aggregates of the board, band by band.
+
+        :rtype: rumor_spreading_simulator.engine.population_metrics.PopulationCounts
+        """
+        band_population_counts = []
+        for start, end in self.bands():
+            band_population_counts.append(count_population(packed_kernel.unpack(self._packed[start:end], self._layout)))
+            self.release_rows(start, end)
+
+        return add_counts(*band_population_counts)
+
+    def _pack_new_world(self, density, skepticism_dist, random_stream):
+        """
+        Draw a new world layout band by band (see world_generation.place_band_persons) and pack it into the board.
+
+        A band is packed once the first row of the next one is drawn (lower halo row), and released when packed.
+
+        :type density: float
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        :returns: the ID of the first person to spread the rumor
+        :rtype: PersonWorldID
+        """
+        size = self.size
+        band_planes = (
+            (rows, world_generation.layout_planes(size, cells, levels, keys, *rows))
+            for rows, cells, levels, keys in world_generation.place_band_persons(
+                size, density, skepticism_dist, random_stream
+            )
+        )
+        band_populations = []
+        following = next(band_planes)
+        upper_rows = tuple(plane[:0] for plane in following[1])                 # no row above the first band
+        while following is not None:
+            (start, end), planes = following
+            following = next(band_planes, None)
+            lower_planes = following[1] if following is not None else tuple(plane[:0] for plane in planes)
+            lower_rows = tuple(plane[:1] for plane in lower_planes)
+
+            skepticism, order = (
+                np.concatenate((upper, plane, lower)) for upper, plane, lower in zip(upper_rows, planes, lower_rows)
+            )
+            band = slice(len(upper_rows[0]), len(upper_rows[0]) + end - start)
+            self._packed[start:end] = pack_new_band(skepticism, order, band, start, random_stream, self._layout)
+            self.release_rows(start, end)
+
+            band_populations.append(int(np.count_nonzero(planes[0] != numpy_kernel.EMPTY_CELL)))
+            upper_rows = tuple(plane[-1:] for plane in planes)
+
+        self._population_size = sum(band_populations)
+        root_rank = random_stream.generator.integers(self._population_size)
+        return self._person_by_rank(root_rank, band_populations)
+
+    def _person_by_rank(self, rank, band_populations):
+        """
+        Find the person of a given rank, persons ranked row by row.
+
+        :param band_populations: number of persons in every layout band
+        :type band_populations: list[int]
+        :rtype: PersonWorldID
+        """
+        band_rows = world_generation.layout_band_rows(self.size)
+        for start, band_population in zip(range(0, self.size, band_rows), band_populations):
+            if rank < band_population:
+                end = min(start + band_rows, self.size)
+                occupied = packed_kernel.occupied_mask(self._packed[start:end], self._layout)
+                return PersonWorldID(*divmod(int(np.flatnonzero(occupied)[rank]) + start * self.size, self.size))
+            rank -= band_population
+
+        raise IndexError("person rank out of the board population")
+
+    def release_rows(self, start, end):
+        """
+        Hint that the rows start <= row < end are done with for the current generation (nothing to do in memory).
+
+        :type start: int
+        :type end: int
+        """
+
+    def bands(self):
+        """
+        Split the board into bands of rows evaluated at once.
+
+        :returns: (start, end) rows of every band
+        :rtype: iter[(int, int)]
+        """
+        band_rows = rows_per_band(self.size)
+        return ((start, min(start + band_rows, self.size)) for start in range(0, self.size, band_rows))
+
+    @property
+    def packed(self):
+        return self._packed
+
+    @property
+    def layout(self):
+        return self._layout
+
+    @property
+    def planes(self):
+        """
+        Unpacked state planes of the whole board (a copy, for inspection).
+
+        :rtype: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+        """
+        return packed_kernel.unpack(self._packed, self._layout)
+
+    @property
+    def bytes_per_cell(self):
+        return self._layout.dtype.itemsize
+
+    @property
+    def size(self):
+        return self._packed.shape[-1]
+
+    @property
+    def board_size(self):
+        return self._packed.size
+
+    @property
+    def population_size(self):
+        return self._population_size
+
+    @property
+    def population_density(self):
+        return self.population_size / self.board_size
+
+
+class PackedRumorSpreadingSimulator:
+    """
+    Bit-packed simulator engine for memory bound huge 2D population worlds.
+
+    The world is kept packed (2 bytes per cell), and every generation is evaluated in place,
+    one band of rows at a time: a band is unpacked, advanced by the NumPy kernel and packed back.
+    The spreaders of the row above a band are kept from the previous band (rolling halo), as that
+    row is already overwritten by its next generation. A run matches the NumPy engine with the same seed.
+    """
+    def __init__(
+            self,
+            world_size=100,
+            population_density=0.8,
+            rumor_cool_down=5,
+            skepticism_dist=None,
+            seed=None
+    ):
+        """
+        :type world_size: int
+        :type population_density: float
+        :type rumor_cool_down: int
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :type seed: int
+        """
+        if skepticism_dist is None:
+            skepticism_dist = {s: 1 / len(SkepticismLevel) for s in SkepticismLevel}
+
+        self._generation = 0                # Current generation number
+        self._rumor_count = 1               # Number of person the rumor spread to
+        self._rumors_spread_count = [1]     # Count of spread rumors per generation
+
+        self._rumor_cool_down = rumor_cool_down
+        self._skepticism_dist = skepticism_dist
+        self._random = CounterRandom(seed)
+        self._world_board, root_id = self._generate_board(world_size, population_density)
+
+        # Force a random person to be the first one to spread the rumor for all friends
+        self._world_board.plant_rumor(root_id)
+        self._recorder = None               # Trajectory recorder of the generations (opt-in)
+
+        # Cells first hearing the rumor by generation, kept sparse (the arrival times plane would take 4 bytes per cell)
+        self._arrivals = [(0, np.array([root_id.row * world_size + root_id.col]))]
+
+        # Population aggregates of the current generation, counted band by band
+        self._population_counts = self._world_board.count_population()
+        self._extinction_generation = None  # First generation nobody holds the rumor nor cools down
+
+    def save_snapshot(self, path):
+        """
+        The packed engines do not save snapshots (resumable snapshots are saved by the object, NumPy and tiled engines).
+
+        :type path: str
+        :raises NotImplementedError: always
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not save snapshots, run the numpy or tiled engine to checkpoint a run"
+        )
+
+    def attach_recorder(self, recorder):
+        """
+        Record the current generation and every following one (None detaches).
+
+        :type recorder: rumor_spreading_simulator.engine.trajectory.TrajectoryRecorder
+        """
+        self._recorder = recorder
+        self._record_generation()
+
+    def generate_new_age(self):
+        """
+        Generate new simulator with same parameters.
+
+        :rtype: PackedRumorSpreadingSimulator
+        """
+        return PackedRumorSpreadingSimulator(
+            world_size=self.world_board.size,
+            population_density=self.world_board.population_density,
+            rumor_cool_down=self.rumor_cool_down,
+            skepticism_dist=self.skepticism_dist,
+            seed=self._random.spawn_seed()
+        )
+
+    def next_generation(self):
+        """
+        Simulate a single generation evaluation, in place over the packed board.
+        """
+        packed = self._world_board.packed
+        layout = self._world_board.layout
+        size = self._world_board.size
+
+        spread_rumor_count = 0
+        band_count_changes = []
+        band_arrivals = []
+        upper_spreaders = np.zeros(size, dtype=bool)      # spreaders of the row above the band, before its update
+        for start, end in self._world_board.bands():
+            halo_end = min(end + 1, size)
+            planes = packed_kernel.unpack(packed[start:halo_end], layout)
+            spreaders = numpy_kernel.spreaders_mask(planes)
+
+            bordered_spreaders = np.zeros((halo_end - start + 1, size), dtype=bool)
+            bordered_spreaders[0] = upper_spreaders
+            bordered_spreaders[1:] = spreaders
+            band_rows = end - start
+
+            new_planes, new_exposures, count_changes = numpy_kernel.advance(
+                numpy_kernel.StatePlanes(*(plane[:band_rows] for plane in planes)),
+                spreaders[:band_rows],
+                numpy_kernel.grid_neighbour_sum(bordered_spreaders)[1:band_rows + 1],
+                self.rumor_cool_down,
+                self._random.uniform(self._generation + 1, band_cells(start, end, size))
+            )
+            packed[start:end] = packed_kernel.pack(new_planes, layout)
+            spread_rumor_count += int(np.count_nonzero(new_exposures))
+            band_arrivals.append(band_cells(start, end, size)[new_exposures])
+            band_count_changes.append(count_changes)
+            upper_spreaders = spreaders[band_rows - 1]
+            self._world_board.release_rows(start, end)
+
+        if spread_rumor_count:
+            self._arrivals.append((self._generation + 1, np.concatenate(band_arrivals)))
+        self._rumor_count += spread_rumor_count
+        self._rumors_spread_count.append(spread_rumor_count)
+        self._population_counts = add_counts(self._population_counts, *band_count_changes)
+        self._generation += 1
+        self._update_extinction()
+        self._record_generation()
+
+    def jump_generation(self, steps):
+        """
+        Simulate X steps generation evaluation.
+
+        Once the rumor is extinct the remaining generations are fast-forwarded, unless recorded.
+        """
+        for step in range(steps):
+            if self.extinct and self._recorder is None:
+                self._fast_forward(steps - step)
+                return
+
+            self.next_generation()
+
+    def _fast_forward(self, steps):
+        """
+        Skip X generations of an extinct world, in which nobody hears the rumor (see rumor_extinct).
+        """
+        self._rumors_spread_count.extend(itertools.repeat(0, steps))
+        self._generation += steps
+
+    def _update_extinction(self):
+        if self._extinction_generation is None and rumor_extinct(self._population_counts):
+            self._extinction_generation = self._generation
+
+    def _generate_board(self, world_size, population_density):
+        return PackedWorldBoard2D.generate_board(
+            world_size, population_density, self._skepticism_dist, self._random, self._rumor_cool_down
+        )
+
+    def _record_generation(self):
+        if self._recorder is not None:
+            self._recorder.record(self._generation, self._world_board.planes)
+
+    @property
+    def population_metrics(self):
+        """
+        Population aggregates of the current generation, updated with the changes of every generation step.
+
+        :rtype: rumor_spreading_simulator.engine.population_metrics.PopulationMetrics
+        """
+        return population_metrics(self, self._population_counts)
+
+    @property
+    def arrival_times(self):
+        """
+        Generation every cell first heard the rumor (NOT_ARRIVED if never, or no person), built from the arrivals.
+
+        :rtype: numpy.ndarray
+        """
+        arrival_times = np.full(self._world_board.board_size, NOT_ARRIVED, dtype=ARRIVAL_DTYPE)
+        for generation, cells in self._arrivals:
+            arrival_times[cells] = generation
+        return arrival_times.reshape(self._world_board.size, self._world_board.size)
+
+    @property
+    def extinct(self):
+        return self._extinction_generation is not None
+
+    @property
+    def extinction_generation(self):
+        """
+        First generation nobody holds the rumor nor cools down (None while the rumor is alive).
+
+        :rtype: int
+        """
+        return self._extinction_generation
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def seed(self):
+        return self._random.seed
+
+    @property
+    def random_stream(self):
+        return self._random
+
+    @property
+    def world_board(self):
+        return self._world_board
+
+    @property
+    def skepticism_dist(self):
+        return self._skepticism_dist
+
+    @property
+    def rumor_cool_down(self):
+        return self._rumor_cool_down
+
+    @property
+    def rumor_count(self):
+        return self._rumor_count
+
+    @property
+    def rumor_relative(self):
+        return self.rumor_count / self.world_board.population_size
+
+    @property
+    def rumors_spread_count(self):
+        return self._rumors_spread_count
+
+
+def pack_new_band(skepticism, order, band, start, random_stream, layout):
+    """
+    Pack a band of rows of a new world (nobody holding the rumor).
+
+    :param skepticism: base skepticism level index of the band rows and the rows around it (halo)
+    :param order: evaluation rank (or evaluation key) of the same rows
+    :param band: band rows in skepticism and order
+    :type band: slice
+    :param start: first band row in the world
+    :type start: int
+    :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+    :type layout: rumor_spreading_simulator.engine.packed_kernel.PackedLayout
+    :rtype: numpy.ndarray
+    """
+    size = skepticism.shape[-1]
+    spread_before, spread_after = numpy_kernel.grid_evaluation_order(order, skepticism != numpy_kernel.EMPTY_CELL)
+    band_skepticism = skepticism[band]
+    planes = numpy_kernel.empty_planes(band_skepticism.shape, layout.rumor_cool_down)._replace(
+        skepticism=band_skepticism,
+        curr_skepticism=band_skepticism,
+        should_spread=(
+            random_stream.uniform(0, band_cells(start, start + len(band_skepticism), size))
+            < numpy_kernel.spread_probability(band_skepticism)
+        ),
+        spread_before=spread_before[band],
+        spread_after=spread_after[band],
+    )
+    return packed_kernel.pack(planes, layout)
+
+
+def rows_per_band(size):
+    return max(_BAND_CELLS // size, 1)
+
+
+def band_cells(start, end, size):
+    """
+    Flat cell indices of the rows start <= row < end.
+    """
+    return np.arange(start * size, end * size).reshape(end - start, size)
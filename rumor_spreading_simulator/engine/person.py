@@ -1,24 +1,86 @@
 import enum
-import random
+from collections import namedtuple
+
+PersonState = namedtuple(
+    "PersonState",
+    [
+        "cool_down",
+        "rumor_count",
+        "has_rumor",
+        "ever_has_rumor",
+        "base_skepticism",
+        "curr_skepticism",
+        "should_spread",
+    ]
+)
 
 
 class Person:
     """
     This class describes a single people state in the population
     """
-    def __init__(self, skepticism):
-        self._current_cool_down = 0                                 # current cool down until next spread
-        self._rumor_count = 0                                       # number of times hearing rumor right now
-        self._has_rumor = False                                     # is keeping rumor right now
-        self._ever_has_rumor = False                                # is getting rumor until now (all generations)
+    __slots__ = (
+        "_current_cool_down",
+        "_rumor_count",
+        "_has_rumor",
+        "_ever_has_rumor",
+        "_base_skepticism",
+        "_current_skepticism",
+        "_should_spread",
+    )
+
+    def __init__(self, skepticism, spread_draw):
+        """
+        :type skepticism: SkepticismLevel
+        :param spread_draw: uniform [0, 1) draw of the spread decision in current generation
+        :type spread_draw: float
+        """
+        self._current_cool_down = 0                                           # current cool down until next spread
+        self._rumor_count = 0                                                 # number of times hearing rumor right now
+        self._has_rumor = False                                               # is keeping rumor right now
+        self._ever_has_rumor = False                                          # is getting rumor until now (all generations)
 
-        self._base_skepticism = skepticism                          # basic skepticism level
-        self._current_skepticism = skepticism                       # current skepticism level
-        self._should_spread = self._randomize_spread_decision()     # should spread rumor in current generation
+        self._base_skepticism = skepticism                                    # basic skepticism level
+        self._current_skepticism = skepticism                                 # current skepticism level
+        self._should_spread = self._randomize_spread_decision(spread_draw)    # should spread rumor in current generation
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Create a person in a given state.
+
+        :type state: PersonState
+        :rtype: Person
+        """
+        person = cls(state.base_skepticism, 1.0)
+        person._current_cool_down = state.cool_down
+        person._rumor_count = state.rumor_count
+        person._has_rumor = state.has_rumor
+        person._ever_has_rumor = state.ever_has_rumor
+        person._current_skepticism = state.curr_skepticism
+        person._should_spread = state.should_spread
+        return person
+
+    def load_state(self, other):
+        """
+        Overwrite the person state with the state of another person.
 
-    def notify_generation_start(self):
+        :type other: Person
+        """
+        self._current_cool_down = other._current_cool_down
+        self._rumor_count = other._rumor_count
+        self._has_rumor = other._has_rumor
+        self._ever_has_rumor = other._ever_has_rumor
+        self._base_skepticism = other._base_skepticism
+        self._current_skepticism = other._current_skepticism
+        self._should_spread = other._should_spread
+
+    def notify_generation_start(self, spread_draw):
         """
         Notify the person that a new generation have started.
+
+        :param spread_draw: uniform [0, 1) draw of the spread decision in the new generation
+        :type spread_draw: float
         """
         # Update cool down time
         if self._current_cool_down != 0:
@@ -29,8 +91,8 @@ class Person:
         elif self._rumor_count > 1:
             self._current_skepticism = self._base_skepticism    # Decrease skepticism - more than 1 friend spread me
 
-        self._rumor_count = 0                                       # Initialize rumor count
-        self._should_spread = self._randomize_spread_decision()     # Regenerating spread probability
+        self._rumor_count = 0                                                 # Initialize rumor count
+        self._should_spread = self._randomize_spread_decision(spread_draw)    # Regenerating spread probability
 
     def should_spread_rumor(self):
         """
@@ -78,13 +140,30 @@ class Person:
         """
         self._current_skepticism = SkepticismLevel.S1
 
-    def _randomize_spread_decision(self):
-        return random.random() < self._current_skepticism.value
+    def _randomize_spread_decision(self, spread_draw):
+        # _value_ is the plain member attribute, Enum.value goes through a much slower descriptor
+        return spread_draw < self._current_skepticism._value_
+
+    @property
+    def state(self):
+        return PersonState(
+            cool_down=self._current_cool_down,
+            rumor_count=self._rumor_count,
+            has_rumor=self._has_rumor,
+            ever_has_rumor=self._ever_has_rumor,
+            base_skepticism=self._base_skepticism,
+            curr_skepticism=self._current_skepticism,
+            should_spread=self._should_spread,
+        )
 
     @property
     def has_rumor(self):
         return self._has_rumor
 
+    @property
+    def cool_down(self):
+        return self._current_cool_down
+
     @property
     def curr_skepticism(self):
         return self._current_skepticism
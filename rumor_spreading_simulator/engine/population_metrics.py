@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+import numpy as np
+
+from rumor_spreading_simulator.engine.numpy_kernel import SKEPTICISM_LEVELS
+
+# Aggregates kept up to date by the engines as the persons change, so reporting them never scans the board
+PopulationCounts = namedtuple(
+    "PopulationCounts",
+    [
+        "holding_rumor",        # persons keeping the rumor right now
+        "cooling_down",         # persons in cool down
+        "skepticism_counts",    # persons by current skepticism level (SkepticismLevel order)
+    ]
+)
+
+PopulationMetrics = namedtuple(
+    "PopulationMetrics",
+    [
+        "generation",
+        "population_size",
+        "rumor_count",          # persons the rumor ever spread to
+        "holding_rumor",
+        "cooling_down",
+        "skepticism_counts",
+    ]
+)
+
+
+def count_population(planes):
+    """
+    Count the aggregates of a set of state planes (a vectorized pass, for the NumPy engines generation step).
+
+    :type planes: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+    :rtype: PopulationCounts
+    """
+    # Shift the level indices so that empty cells (-1) land in the dropped bin 0
+    skepticism_counts = np.bincount((planes.curr_skepticism + 1).ravel(), minlength=len(SKEPTICISM_LEVELS) + 1)
+    return PopulationCounts(
+        holding_rumor=int(np.count_nonzero(planes.has_rumor)),
+        cooling_down=int(np.count_nonzero(planes.cool_down)),
+        skepticism_counts=tuple(skepticism_counts[1:].tolist()),
+    )
+
+
+def add_counts(*population_counts):
+    """
+    Sum the aggregates of parts of a world (strips, bands).
+
+    :type population_counts: PopulationCounts
+    :rtype: PopulationCounts
+    """
+    return PopulationCounts(
+        holding_rumor=sum(counts.holding_rumor for counts in population_counts),
+        cooling_down=sum(counts.cooling_down for counts in population_counts),
+        skepticism_counts=tuple(
+            sum(level_counts) for level_counts in zip(*(counts.skepticism_counts for counts in population_counts))
+        ),
+    )
+
+
+def population_metrics(simulator, population_counts):
+    """
+    Metrics record of the current generation of a simulator.
+
+    :type population_counts: PopulationCounts
+    :rtype: PopulationMetrics
+    """
+    return PopulationMetrics(
+        generation=simulator.generation,
+        population_size=simulator.world_board.population_size,
+        rumor_count=int(simulator.rumor_count),
+        **population_counts._asdict()
+    )
+
+
+def rumor_extinct(population_counts):
+    """
+    Whether nobody holds the rumor nor cools down.
+
+    From then on nobody can spread or hear the rumor again, and the world state never changes
+    (but the spread decisions, which matter to rumor holders only).
+
+    :type population_counts: PopulationCounts
+    :rtype: bool
+    """
+    return population_counts.holding_rumor == 0 and population_counts.cooling_down == 0
@@ -0,0 +1,106 @@
+import numpy as np
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+
+class CounterRandom:
+    """
+    Seeded random stream of a simulator.
+
+    Spread decisions are counter based: the draw of a cell in a generation depends only on the seed,
+    the generation and the cell index, so draws may be done eagerly, lazily, in bulk or split across
+    processes and still give the same results.
+    """
+    def __init__(self, seed=None):
+        """
+        :param seed: simulator seed (a random one is chosen if not given)
+        :type seed: int
+        """
+        seed_sequence = np.random.SeedSequence(seed)
+        self._seed = seed_sequence.entropy                                          # seed of the stream
+        self._key = seed_sequence.generate_state(1, dtype=np.uint64)[0]             # key of the counter draws
+        self._generator = np.random.default_rng(seed_sequence)                      # world setup generator
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restore a random stream from its state.
+
+        :type state: dict
+        :rtype: CounterRandom
+        """
+        random_stream = cls(state["seed"])
+        random_stream._generator.bit_generator.state = state["generator"]
+        return random_stream
+
+    def uniform(self, generation, cells):
+        """
+        Uniform [0, 1) draws of the given cells in a generation.
+
+        :type generation: int
+        :param cells: flat cell indices (row * size + col)
+        :type cells: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        return counter_uniform(self._key, generation, cells)
+
+    def spawn_seed(self):
+        """
+        Draw a seed for a new independent simulator.
+
+        :rtype: int
+        """
+        return int(self._generator.integers(2 ** 63))
+
+    @property
+    def state(self):
+        return {"seed": self._seed, "generator": self._generator.bit_generator.state}
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def key(self):
+        return self._key
+
+    @property
+    def generator(self):
+        return self._generator
+
+
+def spawn_seeds(seed, count):
+    """
+    Independent seeds spawned from a single seed.
+
+    :type seed: int
+    :type count: int
+    :rtype: list[int]
+    """
+    return [
+        int(seed_sequence.generate_state(1, dtype=np.uint64)[0])
+        for seed_sequence in np.random.SeedSequence(seed).spawn(count)
+    ]
+
+
+def counter_uniform(key, generation, cells):
+    """
+    Uniform [0, 1) draws of (key, generation, cell) counters (SplitMix64 over the counters).
+
+    :param key: stream key, or an array of keys broadcast against the cells
+    :type generation: int
+    :type cells: numpy.ndarray
+    :rtype: numpy.ndarray
+    """
+    with np.errstate(over='ignore'):
+        stream = _mix(np.asarray(key, dtype=np.uint64) + np.uint64(generation) * _GOLDEN_GAMMA)
+        bits = _mix(stream + (np.asarray(cells, dtype=np.uint64) + np.uint64(1)) * _GOLDEN_GAMMA)
+
+    return (bits >> np.uint64(11)) * (1.0 / 2 ** 53)
+
+
+def _mix(value):
+    value = (value ^ (value >> np.uint64(30))) * _MIX_MULTIPLIERS[0]
+    value = (value ^ (value >> np.uint64(27))) * _MIX_MULTIPLIERS[1]
+    return value ^ (value >> np.uint64(31))
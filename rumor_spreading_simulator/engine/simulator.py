@@ -1,7 +1,16 @@
-import copy
+import itertools
+import time
+from array import array
 
+import numpy as np
+
+from rumor_spreading_simulator.engine.instrumentation import GenerationMetrics
+from rumor_spreading_simulator.engine.numpy_kernel import ARRIVAL_DTYPE, NOT_ARRIVED, SKEPTICISM_LEVELS
+from rumor_spreading_simulator.engine.population_metrics import PopulationCounts, population_metrics
 from rumor_spreading_simulator.engine.world_board_2D import WorldBoard2D
 from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.random_stream import CounterRandom
+from rumor_spreading_simulator.engine import snapshot
 
 
 class RumorSpreadingSimulator:
@@ -13,13 +22,22 @@ class RumorSpreadingSimulator:
             world_size=100,
             population_density=0.8,
             rumor_cool_down=5,
-            skepticism_dist=None
+            skepticism_dist=None,
+            sparse=False,
+            slow_layout=False,
+            seed=None
     ):
         """
         :type world_size: int
         :type population_density: float
         :type rumor_cool_down: int
         :type skepticism_dist: dict[SkepticismLevel, float]
+        :param sparse: evaluate only the active frontier (rumor holders, cooling down persons and spreaders friends)
+        :type sparse: bool
+        :param slow_layout: generate a *slow* world layout (see WorldBoard2D.generate_slow_board)
+        :type slow_layout: bool
+        :param seed: seed of the simulator random stream (a random one is chosen if not given)
+        :type seed: int
         """
         if skepticism_dist is None:
             skepticism_dist = {s: 1 / len(SkepticismLevel) for s in SkepticismLevel}
@@ -30,13 +48,99 @@ class RumorSpreadingSimulator:
 
         self._rumor_cool_down = rumor_cool_down
         self._skepticism_dist = skepticism_dist
-        self._world_board = WorldBoard2D.generate_board(world_size, population_density, skepticism_dist)
+        self._random = CounterRandom(seed)
+        generate_board = WorldBoard2D.generate_slow_board if slow_layout else WorldBoard2D.generate_board
+        self._world_board = generate_board(world_size, population_density, skepticism_dist, self._random)
 
         # Force a random person to be the first one to spread the rumor for all friends
-        root_person = self.world_board.person_by_id(self.world_board.get_random_person())
+        root_id = self.world_board.get_random_person(self._random)
+        root_person = self.world_board.person_by_id(root_id)
         root_person.notify_rumor()
         root_person.force_optimistic()
 
+        # Generation every person first heard the rumor, by person index
+        self._arrival_times = array('l', [NOT_ARRIVED]) * self._world_board.population_size
+        self._arrival_times[self.world_board.index_by_id(root_id)] = 0
+
+        self._sparse = sparse
+        self._slow_layout = slow_layout
+        self._reset_active_persons()
+        self._reset_population_counts()
+        self._extinction_generation = None  # First generation nobody holds the rumor nor cools down
+        self._recorder = None               # Trajectory recorder of the generations (opt-in)
+        self._observers = []                # Generation metrics observers (opt-in)
+        self._spreads = 0                   # Rumors spread from a person to a friend in last generation
+        self._reset_exported_planes()
+
+    @classmethod
+    def load_snapshot(cls, path, seed=None):
+        """
+        Resume a simulator from a snapshot file (see save_snapshot).
+
+        :type path: str
+        :param seed: seed of the continuation random stream, forks a new what-if run (saved stream if not given)
+        :type seed: int
+        :rtype: RumorSpreadingSimulator
+        """
+        saved = snapshot.load_snapshot(path)
+        header = saved.header
+
+        simulator = cls.__new__(cls)
+        simulator._generation = header["generation"]
+        simulator._rumor_count = header["rumor_count"]
+        simulator._rumors_spread_count = saved.rumors_spread_count
+        simulator._rumor_cool_down = header["rumor_cool_down"]
+        simulator._skepticism_dist = snapshot.skepticism_dist_from_header(header)
+        simulator._random = snapshot.random_stream_from_header(header, seed)
+        simulator._world_board = WorldBoard2D.from_state_planes(saved.planes, saved.order)
+        simulator._arrival_times = array(
+            'l', np.asarray(saved.arrival_times).ravel()[simulator._world_board.person_cells].tolist()
+        )
+        simulator._sparse = header.get("sparse", False)
+        simulator._slow_layout = header.get("slow_layout", False)
+        simulator._reset_active_persons()
+        simulator._reset_population_counts()
+        simulator._extinction_generation = header.get("extinction_generation")
+        simulator._update_extinction()
+        simulator._recorder = None
+        simulator._observers = []
+        simulator._spreads = 0
+        simulator._reset_exported_planes()
+        return simulator
+
+    def save_snapshot(self, path):
+        """
+        Save the simulator state to a compact binary snapshot file.
+
+        :type path: str
+        """
+        planes, order = self._world_board.state_planes(self.rumor_cool_down)
+        header = snapshot.simulator_header(self, sparse=self.sparse, slow_layout=self.slow_layout)
+        snapshot.save_snapshot(
+            path, snapshot.Snapshot(header, planes, order, self.rumors_spread_count, self.arrival_times)
+        )
+
+    def attach_recorder(self, recorder):
+        """
+        Record the current generation and every following one (None detaches).
+
+        :type recorder: rumor_spreading_simulator.engine.trajectory.TrajectoryRecorder
+        """
+        self._recorder = recorder
+        self._record_generation()
+
+    def add_observer(self, observer):
+        """
+        Call an observer with the metrics of every following generation.
+
+        :param observer: callable getting a GenerationMetrics record
+        :type observer: callable
+        """
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        self._observers.remove(observer)
+
     def generate_new_age(self):
         """
         Generate new simulator with same parameters.
@@ -47,45 +151,225 @@ class RumorSpreadingSimulator:
             world_size=self.world_board.size,
             population_density=self.world_board.population_density,
             rumor_cool_down=self.rumor_cool_down,
-            skepticism_dist=self.skepticism_dist
+            skepticism_dist=self.skepticism_dist,
+            sparse=self.sparse,
+            slow_layout=self.slow_layout,
+            seed=self._random.spawn_seed()
         )
 
     def next_generation(self):
         """
         Simulate a single generation evaluation.
         """
-        new_board = copy.deepcopy(self._world_board)
+        start = time.perf_counter()
+        if self._sparse:
+            # Persons changed in last generation are stale in the next buffer as well
+            person_indices = sorted(self._active_persons)
+            person_cells = self._world_board.person_cells[person_indices]
+            self._world_board.prepare_next_board(self._active_persons.union(self._evaluated_persons))
+        else:
+            person_indices = range(self._world_board.population_size)
+            person_cells = self._world_board.person_cells
+            self._world_board.prepare_next_board()
+
+        # Spread decisions of the new generation, drawn in bulk for the evaluated persons only
+        spread_draws = self._random.uniform(self._generation + 1, person_cells).tolist()
+        self._spreads = 0
+        prepared = time.perf_counter()
 
         spread_rumor_count = 0
-        for person_id in self.world_board.world_iterator():
-            spread_rumor_count += self._evaluate_next_gen(person_id, new_board)
+        for person_index, spread_draw in zip(person_indices, spread_draws):
+            spread_rumor_count += self._evaluate_next_gen(person_index, spread_draw)
+        evaluated = time.perf_counter()
 
         self._rumors_spread_count.append(spread_rumor_count)
-        self._world_board = new_board
+        self._update_population_counts(person_indices)
+        self._world_board.swap_boards()
         self._generation += 1
+        self._update_extinction()
+
+        if self._sparse:
+            self._evaluated_persons = person_indices
+            self._active_persons = self._collect_active_persons(person_indices)
+            if self._stale_persons is not None:
+                self._stale_persons.update(person_indices)
+        else:
+            self._stale_persons = None
+
+        self._record_generation()
+
+        if self._observers:
+            metrics = GenerationMetrics(
+                generation=self._generation,
+                evaluated_persons=len(person_indices),
+                spreads=self._spreads,
+                new_exposures=spread_rumor_count,
+                prepare_seconds=prepared - start,
+                evaluate_seconds=evaluated - prepared,
+                finish_seconds=time.perf_counter() - evaluated,
+            )
+            for observer in self._observers:
+                observer(metrics)
 
     def jump_generation(self, steps):
         """
         Simulate X steps generation evaluation.
+
+        Once the rumor is extinct the remaining generations are fast-forwarded, unless recorded or observed.
         """
-        for _ in range(steps):
+        for step in range(steps):
+            if self.extinct and self._recorder is None and not self._observers:
+                self._fast_forward(steps - step)
+                return
+
             self.next_generation()
 
-    def _evaluate_next_gen(self, person_id, new_board):
-        person = new_board.person_by_id(person_id)
-        person.notify_generation_start()
+    def _fast_forward(self, steps):
+        """
+        Skip X generations of an extinct world, in which nobody hears the rumor (see rumor_extinct).
+        """
+        self._rumors_spread_count.extend(itertools.repeat(0, steps))
+        self._generation += steps
+
+    def _update_extinction(self):
+        if self._extinction_generation is None and self._holding_rumor == 0 and self._cooling_down == 0:
+            self._extinction_generation = self._generation
+
+    def _evaluate_next_gen(self, person_index, spread_draw):
+        persons = self._world_board.persons
+        next_persons = self._world_board.next_persons
+        person = next_persons[person_index]
+        person.notify_generation_start(spread_draw)
 
         rumors_spread_count = 0
-        for friend_id in self._world_board.get_person_friends(person_id):
-            friend = self._world_board.person_by_id(friend_id)
-            if friend.should_spread_rumor():
-                rumors_spread_count += person.notify_rumor()
-                new_friend = new_board.person_by_id(friend_id)
-                new_friend.notify_spread_rumor(self.rumor_cool_down)
+        for friend_index in self._world_board.friends_of(person_index):
+            if persons[friend_index].should_spread_rumor():
+                self._spreads += 1
+                if person.notify_rumor():
+                    rumors_spread_count += 1
+                    self._arrival_times[person_index] = self._generation + 1
+                next_persons[friend_index].notify_spread_rumor(self.rumor_cool_down)
 
         self._rumor_count += rumors_spread_count
         return rumors_spread_count
 
+    def _record_generation(self):
+        if self._recorder is not None:
+            planes, _ = self._world_board.state_planes(self.rumor_cool_down)
+            self._recorder.record(self._generation, planes)
+
+    def _reset_population_counts(self):
+        """
+        Count the population aggregates once, they are then kept up to date by the generations changes.
+        """
+        self._holding_rumor = 0                                             # Persons keeping the rumor
+        self._cooling_down = 0                                              # Persons in cool down
+        self._skepticism_counts = dict.fromkeys(SKEPTICISM_LEVELS, 0)       # Persons by current skepticism level
+        for person in self._world_board.persons:
+            self._holding_rumor += person.has_rumor
+            self._cooling_down += person.cool_down != 0
+            self._skepticism_counts[person.curr_skepticism] += 1
+
+    def _update_population_counts(self, person_indices):
+        """
+        Apply the changes of the evaluated persons to the population aggregates (before the boards swap).
+
+        Persons not evaluated (sparse mode) do not change.
+        """
+        persons = self._world_board.persons
+        next_persons = self._world_board.next_persons
+        skepticism_counts = self._skepticism_counts
+        for person_index in person_indices:
+            person, next_person = persons[person_index], next_persons[person_index]
+            self._holding_rumor += next_person.has_rumor - person.has_rumor
+            self._cooling_down += (next_person.cool_down != 0) - (person.cool_down != 0)
+            if next_person.curr_skepticism is not person.curr_skepticism:
+                skepticism_counts[person.curr_skepticism] -= 1
+                skepticism_counts[next_person.curr_skepticism] += 1
+
+    def state_planes(self):
+        """
+        State planes of the current generation (the layout of the NumPy engine), for rendering.
+
+        The export is kept between calls, and only the persons evaluated since the previous call are written again:
+        the sparse engine evaluates the active frontier only, so its frames do not cost an export of the population.
+        The planes are overwritten by the next call, and must not be modified.
+
+        :rtype: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+        """
+        if self._exported_planes is None or self._stale_persons is None:
+            self._exported_planes, _ = self._world_board.state_planes(self.rumor_cool_down)
+        elif self._stale_persons:
+            self._world_board.update_state_planes(self._exported_planes, sorted(self._stale_persons))
+
+        self._stale_persons = set()
+        return self._exported_planes
+
+    def _reset_exported_planes(self):
+        self._exported_planes = None        # State planes export of the last state_planes call
+        self._stale_persons = None          # Persons evaluated since the export (None for all of them)
+
+    def _reset_active_persons(self):
+        self._active_persons = None         # Persons to evaluate in next generation (sparse mode only)
+        self._evaluated_persons = []        # Persons evaluated in last generation (sparse mode only)
+        if self._sparse:
+            self._active_persons = self._collect_active_persons(range(self._world_board.population_size))
+
+    def _collect_active_persons(self, person_indices):
+        """
+        Collect the persons which state may change in the next generation.
+
+        Anyone else does not hold the rumor, is not cooling down and has no spreading friend,
+        so evaluating it changes nothing but its (unused) spread decision.
+        """
+        persons = self._world_board.persons
+        active_persons = set()
+        for person_index in person_indices:
+            person = persons[person_index]
+            if person.has_rumor or person.cool_down:
+                active_persons.add(person_index)
+                if person.should_spread_rumor():
+                    active_persons.update(self._world_board.friends_of(person_index))
+
+        return active_persons
+
+    @property
+    def population_metrics(self):
+        """
+        Population aggregates of the current generation, kept up to date (no board scan).
+
+        :rtype: rumor_spreading_simulator.engine.population_metrics.PopulationMetrics
+        """
+        return population_metrics(self, PopulationCounts(
+            holding_rumor=self._holding_rumor,
+            cooling_down=self._cooling_down,
+            skepticism_counts=tuple(self._skepticism_counts[level] for level in SKEPTICISM_LEVELS),
+        ))
+
+    @property
+    def arrival_times(self):
+        """
+        Generation every cell first heard the rumor (NOT_ARRIVED if never, or no person).
+
+        :rtype: numpy.ndarray
+        """
+        arrival_times = np.full(self._world_board.board_size, NOT_ARRIVED, dtype=ARRIVAL_DTYPE)
+        arrival_times[self._world_board.person_cells] = self._arrival_times
+        return arrival_times.reshape(self._world_board.size, self._world_board.size)
+
+    @property
+    def extinct(self):
+        return self._extinction_generation is not None
+
+    @property
+    def extinction_generation(self):
+        """
+        First generation nobody holds the rumor nor cools down (None while the rumor is alive).
+
+        :rtype: int
+        """
+        return self._extinction_generation
+
     @property
     def generation(self):
         return self._generation
@@ -98,6 +382,22 @@ class RumorSpreadingSimulator:
     def skepticism_dist(self):
         return self._skepticism_dist
 
+    @property
+    def seed(self):
+        return self._random.seed
+
+    @property
+    def random_stream(self):
+        return self._random
+
+    @property
+    def sparse(self):
+        return self._sparse
+
+    @property
+    def slow_layout(self):
+        return self._slow_layout
+
     @property
     def rumor_cool_down(self):
         return self._rumor_cool_down
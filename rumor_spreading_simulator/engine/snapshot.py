@@ -0,0 +1,170 @@
+import json
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from rumor_spreading_simulator.engine.numpy_kernel import ARRIVAL_DTYPE, StatePlanes
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.random_stream import CounterRandom
+
+# File layout: magic, format version, header length, JSON header, then the arrays (aligned, raw)
+_MAGIC = b"RUMORSIM"
+_FORMAT_VERSION = 2
+_PREFIX = struct.Struct("<8sII")
+_ALIGNMENT = 64
+
+Snapshot = namedtuple(
+    "Snapshot",
+    [
+        "header",                   # simulator attributes (parameters, generation, counters, random stream state)
+        "planes",                   # StatePlanes of the saved generation
+        "order",                    # evaluation key (or rank) of every cell, -1 for no person (saved as ranks)
+        "rumors_spread_count",      # count of spread rumors per generation
+        "arrival_times",            # generation every cell first heard the rumor (NOT_ARRIVED if never)
+        "graph",                    # friends graph arrays of a graph world (indptr, indices, ...), None for a grid
+    ],
+    defaults=(None,)
+)
+
+# Arrays of the friends graph are saved under this prefix
+_GRAPH_PREFIX = "graph."
+
+
+def save_snapshot(path, snapshot):
+    """
+    Write a simulator snapshot to a compact binary file.
+
+    The evaluation order is saved as ranks, in the smallest integer type holding the population.
+
+    :type path: str
+    :type snapshot: Snapshot
+    """
+    arrays = dict(snapshot.planes._asdict())
+    arrays["order"] = _compact_order(snapshot.order)
+    arrays["rumors_spread_count"] = np.asarray(snapshot.rumors_spread_count, dtype=np.int64)
+    arrays["arrival_times"] = np.asarray(snapshot.arrival_times, dtype=ARRIVAL_DTYPE)
+    for name, array in (snapshot.graph or {}).items():
+        arrays[_GRAPH_PREFIX + name] = np.asarray(array)
+
+    table = {}
+    offset = 0
+    for name, array in arrays.items():
+        table[name] = {"dtype": array.dtype.str, "shape": array.shape, "offset": offset}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({"simulator": snapshot.header, "arrays": table}).encode()
+    data_start = _align(_PREFIX.size + len(header))
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(_PREFIX.pack(_MAGIC, _FORMAT_VERSION, len(header)))
+        snapshot_file.write(header)
+        for name, array in arrays.items():
+            snapshot_file.seek(data_start + table[name]["offset"])
+            snapshot_file.write(np.ascontiguousarray(array).tobytes())
+        snapshot_file.truncate(data_start + offset)
+
+
+def load_snapshot(path, graph=False):
+    """
+    Memory-map a simulator snapshot file.
+
+    Arrays are mapped copy-on-write: nothing is parsed or read until used, and changes never reach the file,
+    so any number of simulators may be forked from the same snapshot.
+
+    :type path: str
+    :param graph: expect a graph world snapshot (grid worlds and graph worlds do not resume each other)
+    :type graph: bool
+    :rtype: Snapshot
+    """
+    with open(path, "rb") as snapshot_file:
+        magic, format_version, header_size = _PREFIX.unpack(snapshot_file.read(_PREFIX.size))
+        if magic != _MAGIC or format_version != _FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {_FORMAT_VERSION} rumor simulator snapshot")
+        header = json.loads(snapshot_file.read(header_size))
+
+    data_start = _align(_PREFIX.size + header_size)
+    arrays = {
+        name: _map_array(path, data_start, **array_info)
+        for name, array_info in header["arrays"].items()
+    }
+    graph_arrays = {
+        name[len(_GRAPH_PREFIX):]: array for name, array in arrays.items() if name.startswith(_GRAPH_PREFIX)
+    }
+    if graph != bool(graph_arrays):
+        world = "graph" if graph_arrays else "grid"
+        raise ValueError(f"{path} is a snapshot of a {world} world, resume it with a {world} engine")
+
+    return Snapshot(
+        header=header["simulator"],
+        planes=StatePlanes(**{name: arrays[name] for name in StatePlanes._fields}),
+        order=arrays["order"],
+        rumors_spread_count=arrays["rumors_spread_count"].tolist(),
+        arrival_times=arrays["arrival_times"],
+        graph=graph_arrays or None,
+    )
+
+
+def simulator_header(simulator, **attributes):
+    """
+    Snapshot header of the simulator attributes shared by all engines.
+
+    :rtype: dict
+    """
+    return dict(
+        generation=simulator.generation,
+        rumor_count=int(simulator.rumor_count),
+        rumor_cool_down=simulator.rumor_cool_down,
+        skepticism_dist={level.name: density for level, density in simulator.skepticism_dist.items()},
+        random_stream=simulator.random_stream.state,
+        extinction_generation=simulator.extinction_generation,
+        **attributes
+    )
+
+
+def skepticism_dist_from_header(header):
+    return {SkepticismLevel[name]: density for name, density in header["skepticism_dist"].items()}
+
+
+def random_stream_from_header(header, seed=None):
+    """
+    Random stream of a resumed simulator, a new one when forking with a seed.
+
+    :rtype: CounterRandom
+    """
+    if seed is not None:
+        return CounterRandom(seed)
+
+    return CounterRandom.from_state(header["random_stream"])
+
+
+def _compact_order(order):
+    """
+    Evaluation rank of every cell (-1 for no person), in the smallest signed integer type holding the population.
+
+    The engines only compare the evaluation keys of friends, so their ranks resume the same run.
+
+    :param order: evaluation key (or rank) of every cell, -1 for no person
+    :type order: numpy.ndarray
+    :rtype: numpy.ndarray
+    """
+    order = np.asarray(order)
+    occupied = order >= 0
+    keys = order[occupied]
+    dtype = next(dtype for dtype in (np.int8, np.int16, np.int32, np.int64) if len(keys) <= np.iinfo(dtype).max + 1)
+
+    ranks = np.empty(len(keys), dtype=dtype)
+    ranks[np.argsort(keys, kind="stable")] = np.arange(len(keys), dtype=dtype)
+    compact_order = np.full(order.shape, -1, dtype=dtype)
+    compact_order[occupied] = ranks
+    return compact_order
+
+
+def _map_array(path, data_start, dtype, shape, offset):
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+
+    return np.memmap(path, dtype=dtype, mode="c", offset=data_start + offset, shape=tuple(shape))
+
+
+def _align(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
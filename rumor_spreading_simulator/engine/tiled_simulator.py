@@ -0,0 +1,421 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import traceback
+import weakref
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from rumor_spreading_simulator.engine import numpy_kernel
+from rumor_spreading_simulator.engine.numpy_kernel import StatePlanes
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator, NumpyWorldBoard2D
+from rumor_spreading_simulator.engine.population_metrics import add_counts, count_population
+from rumor_spreading_simulator.engine.random_stream import counter_uniform
+
+# Halo buffer layout: generation parity x strip x (first row, last row) x world size
+_FIRST_ROW = 0
+_LAST_ROW = 1
+# Activity flags layout: generation parity x strip (some person of the strip holds the rumor or cools down)
+
+# Seconds a worker waits for the others at the generation barrier before giving up (a worker must be stuck)
+_BARRIER_TIMEOUT = 600
+# Seconds a worker is given to stop on shutdown before it is terminated
+_JOIN_TIMEOUT = 5.0
+
+# Sent by a worker instead of its results when its strip evaluation failed (broken_barrier: only because
+# another worker failed first)
+_StripFailure = namedtuple("_StripFailure", ["strip", "traceback", "broken_barrier"])
+
+
+class TiledRumorSpreadingSimulator(NumpyRumorSpreadingSimulator):
+    """
+    Domain decomposed simulator engine for very large 2D population worlds.
+
+    The state planes and arrival times live in shared memory, split into row strips owned by worker processes.
+    Every generation each worker publishes the spreaders of its border rows to a shared halo
+    buffer, waits for the others on a barrier, and evaluates its strip in place. The draws are
+    counter based, so a run matches the NumPy engine with the same seed.
+
+    A worker that fails or dies breaks the barrier for the others, and the simulation raises a RuntimeError;
+    the workers are then stopped and the simulator may not be used anymore.
+    """
+    def __init__(
+            self,
+            world_size=100,
+            population_density=0.8,
+            rumor_cool_down=5,
+            skepticism_dist=None,
+            workers=None,
+            seed=None
+    ):
+        """
+        :type world_size: int
+        :type population_density: float
+        :type rumor_cool_down: int
+        :type skepticism_dist: dict[SkepticismLevel, float]
+        :param workers: number of worker processes (strips), CPU count by default
+        :type workers: int
+        :type seed: int
+        """
+        self._shared_arrays = []        # (array, shared memory block) of the planes generated in shared memory
+        try:
+            super().__init__(world_size, population_density, rumor_cool_down, skepticism_dist, seed)
+            self._start_workers(workers)
+        except BaseException:
+            for _, shared_memory_block in self._shared_arrays:
+                shared_memory_block.unlink()
+            raise
+
+    @classmethod
+    def load_snapshot(cls, path, seed=None, workers=None):
+        """
+        Resume a simulator from a snapshot file (see save_snapshot).
+
+        :type path: str
+        :type seed: int
+        :param workers: number of worker processes (strips), CPU count by default
+        :type workers: int
+        :rtype: TiledRumorSpreadingSimulator
+        """
+        simulator = super().load_snapshot(path, seed)
+        simulator._shared_arrays = []
+        simulator._start_workers(workers)
+        return simulator
+
+    def generate_new_age(self):
+        """
+        Generate new simulator with same parameters.
+
+        :rtype: TiledRumorSpreadingSimulator
+        """
+        return TiledRumorSpreadingSimulator(
+            world_size=self.world_board.size,
+            population_density=self.world_board.population_density,
+            rumor_cool_down=self.rumor_cool_down,
+            skepticism_dist=self.skepticism_dist,
+            workers=self.workers,
+            seed=self._random.spawn_seed()
+        )
+
+    def next_generation(self):
+        """
+        Simulate a single generation evaluation.
+        """
+        self._run_workers(1)
+        self._record_generation()
+
+    def jump_generation(self, steps):
+        """
+        Simulate X steps generation evaluation, in a single round trip to the workers.
+
+        The workers stop together once the rumor is extinct, and the remaining generations are fast-forwarded.
+        """
+        if self._recorder is not None:
+            for _ in range(steps):
+                self.next_generation()
+            return
+
+        if self.extinct:
+            self._fast_forward(steps)
+            return
+
+        self._run_workers(steps)
+
+    def close(self):
+        """
+        Stop the worker processes and release the shared memory, the board is kept as private planes.
+        """
+        private_planes = StatePlanes(*(np.array(plane) for plane in self._world_board.planes))
+        self._world_board = NumpyWorldBoard2D(private_planes, self._world_board.order)
+        self._arrival_times = np.array(self._arrival_times)
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start_workers(self, workers):
+        size = self._world_board.size
+        workers = min(workers or os.cpu_count(), size)
+        rows = np.linspace(0, size, workers + 1).astype(int)
+
+        shared_memories = []
+        plane_specs = []
+        shared_planes = []
+        for plane in self._world_board.planes:
+            shared_plane, shared_memory_block = self._shared(plane)
+            shared_memories.append(shared_memory_block)
+            plane_specs.append((shared_memory_block.name, plane.shape, plane.dtype.str))
+            shared_planes.append(shared_plane)
+        self._world_board = NumpyWorldBoard2D(StatePlanes(*shared_planes), self._world_board.order)
+
+        self._arrival_times, arrival_memory = self._shared(self._arrival_times)
+        shared_memories.append(arrival_memory)
+        arrival_spec = (arrival_memory.name, self._arrival_times.shape, self._arrival_times.dtype.str)
+
+        halo, halo_memory = _share_array(np.zeros((2, workers, 2, size), dtype=bool))
+        shared_memories.append(halo_memory)
+        halo_spec = (halo_memory.name, halo.shape, halo.dtype.str)
+
+        activity, activity_memory = _share_array(np.zeros((2, workers), dtype=bool))
+        shared_memories.append(activity_memory)
+        activity_spec = (activity_memory.name, activity.shape, activity.dtype.str)
+
+        barrier = multiprocessing.Barrier(workers, timeout=_BARRIER_TIMEOUT)
+        connections = []
+        processes = []
+        for strip in range(workers):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_strip_worker,
+                args=(
+                    plane_specs, arrival_spec, halo_spec, activity_spec, strip, (rows[strip], rows[strip + 1]),
+                    self._random.key, self.rumor_cool_down, barrier, worker_connection
+                ),
+                daemon=True
+            )
+            process.start()
+            connections.append(connection)
+            processes.append(process)
+
+        self._workers = workers
+        self._connections = connections
+        self._processes = processes
+        self._barrier = barrier         # a spawned worker attaches the barrier after start, keep it alive until then
+        self._shared_arrays = []        # released by the finalizer from now on
+        self._finalizer = weakref.finalize(self, _shutdown, connections, processes, shared_memories)
+
+    def _empty_plane(self, shape, dtype):
+        """
+        Allocate a board plane straight into a new shared memory block, so a generated board is never copied.
+        """
+        shared_array, shared_memory_block = _new_shared_array(shape, dtype)
+        self._shared_arrays.append((shared_array, shared_memory_block))
+        return shared_array
+
+    def _shared(self, array):
+        """
+        The shared memory block of a plane allocated by _empty_plane, or a copy of the plane into a new one
+        (the planes of a snapshot).
+
+        :type array: numpy.ndarray
+        :rtype: (numpy.ndarray, multiprocessing.shared_memory.SharedMemory)
+        """
+        for shared_array, shared_memory_block in self._shared_arrays:
+            if shared_array is array:
+                return shared_array, shared_memory_block
+        return _share_array(array)
+
+    def _run_workers(self, steps):
+        """
+        Evaluate X generations on the workers, reducing the new exposures and population aggregates of every strip.
+
+        The workers stop early when the rumor is extinct, the generations left are fast-forwarded.
+        """
+        for connection in self._connections:
+            try:
+                connection.send((self._generation, steps))
+            except (BrokenPipeError, ConnectionResetError):
+                pass            # the worker is dead, found out when receiving
+
+        strip_results = self._receive_results()
+        failures = [strip_result for strip_result in strip_results if isinstance(strip_result, _StripFailure)]
+        if failures:
+            self._fail(failures)
+
+        strip_spread_rumor_counts, strip_population_counts = zip(*strip_results)
+        spread_rumor_counts = np.sum(strip_spread_rumor_counts, axis=0, dtype=np.int64).tolist()
+        self._population_counts = add_counts(*strip_population_counts)
+        self._rumor_count += sum(spread_rumor_counts)
+        self._rumors_spread_count.extend(spread_rumor_counts)
+        self._generation += len(spread_rumor_counts)
+        self._update_extinction()
+        self._fast_forward(steps - len(spread_rumor_counts))
+
+    def _receive_results(self):
+        """
+        Receive the results of every strip, watching the workers while waiting.
+
+        A failed or dead worker gives a _StripFailure, and the barrier is broken so the others do not wait for it.
+
+        :rtype: list[(list[int], rumor_spreading_simulator.engine.population_metrics.PopulationCounts) | _StripFailure]
+        """
+        strip_results = [None] * self._workers
+        waited_strips = {}              # result connection or process sentinel -> strip
+        for strip, (connection, process) in enumerate(zip(self._connections, self._processes)):
+            waited_strips[connection] = waited_strips[process.sentinel] = strip
+
+        while waited_strips:
+            for ready in multiprocessing.connection.wait(list(waited_strips)):
+                strip = waited_strips.get(ready)
+                if strip is None or strip_results[strip] is not None:
+                    continue            # both the connection and the sentinel of the strip were ready
+                connection, process = self._connections[strip], self._processes[strip]
+                if connection.poll():
+                    try:
+                        strip_results[strip] = connection.recv()
+                    except (EOFError, ConnectionResetError):
+                        strip_results[strip] = _StripFailure(strip, f"died (exit code {process.exitcode})", False)
+                else:
+                    strip_results[strip] = _StripFailure(strip, f"died (exit code {process.exitcode})", False)
+                del waited_strips[connection], waited_strips[process.sentinel]
+
+                if isinstance(strip_results[strip], _StripFailure):
+                    self._barrier.abort()
+        return strip_results
+
+    def _fail(self, failures):
+        """
+        Close the simulator and raise the failures (the first ones, not those of the workers they broke the barrier of).
+
+        :type failures: list[_StripFailure]
+        """
+        self.close()
+        causes = [failure for failure in failures if not failure.broken_barrier] or failures
+        raise RuntimeError("\n".join(f"Tiled worker {failure.strip} failed: {failure.traceback}" for failure in causes))
+
+    @property
+    def workers(self):
+        return self._workers
+
+
+def _strip_worker(
+        plane_specs, arrival_spec, halo_spec, activity_spec, strip, rows, key, rumor_cool_down, barrier, connection
+):
+    """
+    Worker process evaluating a row strip of the world (rows[0] <= row < rows[1]).
+
+    Commands are (generation, steps) tuples, answered by the new exposures count of every generation
+    evaluated and the population aggregates of the strip after the last one; None stops the worker.
+    All workers stop before the steps are done once no strip holds the rumor nor cools down.
+    """
+    shared_memories = []
+    planes = []
+    for spec in plane_specs:
+        plane, shared_memory_block = _attach_array(*spec)
+        shared_memories.append(shared_memory_block)
+        planes.append(plane)
+    arrival_times, arrival_memory = _attach_array(*arrival_spec)
+    shared_memories.append(arrival_memory)
+    halo, halo_memory = _attach_array(*halo_spec)
+    shared_memories.append(halo_memory)
+    activity, activity_memory = _attach_array(*activity_spec)
+    shared_memories.append(activity_memory)
+
+    try:
+        _run_strip(
+            StatePlanes(*planes), arrival_times, halo, activity, strip, rows, key, rumor_cool_down, barrier, connection
+        )
+    except Exception as error:
+        # Wake the workers waiting for this one (they fail too), and report the failure to the coordinator
+        barrier.abort()
+        try:
+            connection.send(
+                _StripFailure(strip, traceback.format_exc(), isinstance(error, threading.BrokenBarrierError))
+            )
+        except (BrokenPipeError, ConnectionResetError):
+            pass            # the coordinator is gone
+
+    del plane, planes, arrival_times, halo, activity
+    for shared_memory_block in shared_memories:
+        shared_memory_block.close()
+
+
+def _run_strip(planes, arrival_times, halo, activity, strip, rows, key, rumor_cool_down, barrier, connection):
+    row_start, row_end = rows
+    size = planes.skepticism.shape[-1]
+    strip_planes = StatePlanes(*(plane[row_start:row_end] for plane in planes))
+    strip_arrival_times = arrival_times[row_start:row_end]
+    cells = np.arange(row_start * size, row_end * size).reshape(row_end - row_start, size)
+    bordered_spreaders = np.zeros((row_end - row_start + 2, size), dtype=bool)
+    population_counts = count_population(strip_planes)      # kept up to date with the changes of every generation
+
+    for command in iter(connection.recv, None):
+        first_generation, steps = command
+        spread_rumor_counts = []
+        for generation in range(first_generation, first_generation + steps):
+            spreaders = numpy_kernel.spreaders_mask(strip_planes)
+
+            # Halo exchange, double buffered by generation parity so a fast worker never overwrites a border in use
+            parity_halo = halo[generation % 2]
+            parity_halo[strip, _FIRST_ROW] = spreaders[0]
+            parity_halo[strip, _LAST_ROW] = spreaders[-1]
+            parity_activity = activity[generation % 2]
+            parity_activity[strip] = population_counts.holding_rumor or population_counts.cooling_down
+            barrier.wait()
+
+            if not parity_activity.any():
+                break           # the rumor is extinct, every worker sees the same flags and stops here
+
+            bordered_spreaders[1:-1] = spreaders
+            bordered_spreaders[0] = parity_halo[strip - 1, _LAST_ROW] if strip > 0 else False
+            bordered_spreaders[-1] = parity_halo[strip + 1, _FIRST_ROW] if strip + 1 < len(parity_halo) else False
+
+            new_planes, new_exposures, count_changes = numpy_kernel.advance(
+                strip_planes,
+                spreaders,
+                numpy_kernel.grid_neighbour_sum(bordered_spreaders)[1:-1],
+                rumor_cool_down,
+                counter_uniform(key, generation + 1, cells)
+            )
+            for plane, new_plane in zip(strip_planes, new_planes):
+                if new_plane is not plane:
+                    plane[...] = new_plane
+            population_counts = add_counts(population_counts, count_changes)
+            spread_rumor_count = int(np.count_nonzero(new_exposures))
+            if spread_rumor_count:
+                strip_arrival_times[new_exposures] = generation + 1
+            spread_rumor_counts.append(spread_rumor_count)
+
+        connection.send((spread_rumor_counts, population_counts))
+
+
+def _shutdown(connections, processes, shared_memories):
+    for connection in connections:
+        try:
+            connection.send(None)
+        except (BrokenPipeError, ConnectionResetError):
+            pass            # the worker is dead already
+    for process in processes:
+        process.join(_JOIN_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    for shared_memory_block in shared_memories:
+        try:
+            shared_memory_block.close()
+        except BufferError:
+            pass                # still viewed by the coordinator board, the mapping goes with the process
+        shared_memory_block.unlink()
+
+
+def _share_array(array):
+    """
+    Copy an array into a new shared memory block.
+
+    :rtype: (numpy.ndarray, multiprocessing.shared_memory.SharedMemory)
+    """
+    shared_array, shared_memory_block = _new_shared_array(array.shape, array.dtype)
+    shared_array[...] = array
+    return shared_array, shared_memory_block
+
+
+def _new_shared_array(shape, dtype):
+    """
+    Allocate an (uninitialized) array in a new shared memory block.
+
+    :rtype: (numpy.ndarray, multiprocessing.shared_memory.SharedMemory)
+    """
+    dtype = np.dtype(dtype)
+    shared_memory_block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    return np.ndarray(shape, dtype=dtype, buffer=shared_memory_block.buf), shared_memory_block
+
+
+def _attach_array(name, shape, dtype):
+    shared_memory_block = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=shared_memory_block.buf), shared_memory_block
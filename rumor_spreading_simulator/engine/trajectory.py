@@ -0,0 +1,194 @@
+import bisect
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from rumor_spreading_simulator.engine.numpy_kernel import EMPTY_CELL
+
+# File layout: file header, then append-only chunks, every chunk is a full keyframe or the cells changed in a generation
+_MAGIC = b"RUMORTRJ"
+_FORMAT_VERSION = 1
+_FILE_HEADER = struct.Struct("<8sIII")           # magic, format version, world size, keyframe interval
+_CHUNK_HEADER = struct.Struct("<cII")            # kind, generation, cells count
+_KEYFRAME = b"K"
+_DELTA = b"D"
+
+# Cell code bits (uint16): occupied, has rumor, ever has rumor, current skepticism, rumor count, cool down
+_CODE_FIELDS = [
+    ("occupied", 0, 1),
+    ("has_rumor", 1, 1),
+    ("ever_has_rumor", 2, 1),
+    ("curr_skepticism", 3, 2),
+    ("rumor_count", 5, 4),
+    ("cool_down", 9, 7),        # saturates at 127
+]
+
+TrajectoryFrame = namedtuple("TrajectoryFrame", ["generation"] + [name for name, _, _ in _CODE_FIELDS])
+
+_ChunkInfo = namedtuple("_ChunkInfo", ["generation", "kind", "offset", "count"])
+
+
+def encode_cells(planes):
+    """
+    Encode the state planes of a world into a uint16 code per cell.
+
+    :type planes: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+    :rtype: numpy.ndarray
+    """
+    occupied = planes.skepticism != EMPTY_CELL
+    values = {
+        "occupied": occupied,
+        "has_rumor": planes.has_rumor,
+        "ever_has_rumor": planes.ever_has_rumor,
+        "curr_skepticism": np.where(occupied, planes.curr_skepticism, 0),
+        "rumor_count": planes.rumor_count,
+        "cool_down": planes.cool_down,
+    }
+
+    codes = np.zeros(occupied.shape, dtype=np.uint16)
+    for name, shift, bits in _CODE_FIELDS:
+        codes |= np.minimum(values[name], 2 ** bits - 1).astype(np.uint16) << shift
+
+    return codes.ravel()
+
+
+def decode_cells(generation, codes, size):
+    """
+    Decode uint16 cell codes into a frame of planes.
+
+    :rtype: TrajectoryFrame
+    """
+    codes = codes.reshape(size, size)
+    fields = {
+        name: ((codes >> shift) & (2 ** bits - 1)).astype(bool if bits == 1 else np.int8)
+        for name, shift, bits in _CODE_FIELDS
+    }
+    fields["curr_skepticism"] = np.where(fields["occupied"], fields["curr_skepticism"], EMPTY_CELL).astype(np.int8)
+    return TrajectoryFrame(generation=generation, **fields)
+
+
+class TrajectoryRecorder:
+    """
+    Streams the trajectory of a simulator to an append-only file.
+
+    Each generation appends only the cells that changed, with a full keyframe every keyframe_interval
+    generations for random access. Memory use does not depend on the trajectory length.
+    """
+    def __init__(self, path, keyframe_interval=100):
+        """
+        :type path: str
+        :type keyframe_interval: int
+        """
+        self._path = path
+        self._keyframe_interval = keyframe_interval
+        self._file = None               # opened on first record, once the world size is known
+        self._codes = None              # codes of the last recorded generation
+        self._last_keyframe = None      # generation of the last keyframe
+
+    def record(self, generation, planes):
+        """
+        Record the state of a generation.
+
+        :type generation: int
+        :type planes: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+        """
+        codes = encode_cells(planes)
+        if self._file is None:
+            self._file = open(self._path, "wb")
+            self._file.write(_FILE_HEADER.pack(_MAGIC, _FORMAT_VERSION, planes.skepticism.shape[-1],
+                                               self._keyframe_interval))
+
+        if self._last_keyframe is None or generation - self._last_keyframe >= self._keyframe_interval:
+            self._file.write(_CHUNK_HEADER.pack(_KEYFRAME, generation, codes.size))
+            self._file.write(codes.tobytes())
+            self._last_keyframe = generation
+        else:
+            changed = np.flatnonzero(codes != self._codes).astype(np.uint32)
+            self._file.write(_CHUNK_HEADER.pack(_DELTA, generation, changed.size))
+            self._file.write(changed.tobytes())
+            self._file.write(codes[changed].tobytes())
+
+        self._codes = codes
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Reads a trajectory file, reconstructing the board of any recorded generation lazily.
+    """
+    def __init__(self, path):
+        """
+        :type path: str
+        """
+        self._path = path
+        self._chunks = []               # chunk info by generation order
+        self._keyframes = []            # indices of the keyframe chunks
+
+        with open(path, "rb") as trajectory_file:
+            magic, format_version, self._size, self._keyframe_interval = _FILE_HEADER.unpack(
+                trajectory_file.read(_FILE_HEADER.size)
+            )
+            if magic != _MAGIC or format_version != _FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {_FORMAT_VERSION} rumor simulator trajectory")
+
+            # Index the chunks by their headers only, skipping the cells data
+            while True:
+                chunk_header = trajectory_file.read(_CHUNK_HEADER.size)
+                if len(chunk_header) < _CHUNK_HEADER.size:
+                    break
+
+                kind, generation, count = _CHUNK_HEADER.unpack(chunk_header)
+                if kind == _KEYFRAME:
+                    self._keyframes.append(len(self._chunks))
+                    data_size = count * 2
+                else:
+                    data_size = count * 6
+                self._chunks.append(_ChunkInfo(generation, kind, trajectory_file.tell(), count))
+                trajectory_file.seek(data_size, 1)
+
+        self._generations = [chunk.generation for chunk in self._chunks]
+
+    def board(self, generation):
+        """
+        Reconstruct the board of a recorded generation from its nearest keyframe.
+
+        :type generation: int
+        :rtype: TrajectoryFrame
+        """
+        chunk_index = bisect.bisect_right(self._generations, generation) - 1
+        if chunk_index < 0 or self._generations[chunk_index] != generation:
+            raise KeyError(f"generation {generation} is not recorded")
+
+        keyframe_index = self._keyframes[bisect.bisect_right(self._keyframes, chunk_index) - 1]
+        with open(self._path, "rb") as trajectory_file:
+            keyframe = self._chunks[keyframe_index]
+            trajectory_file.seek(keyframe.offset)
+            codes = np.fromfile(trajectory_file, dtype=np.uint16, count=keyframe.count)
+
+            for chunk in self._chunks[keyframe_index + 1:chunk_index + 1]:
+                trajectory_file.seek(chunk.offset)
+                changed = np.fromfile(trajectory_file, dtype=np.uint32, count=chunk.count)
+                codes[changed] = np.fromfile(trajectory_file, dtype=np.uint16, count=chunk.count)
+
+        return decode_cells(generation, codes, self._size)
+
+    def __iter__(self):
+        return (self.board(generation) for generation in self._generations)
+
+    @property
+    def generations(self):
+        return self._generations
+
+    @property
+    def size(self):
+        return self._size
@@ -1,7 +1,11 @@
-import random
+from array import array
 from collections import namedtuple
 
-from rumor_spreading_simulator.engine.person import Person, SkepticismLevel
+import numpy as np
+
+from rumor_spreading_simulator.engine import numpy_kernel, world_generation
+from rumor_spreading_simulator.engine.numpy_kernel import SKEPTICISM_LEVELS
+from rumor_spreading_simulator.engine.person import Person, PersonState, SkepticismLevel
 
 PersonWorldID = namedtuple("PersonWorldID", ["row", "col"])
 
@@ -9,6 +13,9 @@ PersonWorldID = namedtuple("PersonWorldID", ["row", "col"])
 class WorldBoard2D:
     """
     This class implemented the 2D population world.
+
+    Persons are addressed internally by dense integer indices (which are also the evaluation order),
+    PersonWorldID is kept as the external view of a person location.
     """
     _FRIENDS_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
 
@@ -18,94 +25,61 @@ class WorldBoard2D:
 
         :type size: int
         """
-        self._size = size                                       # size of the matrix
-        self._board = [[None] * size for _ in range(size)]      # matrix of world's person objects
-        self._ids = []                                          # list of existing person ids in the world
+        self._size = size                                   # size of the matrix
+        self._cells = array('l', [-1]) * (size ** 2)        # person index of every cell (-1 for no person)
+        self._person_cells = np.empty(0, dtype=np.int64)    # flat cell index (row * size + col), by person index
+        self._persons = []                                  # world's person objects, by person index
+        self._next_persons = []                             # next generation's person objects, by person index
+        self._friends_offsets = array('l', [0])             # friends of person i are _friends[offsets[i]:offsets[i+1]]
+        self._friends = array('l')                          # friends person indices, for all persons
+        self._order_planes = None                           # evaluation rank and order planes (static, lazy)
 
     @classmethod
-    def generate_board(cls, size, density, skepticism_dist):
+    def generate_board(cls, size, density, skepticism_dist, random_stream):
         """
         Generate a new board based on basic population attributes.
 
+        The placement is vectorized, but a Person is built per person (seconds for a 1000x1000 world): the layout
+        time target (see benchmark_runner.LAYOUT_TARGET_SECONDS) is the array engines one.
+
         :type size: int
         :type density: float
         :type skepticism_dist: dict[SkepticismLevel, float]
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
         """
+        cells, levels, keys = world_generation.place_persons(size, density, skepticism_dist, random_stream)
+        evaluation = np.argsort(keys, kind="stable")
         world_board = cls(size)
-        world_board._ids = [
-            PersonWorldID(row=index//size, col=index%size)
-            for index in random.sample(
-                range(world_board.board_size),
-                int(density * world_board.board_size)
-            )
-        ]
-
-        ids_scanner = iter(world_board._ids)
-        for skepticism_level, skepticism_density in skepticism_dist.items():
-            for _ in range(int(skepticism_density * world_board.population_size)):
-                next_id = next(ids_scanner)
-                world_board._board[next_id.row][next_id.col] = Person(skepticism_level)
-
+        world_board._place_persons(cells[evaluation], levels[evaluation], random_stream)
         return world_board
 
     @classmethod
-    def generate_slow_board(cls, size, density, skepticism_dist):
+    def generate_slow_board(cls, size, density, skepticism_dist, random_stream):
         """
         Generate a new *slow* board based on basic population attributes.
 
         :type size: int
         :type density: float
         :type skepticism_dist: dict[SkepticismLevel, float]
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
         """
+        cells, levels, keys = world_generation.place_slow_persons(size, density, skepticism_dist, random_stream)
+        evaluation = np.argsort(keys, kind="stable")
         world_board = cls(size)
-        world_board._ids = [
-            PersonWorldID(row=index//size, col=index%size)
-            for index in sorted(random.sample(
-                range(world_board.board_size),
-                int(density * world_board.board_size)
-            ))
-        ]
-
-        s1_count = int(skepticism_dist[SkepticismLevel.S1] * world_board.population_size)
-        s2_count = int(skepticism_dist[SkepticismLevel.S2] * world_board.population_size)
-        s3_count = int(skepticism_dist[SkepticismLevel.S3] * world_board.population_size)
-        s4_count = int(skepticism_dist[SkepticismLevel.S4] * world_board.population_size)
-
-        for person_id in world_board._ids:
-            if person_id.row % 4 == 0 and s1_count:
-                s1_count -= 1
-                world_board._board[person_id.row][person_id.col] = Person(SkepticismLevel.S1)
-            elif person_id.row % 4 == 1 and s2_count:
-                s2_count -= 1
-                world_board._board[person_id.row][person_id.col] = Person(SkepticismLevel.S2)
-            elif person_id.row % 4 == 2 and s3_count:
-                s3_count -= 1
-                world_board._board[person_id.row][person_id.col] = Person(SkepticismLevel.S3)
-            elif person_id.row % 4 == 3 and s4_count:
-                s4_count -= 1
-                world_board._board[person_id.row][person_id.col] = Person(SkepticismLevel.S4)
-            elif s1_count:
-                s1_count -= 1
-                world_board._board[person_id.row][person_id.col] = Person(SkepticismLevel.S1)
-            elif s2_count:
-                s2_count -= 1
-                world_board._board[person_id.row][person_id.col] = Person(SkepticismLevel.S2)
-            elif s3_count:
-                s3_count -= 1
-                world_board._board[person_id.row][person_id.col] = Person(SkepticismLevel.S3)
-            elif s4_count:
-                s4_count -= 1
-                world_board._board[person_id.row][person_id.col] = Person(SkepticismLevel.S4)
-
+        world_board._place_persons(cells[evaluation], levels[evaluation], random_stream)
         return world_board
 
-    def get_random_person(self):
+    def get_random_person(self, random_stream):
         """
         Get random person from the world.
 
+        Persons are drawn by their rank row by row, so every engine draws the same person.
+
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
         :rtype: PersonWorldID
         """
-        return random.choice(self._ids)
+        rank = random_stream.generator.integers(self.population_size)
+        return PersonWorldID(*divmod(int(np.sort(self._person_cells)[rank]), self._size))
 
     def person_by_id(self, person_id):
         """
@@ -114,11 +88,47 @@ class WorldBoard2D:
         :type person_id: PersonWorldID
         :rtype: rumor_spreading_simulator.engine.person.Person
         """
+        index = self.index_by_id(person_id)
+        if index is not None:
+            return self._persons[index]
+
+        return None
+
+    def index_by_id(self, person_id):
+        """
+        Get person index by person ID.
+
+        :type person_id: PersonWorldID
+        :rtype: int
+        """
         if 0 <= person_id.row < self.size and 0 <= person_id.col < self.size:
-            return self._board[person_id.row][person_id.col]
+            index = self._cells[person_id.row * self.size + person_id.col]
+            if index != -1:
+                return index
 
         return None
 
+    def prepare_next_board(self, person_indices=None):
+        """
+        Load the current generation state into the next generation buffer.
+
+        :param person_indices: persons to load (all persons by default)
+        :type person_indices: iter[int]
+        """
+        if person_indices is None:
+            for next_person, person in zip(self._next_persons, self._persons):
+                next_person.load_state(person)
+            return
+
+        for person_index in person_indices:
+            self._next_persons[person_index].load_state(self._persons[person_index])
+
+    def swap_boards(self):
+        """
+        Make the next generation buffer the current one.
+        """
+        self._persons, self._next_persons = self._next_persons, self._persons
+
     def get_person_friends(self, person_id):
         """
         Get list of existing friend of a given person.
@@ -126,15 +136,20 @@ class WorldBoard2D:
         :type person_id: PersonWorldID
         :rtype: list[PersonWorldID]
         """
-        optional_friends_ids = [
-            PersonWorldID(person_id.row + row, person_id.col + col)
-            for (row, col) in self._FRIENDS_OFFSETS
-        ]
+        index = self.index_by_id(person_id)
+        if index is None:
+            return []
 
-        return [
-            friend_id for friend_id in optional_friends_ids
-            if self.person_by_id(friend_id)
-        ]
+        return [self._person_id(friend) for friend in self.friends_of(index)]
+
+    def friends_of(self, index):
+        """
+        Get the friends person indices of a given person index.
+
+        :type index: int
+        :rtype: array
+        """
+        return self._friends[self._friends_offsets[index]:self._friends_offsets[index + 1]]
 
     def world_iterator(self):
         """
@@ -142,7 +157,155 @@ class WorldBoard2D:
 
         :rtype: iter
         """
-        return iter(self._ids)
+        return (PersonWorldID(*divmod(cell, self._size)) for cell in self._person_cells.tolist())
+
+    @classmethod
+    def from_state_planes(cls, planes, order):
+        """
+        Create a board from the state planes of a world (see state_planes).
+
+        :type planes: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+        :param order: evaluation rank (or key) of every cell, -1 for no person
+        :type order: numpy.ndarray
+        """
+        world_board = cls(order.shape[-1])
+        cells = np.flatnonzero(order.ravel() >= 0)
+        cells = cells[np.argsort(order.ravel()[cells], kind="stable")]
+
+        skepticism, curr_skepticism, cool_down, rumor_count, has_rumor, ever_has_rumor, should_spread = (
+            np.asarray(plane).ravel()[cells].tolist()
+            for plane in (
+                planes.skepticism, planes.curr_skepticism, planes.cool_down, planes.rumor_count,
+                planes.has_rumor, planes.ever_has_rumor, planes.should_spread
+            )
+        )
+        states = [
+            PersonState(*state)
+            for state in zip(
+                cool_down,
+                rumor_count,
+                has_rumor,
+                ever_has_rumor,
+                [SKEPTICISM_LEVELS[level] for level in skepticism],
+                [SKEPTICISM_LEVELS[level] for level in curr_skepticism],
+                should_spread
+            )
+        ]
+        world_board._link_persons(
+            cells,
+            [Person.from_state(state) for state in states],
+            [Person.from_state(state) for state in states]
+        )
+        return world_board
+
+    def state_planes(self, rumor_cool_down):
+        """
+        Export the world state as typed planes, the layout of the NumPy engine.
+
+        :type rumor_cool_down: int
+        :returns: state planes and evaluation rank of every cell
+        :rtype: (rumor_spreading_simulator.engine.numpy_kernel.StatePlanes, numpy.ndarray)
+        """
+        if self._order_planes is None:
+            order = np.full(self.board_size, -1, dtype=np.int64)
+            order[self._person_cells] = np.arange(self.population_size)
+            order = order.reshape(self.size, self.size)
+            self._order_planes = (order, *numpy_kernel.grid_evaluation_order(order, order >= 0))
+
+        order, spread_before, spread_after = self._order_planes
+        planes = numpy_kernel.empty_planes(order.shape, rumor_cool_down)
+        self.update_state_planes(planes)
+
+        return planes._replace(spread_before=spread_before.copy(), spread_after=spread_after.copy()), order.copy()
+
+    def update_state_planes(self, planes, person_indices=None):
+        """
+        Write the state of some persons to exported state planes (see state_planes), cheaper than a new export when
+        few persons changed.
+
+        :type planes: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+        :param person_indices: indices of the persons to write (all by default)
+        :type person_indices: list[int]
+        """
+        if person_indices is None:
+            persons, person_cells = self._persons, self._person_cells
+        else:
+            persons = [self._persons[person_index] for person_index in person_indices]
+            person_cells = self._person_cells[np.asarray(person_indices, dtype=np.int64)]
+
+        states = [person.state for person in persons]
+        rows, cols = np.divmod(person_cells, self.size)
+        planes.skepticism[rows, cols] = [SKEPTICISM_LEVELS.index(state.base_skepticism) for state in states]
+        planes.curr_skepticism[rows, cols] = [SKEPTICISM_LEVELS.index(state.curr_skepticism) for state in states]
+        planes.cool_down[rows, cols] = [state.cool_down for state in states]
+        planes.rumor_count[rows, cols] = [state.rumor_count for state in states]
+        planes.has_rumor[rows, cols] = [state.has_rumor for state in states]
+        planes.ever_has_rumor[rows, cols] = [state.ever_has_rumor for state in states]
+        planes.should_spread[rows, cols] = [state.should_spread for state in states]
+
+    def _place_persons(self, cells, levels, random_stream):
+        """
+        Create the persons of a world layout (see world_generation), in both generation buffers.
+
+        :param cells: flat cell index of every person
+        :type cells: numpy.ndarray
+        :param levels: skepticism level index of every person
+        :type levels: numpy.ndarray
+        :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+        """
+        attributes = list(zip(
+            [SKEPTICISM_LEVELS[level] for level in levels.tolist()],
+            random_stream.uniform(0, cells).tolist()
+        ))
+        self._link_persons(
+            cells,
+            [Person(skepticism_level, spread_draw) for skepticism_level, spread_draw in attributes],
+            [Person(skepticism_level, spread_draw) for skepticism_level, spread_draw in attributes]
+        )
+
+    def _link_persons(self, cells, persons, next_persons):
+        """
+        Place the persons in the world (in evaluation order) and build the friends index in bulk.
+
+        :param cells: flat cell index of every person
+        :type cells: numpy.ndarray
+        :type persons: list[Person]
+        :param next_persons: copies of the persons, for the next generation buffer
+        :type next_persons: list[Person]
+        """
+        cell_persons = np.full(self.board_size, -1, dtype=np.int64)
+        cell_persons[cells] = np.arange(len(cells))
+        rows, cols = np.divmod(cells, self._size)
+
+        # Friends of every person by offset (-1 for no friend), flattened row by row keeps the offsets order
+        friends = np.full((len(cells), len(self._FRIENDS_OFFSETS)), -1, dtype=np.int64)
+        for offset, (row, col) in enumerate(self._FRIENDS_OFFSETS):
+            friend_rows, friend_cols = rows + row, cols + col
+            inside = (0 <= friend_rows) & (friend_rows < self._size) & (0 <= friend_cols) & (friend_cols < self._size)
+            friends[inside, offset] = cell_persons[friend_rows[inside] * self._size + friend_cols[inside]]
+        has_friend = friends != -1
+
+        self._person_cells = np.asarray(cells, dtype=np.int64)
+        self._persons = persons
+        self._next_persons = next_persons
+        self._cells = _long_array(cell_persons)
+        self._friends = _long_array(friends[has_friend])
+        self._friends_offsets = _long_array(np.concatenate(([0], np.cumsum(np.count_nonzero(has_friend, axis=1)))))
+
+    def _person_id(self, index):
+        return PersonWorldID(*divmod(int(self._person_cells[index]), self._size))
+
+    @property
+    def person_cells(self):
+        return self._person_cells
+
+    @property
+    def persons(self):
+        return self._persons
+
+    @property
+    def next_persons(self):
+        return self._next_persons
 
     @property
     def size(self):
@@ -154,8 +317,17 @@ class WorldBoard2D:
 
     @property
     def population_size(self):
-        return len(self._ids)
+        return len(self._persons)
 
     @property
     def population_density(self):
         return self.population_size / self.board_size
+
+
+def _long_array(values):
+    """
+    Convert an integer NumPy array to array('l'), iterated much faster by the evaluation loop.
+    """
+    long_array = array('l')
+    long_array.frombytes(np.ascontiguousarray(values, dtype=np.dtype('l')).tobytes())
+    return long_array
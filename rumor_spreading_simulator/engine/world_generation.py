@@ -0,0 +1,195 @@
+import numpy as np
+
+from rumor_spreading_simulator.engine.numpy_kernel import EMPTY_CELL, SKEPTICISM_LEVELS
+
+# World layouts are generated in bulk, band of rows by band of rows, as (cells, levels, keys) arrays:
+# cells - flat cell index (row * size + col) of every person (row by row), levels - its skepticism level index,
+# keys - its evaluation key (persons are evaluated by increasing key, a random order)
+
+# Cells of a layout band, every band of rows is drawn at once (and may be packed before the next one is drawn)
+LAYOUT_BAND_CELLS = 2 ** 20
+
+# Evaluation keys are drawn in [0, 2 ** 62), ties between friends are vanishingly rare
+_EVALUATION_KEYS = 2 ** 62
+
+
+def layout_band_rows(size):
+    """
+    Rows of every layout band (the last one may be shorter), bands are the same for all engines.
+
+    :type size: int
+    :rtype: int
+    """
+    return max(LAYOUT_BAND_CELLS // size, 1)
+
+
+def place_persons(size, density, skepticism_dist, random_stream):
+    """
+    Place the persons of a new world at random cells, with random skepticism levels and evaluation keys
+    (int(density * size ** 2) persons, int(skepticism_density * persons) of every level).
+
+    :type size: int
+    :type density: float
+    :type skepticism_dist: dict[SkepticismLevel, float]
+    :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+    :returns: cells, levels and evaluation keys of the persons (row by row)
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    _, cells, levels, keys = zip(*place_band_persons(size, density, skepticism_dist, random_stream))
+    return np.concatenate(cells), np.concatenate(levels), np.concatenate(keys)
+
+
+def place_band_persons(size, density, skepticism_dist, random_stream):
+    """
+    Place the persons of a new world band by band (see place_persons), in memory bounded by a band.
+
+    The persons of every band are a multivariate hypergeometric split of the persons among the bands, their
+    cells a fixed count draw in the band, their level counts a multivariate hypergeometric split of the levels
+    left, and their levels a random assignment of these counts.
+
+    :type size: int
+    :type density: float
+    :type skepticism_dist: dict[SkepticismLevel, float]
+    :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+    :returns: (start, end) rows, cells (sorted), levels and evaluation keys of every band
+    :rtype: iter[((int, int), numpy.ndarray, numpy.ndarray, numpy.ndarray)]
+    """
+    generator = random_stream.generator
+    remaining = _level_counts(int(density * size ** 2), skepticism_dist)
+
+    for (start, end), persons in zip(*_split_bands(size, int(remaining.sum()), generator)):
+        level_counts = generator.multivariate_hypergeometric(remaining, persons)
+        remaining -= level_counts
+        cells = _place_cells(generator, (end - start) * size, persons) + start * size
+        levels = _assign_levels(generator, level_counts)
+        keys = generator.integers(_EVALUATION_KEYS, size=persons, dtype=np.int64)
+        yield (start, end), cells, levels, keys
+
+
+def place_slow_persons(size, density, skepticism_dist, random_stream):
+    """
+    Place the persons of a new *slow* world: row r prefers skepticism level r % 4, falling back to
+    the first level (S1 to S4) left when the preferred one ran out. Persons are evaluated row by row.
+
+    Levels run out one at a time, and between two run outs the levels left are fixed, so every such
+    segment of persons is assigned at once.
+
+    :type size: int
+    :type density: float
+    :type skepticism_dist: dict[SkepticismLevel, float]
+    :type random_stream: rumor_spreading_simulator.engine.random_stream.CounterRandom
+    :returns: cells, levels and evaluation keys of the persons (row by row)
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    generator = random_stream.generator
+    remaining = _level_counts(int(density * size ** 2), skepticism_dist)
+    cells = np.concatenate([
+        _place_cells(generator, (end - start) * size, persons) + start * size
+        for (start, end), persons in zip(*_split_bands(size, int(remaining.sum()), generator))
+    ])
+
+    preferred = (cells // size) % len(SKEPTICISM_LEVELS)
+    levels = np.empty(len(cells), dtype=np.int8)
+
+    start = 0
+    while start < len(cells):
+        available = remaining > 0
+        segment = np.where(available[preferred[start:]], preferred[start:], np.argmax(available))
+
+        # The segment ends where the first level runs out
+        end = len(cells)
+        for level in np.flatnonzero(available):
+            positions = np.flatnonzero(segment == level)
+            if len(positions) >= remaining[level]:
+                end = min(end, start + positions[remaining[level] - 1] + 1)
+
+        levels[start:end] = segment[:end - start]
+        remaining -= np.bincount(levels[start:end], minlength=len(SKEPTICISM_LEVELS))
+        start = end
+
+    return cells, levels, np.arange(len(cells), dtype=np.int64)
+
+
+def layout_planes(size, cells, levels, keys, start=0, end=None):
+    """
+    Base skepticism and evaluation key planes (-1 key for no person) of a world layout, or of its rows
+    start <= row < end given the persons of these rows.
+
+    :type size: int
+    :type cells: numpy.ndarray
+    :type levels: numpy.ndarray
+    :type keys: numpy.ndarray
+    :type start: int
+    :type end: int
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    rows = (size if end is None else end) - start
+    band_cells = cells - start * size if start else cells
+    skepticism = np.full(rows * size, EMPTY_CELL, dtype=np.int8)
+    skepticism[band_cells] = levels
+    order = np.full(rows * size, -1, dtype=np.int64)
+    order[band_cells] = keys
+
+    return skepticism.reshape(rows, size), order.reshape(rows, size)
+
+
+def _level_counts(persons, skepticism_dist):
+    """
+    Number of persons of every skepticism level (SKEPTICISM_LEVELS order), persons left by rounding are not placed.
+    """
+    return np.array(
+        [int(skepticism_dist.get(skepticism_level, 0) * persons) for skepticism_level in SKEPTICISM_LEVELS]
+    )
+
+
+def _split_bands(size, persons, generator):
+    """
+    Layout bands of rows, and the persons of every band (multivariate hypergeometric split by band cells).
+    """
+    band_rows = layout_band_rows(size)
+    bands = [(start, min(start + band_rows, size)) for start in range(0, size, band_rows)]
+    band_persons = generator.multivariate_hypergeometric([(end - start) * size for start, end in bands], persons)
+    return bands, band_persons.tolist()
+
+
+def _place_cells(generator, cells, persons):
+    """
+    Draw persons distinct cells out of cells (sorted), uniformly.
+
+    A Bernoulli mask is drawn, then the few cells above or below the count are dropped or added at random.
+    The result is exchangeable with a fixed count, so it is a uniform draw, without sorting a permutation.
+    """
+    occupied = generator.random(cells) < persons / cells
+    extra = int(np.count_nonzero(occupied)) - persons
+    if extra > 0:
+        occupied[generator.choice(np.flatnonzero(occupied), extra, replace=False)] = False
+    elif extra < 0:
+        occupied[generator.choice(np.flatnonzero(~occupied), -extra, replace=False)] = True
+
+    return np.flatnonzero(occupied)
+
+
+def _assign_levels(generator, level_counts):
+    """
+    Assign level_counts[level] persons of every level, uniformly at random.
+
+    Levels are drawn independently, then persons of the levels above their count are drawn and given the levels
+    below their count at random. As for _place_cells, the result is a uniform assignment, without a shuffle.
+    """
+    persons = int(level_counts.sum())
+    draws = generator.random(persons) * persons
+    levels = np.zeros(persons, dtype=np.int8)
+    for bound in np.cumsum(level_counts)[:-1]:
+        levels += draws >= bound
+
+    surplus = np.bincount(levels, minlength=len(level_counts)) - level_counts
+    if surplus.any():
+        moved = np.concatenate([
+            generator.choice(np.flatnonzero(levels == level), surplus[level], replace=False)
+            for level in np.flatnonzero(surplus > 0)
+        ])
+        levels[moved] = generator.permutation(
+            np.repeat(np.arange(len(level_counts), dtype=np.int8), np.maximum(-surplus, 0))
+        )
+
+    return levels
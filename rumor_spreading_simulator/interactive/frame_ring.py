@@ -0,0 +1,98 @@
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from rumor_spreading_simulator.engine.numpy_kernel import SKEPTICISM_LEVELS
+from rumor_spreading_simulator.engine.population_metrics import PopulationMetrics
+
+Frame = namedtuple("Frame", ["metrics", "cells"])
+
+_NO_FRAME = -1
+
+# Metrics are stored flat, the skepticism_counts (last field) taking one counter per level
+_METRICS_COUNTERS = len(PopulationMetrics._fields) - 1 + len(SKEPTICISM_LEVELS)
+
+
+class FrameRing:
+    """
+    Ring buffer of board frames in shared memory, written by a single producer process
+    and read by a consumer at its own rate.
+
+    Every slot is stamped with the sequence number of its frame, so a reader detects a slot
+    overwritten while copying it and retries with a newer frame, and never blocks the writer.
+    """
+    def __init__(self, size, slots=4, name=None):
+        """
+        :param size: world board size
+        :type size: int
+        :param slots: number of frames in the ring
+        :type slots: int
+        :param name: shared memory block of an existing ring (a new one is created if not given)
+        :type name: str
+        """
+        header_bytes = 8 * (1 + (1 + _METRICS_COUNTERS) * slots)
+        self._size = size
+        self._slots = slots
+        self._memory = shared_memory.SharedMemory(name=name, create=name is None, size=header_bytes + slots * size ** 2)
+
+        header = np.ndarray(header_bytes // 8, dtype=np.int64, buffer=self._memory.buf)
+        self._latest = header[:1]                                               # sequence number of the latest frame
+        self._stamps = header[1:1 + slots]                                      # sequence number of every slot frame
+        self._counters = header[1 + slots:].reshape(slots, _METRICS_COUNTERS)   # population metrics of every slot
+        self._cells = np.ndarray((slots, size, size), dtype=np.uint8, buffer=self._memory.buf, offset=header_bytes)
+        if name is None:
+            header[...] = _NO_FRAME
+
+    def publish(self, sequence, frame):
+        """
+        Write a frame to the ring (single writer).
+
+        :param sequence: increasing sequence number of the frame
+        :type sequence: int
+        :type frame: Frame
+        """
+        slot = sequence % self._slots
+        self._stamps[slot] = _NO_FRAME
+        self._counters[slot] = (*frame.metrics[:-1], *frame.metrics.skepticism_counts)
+        self._cells[slot] = frame.cells
+        self._stamps[slot] = sequence
+        self._latest[0] = sequence
+
+    def latest(self):
+        """
+        Copy the latest published frame.
+
+        :returns: the sequence number and the frame, None if nothing was published yet
+        :rtype: (int, Frame)
+        """
+        while True:
+            sequence = int(self._latest[0])
+            if sequence == _NO_FRAME:
+                return None
+
+            slot = sequence % self._slots
+            if self._stamps[slot] != sequence:
+                continue
+
+            counters = self._counters[slot].tolist()
+            cells = self._cells[slot].copy()
+            if self._stamps[slot] == sequence:
+                skepticism_counts = tuple(counters[-len(SKEPTICISM_LEVELS):])
+                return sequence, Frame(PopulationMetrics(*counters[:-len(SKEPTICISM_LEVELS)], skepticism_counts), cells)
+
+    def close(self):
+        del self._latest, self._stamps, self._counters, self._cells
+        self._memory.close()
+
+    def unlink(self):
+        self._memory.unlink()
+
+    @property
+    def spec(self):
+        """
+        Arguments attaching another process to the ring.
+
+        :rtype: dict
+        """
+        return dict(size=self._size, slots=self._slots, name=self._memory.name)
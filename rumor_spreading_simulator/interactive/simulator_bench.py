@@ -0,0 +1,108 @@
+import argparse
+import sys
+
+from rumor_spreading_simulator.benchmark.benchmark_runner import (
+    LAYOUT_TARGET_SECONDS, LAYOUT_TARGET_SIZE, LAYOUTS, benchmark_matrix, compare_results, load_results,
+    measure_layout, run_benchmark, save_results
+)
+from rumor_spreading_simulator.engine.engines import ENGINES, DEFAULT_ENGINE
+
+
+def result_message(result):
+    case = result.case
+    peak_rss = "-" if result.peak_rss_bytes is None else f"{result.peak_rss_bytes / 2 ** 20:.1f}"
+    return (
+        f"{case.engine:>8} M={case.world_size:<6} P={case.population_density:<5} L={case.rumor_cool_down:<3} "
+        f"S={list(case.skepticism_dist)} {case.layout:<6} | setup {result.setup_seconds:.3f}s, "
+        f"{result.generations_per_second:.2f} generations/s, peak RSS {peak_rss}MB"
+    )
+
+
+def run_command(args):
+    cases = benchmark_matrix(
+        args.engine, args.size, args.density, args.cool_down,
+        args.rumor_dist or [[0.25, 0.25, 0.25, 0.25]], args.layout
+    )
+    results = []
+    for result in run_benchmark(cases, args.generations, args.repeats, args.seed):
+        print(result_message(result))
+        results.append(result)
+
+    save_results(args.output, results, args.generations, args.repeats)
+
+
+def compare_command(args):
+    regressions = compare_results(
+        load_results(args.baseline), load_results(args.current), args.threshold, args.ignore_engine
+    )
+    for regression in regressions:
+        print(
+            f"{regression.metric} regressed by {abs(regression.change):.1%} "
+            f"({regression.baseline:.6g} -> {regression.current:.6g}): {regression.case}"
+        )
+
+    print(f"{len(regressions)} regressions over {args.threshold:.1%}")
+    return 1 if regressions else 0
+
+
+def layout_command(args):
+    seconds = measure_layout(args.size, args.density, args.repeats, args.seed)
+    print(f"M={args.size} P={args.density} layout generated in {seconds:.3f}s (target {args.target}s)")
+    return 1 if seconds > args.target else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rumor Spreading Engines Benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Benchmark a matrix of cases',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    run_parser.add_argument('-M', '--size', nargs='+', help='Sizes of the MxM world board', default=[100, 300],
+                            type=int)
+    run_parser.add_argument('-P', '--density', nargs='+', help='Population densities to randomize',
+                            default=[0.5, 0.8], type=float)
+    run_parser.add_argument('-L', '--cool-down', nargs='+', help='Cool down times between spreading rumor again',
+                            default=[5], type=int)
+    run_parser.add_argument('-S', '--rumor-dist', nargs=4, action='append', type=float,
+                            help='Population spread types distribution <S1 S2 S3 S4> (may be repeated)')
+    run_parser.add_argument('--layout', nargs='+', help='World layouts (slow for the object engines only)',
+                            default=list(LAYOUTS), choices=LAYOUTS)
+    run_parser.add_argument('-E', '--engine', nargs='+', help='Simulator engine implementations',
+                            default=[DEFAULT_ENGINE], choices=ENGINES)
+    run_parser.add_argument('-G', '--generations', help='Number of generation to measure', default=20, type=int)
+    run_parser.add_argument('-r', '--repeats', help='Number of measures per case (best one is kept)', default=3,
+                            type=int)
+    run_parser.add_argument('--seed', help='Seed of the simulations', default=0, type=int)
+    run_parser.add_argument('-O', '--output', help='JSON file of the benchmark results', default='benchmark.json')
+    run_parser.set_defaults(handler=run_command)
+
+    compare_parser = commands.add_parser('compare', help='Compare the results of two runs',
+                                         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    compare_parser.add_argument('baseline', help='JSON file of the baseline results')
+    compare_parser.add_argument('current', help='JSON file of the current results')
+    compare_parser.add_argument('-T', '--threshold', help='Relative change tolerated before a regression',
+                                default=0.1, type=float)
+    compare_parser.add_argument('--ignore-engine', action='store_true',
+                                help='Match cases regardless of the engine (compare two engine implementations)')
+    compare_parser.set_defaults(handler=compare_command)
+
+    layout_parser = commands.add_parser('layout', help='Check the world layout generation time of the array engines',
+                                        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    layout_parser.add_argument('-M', '--size', help='Size of the MxM world board', default=LAYOUT_TARGET_SIZE,
+                               type=int)
+    layout_parser.add_argument('-P', '--density', help='Population density', default=0.8, type=float)
+    layout_parser.add_argument('-T', '--target', help='Generation seconds tolerated', default=LAYOUT_TARGET_SECONDS,
+                               type=float)
+    layout_parser.add_argument('-r', '--repeats', help='Number of measures (best one is kept)', default=3, type=int)
+    layout_parser.add_argument('--seed', help='Seed of the layout', default=0, type=int)
+    layout_parser.set_defaults(handler=layout_command)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,148 @@
+import shutil
+import sys
 import time
 import argparse
 import matplotlib.pyplot as plt
+import numpy as np
 
 from rumor_spreading_simulator.engine.person import SkepticismLevel
-from rumor_spreading_simulator.engine.simulator import RumorSpreadingSimulator
+from rumor_spreading_simulator.engine.numpy_kernel import EMPTY_CELL
+from rumor_spreading_simulator.engine.engines import ENGINES, DEFAULT_ENGINE, simulator_planes
+
+
+class TerminalBoard:
+    """
+    Draws the world board with cursor addressed updates of the cells changed since the previous frame.
+
+    A board bigger than the terminal is drawn as a density view, every character summarizing a block of cells.
+    """
+    # Full view glyphs: no person, rumor, then current skepticism not exposed (green) and exposed (red) to rumor
+    CELL_GLYPHS = (
+        [" ", '\x1b[93m' + '*' + '\033[0m']
+        + ['\x1b[92m' + level.name[-1:] + '\033[0m' for level in SkepticismLevel]
+        + ['\x1b[91m' + level.name[-1:] + '\033[0m' for level in SkepticismLevel]
+    )
+    # Density view glyphs: no person, then share exposed to rumor not holding (green / red) and holding (yellow) rumor
+    DENSITY_SHADES = "·░▒▓█"
+    DENSITY_GLYPHS = (
+        [" ", '\x1b[92m' + DENSITY_SHADES[0] + '\033[0m']
+        + ['\x1b[91m' + shade + '\033[0m' for shade in DENSITY_SHADES[1:]]
+        + ['\x1b[93m' + shade + '\033[0m' for shade in DENSITY_SHADES]
+    )
+
+    def __init__(self, size, top, terminal_size):
+        """
+        :param size: world board size
+        :type size: int
+        :param top: terminal line (1 based) of the first board row
+        :type top: int
+        :type terminal_size: os.terminal_size
+        """
+        lines = max(terminal_size.lines - top, 1)
+        if 2 * size - 1 <= terminal_size.columns and size <= lines:
+            self._block = 1                     # cells per character (each way), 1 for the full view
+            self._cell_width = 2                # terminal columns per character
+            self._glyphs = self.CELL_GLYPHS
+        else:
+            self._block = max(-(-size // terminal_size.columns), -(-size // lines))
+            self._cell_width = 1
+            self._glyphs = self.DENSITY_GLYPHS
+
+        self._top = top
+        self._frame = None                      # glyph codes of the last drawn frame
+
+    def frame(self, planes):
+        """
+        Glyph code of every character.
+
+        :type planes: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+        :rtype: numpy.ndarray
+        """
+        occupied = planes.skepticism != EMPTY_CELL
+        if self._block == 1:
+            codes = np.where(planes.has_rumor, 1, 2 + planes.curr_skepticism + 4 * planes.ever_has_rumor)
+            return np.where(occupied, codes, 0)
+
+        persons, exposed, holding = (
+            self._block_sum(plane) for plane in (occupied, planes.ever_has_rumor, planes.has_rumor)
+        )
+        shades = -(-(len(self.DENSITY_SHADES) - 1) * exposed // np.maximum(persons, 1))
+        codes = 1 + shades + len(self.DENSITY_SHADES) * (holding > 0)
+        return np.where(persons > 0, codes, 0)
+
+    def draw(self, planes):
+        """
+        Terminal output updating the characters changed since the last drawn frame.
+
+        :type planes: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+        :rtype: str
+        """
+        frame = self.frame(planes)
+        changed = np.ones(frame.shape, dtype=bool) if self._frame is None else frame != self._frame
+        self._frame = frame
+
+        output = []
+        for row in np.flatnonzero(changed.any(axis=1)).tolist():
+            cols = np.flatnonzero(changed[row]).tolist()
+            glyphs = frame[row].tolist()
+            if len(cols) > len(glyphs) // 8:
+                # Many changes, rewrite the whole row at once
+                output.append(self._move(row, 0) + self._join([self._glyphs[code] for code in glyphs]))
+            else:
+                output.extend(self._move(row, col) + self._glyphs[glyphs[col]] for col in cols)
+
+        return "".join(output)
+
+    @property
+    def bottom(self):
+        """
+        Terminal line below the board.
+        """
+        return self._top + (0 if self._frame is None else len(self._frame))
+
+    @property
+    def legend(self):
+        if self._block == 1:
+            return (
+                f"\x1b[93m*\033[0m - rumor, \x1b[91mred\033[0m - exposed to rumor, "
+                f"\x1b[92mgreen\033[0m - not exposed to rumor"
+            )
+
+        return (
+            f"Density view, every character is a {self._block}x{self._block} block: "
+            f"shade ({self.DENSITY_SHADES}) - share exposed to rumor, \x1b[93myellow\033[0m - holding rumor"
+        )
+
+    def _block_sum(self, plane):
+        size = plane.shape[-1]
+        blocks = -(-size // self._block)
+        padded = np.zeros((blocks * self._block, blocks * self._block), dtype=np.int64)
+        padded[:size, :size] = plane
+        return padded.reshape(blocks, self._block, blocks, self._block).sum(axis=(1, 3))
+
+    def _move(self, row, col):
+        return f"\x1b[{self._top + row};{col * self._cell_width + 1}H"
+
+    def _join(self, glyphs):
+        return (" " if self._cell_width == 2 else "").join(glyphs)
 
 
 def simulation_loop(simulator, rate, generations):
-    print(info_message(simulator))
+    terminal_size = shutil.get_terminal_size()
+    info = info_message(simulator)
+    header_top = info.count("\n") + 5               # below the info, a blank line, the legend and a blank line
+    terminal_board = TerminalBoard(simulator.world_board.size, header_top + 3, terminal_size)
+
+    sys.stdout.write("\x1b[2J\x1b[H" + info + "\n\n" + terminal_board.legend)
     for _ in range(generations):
-        message = board_message(simulator)
-        print(board_message(simulator), end="")
+        sys.stdout.write(header_message(simulator, header_top) + terminal_board.draw(simulator_planes(simulator)))
+        sys.stdout.flush()
         time.sleep(rate)
-        print("\x1b[1A\x1b[2K" * (message.count('\n') + 1))
 
         simulator.next_generation()
 
+    sys.stdout.write(f"\x1b[{terminal_board.bottom};1H\n")
+
 
 def info_message(simulator):
     skepticism_dist_message = {skepticism.name: dist for skepticism, dist in simulator.skepticism_dist.items()}
@@ -24,43 +151,25 @@ def info_message(simulator):
         f"Population density: {simulator.world_board.population_density}",
         f"Rumor cool down time: {simulator.rumor_cool_down}",
         f"Skepticism distribution: {skepticism_dist_message}",
-        "\n"
-        f"\x1b[93m*\033[0m - rumor, \x1b[91mred\033[0m - exposed to rumor, \x1b[92mgreen\033[0m - not exposed to rumor",
-        "\n"
     ))
 
 
-def board_message(simulator):
-    board = "\n".join(
-        " ".join(
-            person_message(people) for people in row
-        )
-        for row in simulator.world_board._board
+def header_message(simulator, top):
+    """
+    Terminal output rewriting the generation counters lines, starting at terminal line top.
+    """
+    metrics = simulator.population_metrics
+    skepticism_message = ", ".join(
+        f"{level.name}: {count}" for level, count in zip(SkepticismLevel, metrics.skepticism_counts)
+    )
+    return "".join(
+        f"\x1b[{top + line};1H\x1b[2K{text}"
+        for line, text in enumerate((
+            f"Generation number: {metrics.generation}",
+            f"Rumor Count: {metrics.rumor_count}, Rumor Relative: {metrics.rumor_count / metrics.population_size}",
+            f"Holding: {metrics.holding_rumor}, Cooling Down: {metrics.cooling_down}, {skepticism_message}",
+        ))
     )
-    return "\n".join((
-        f"Generation number: {simulator.generation}",
-        f"Rumor Count: {simulator.rumor_count}",
-        f"Rumor Relative: {simulator.rumor_relative}",
-        board
-    ))
-
-
-def person_message(person):
-    if not person:
-        return " "
-
-    if person.has_rumor:
-        return '\x1b[93m' + '*' + '\033[0m'
-
-    visualize = person.curr_skepticism.name[-1:]
-
-    if person.ever_has_rumor:
-        # coloring in red cells with rumor
-        visualize = '\x1b[91m' + visualize + '\033[0m'
-    else:
-        visualize = '\x1b[92m' + visualize + '\033[0m'
-
-    return visualize
 
 
 def main():
@@ -75,16 +184,26 @@ def main():
                         default=[0.25, 0.25, 0.25, 0.25], type=float)
     parser.add_argument('-R', '--rate', help='Number of second to the next generation', default=0.5, type=float)
     parser.add_argument('-G', '--generations', help='Number of generation to simulate', default=60, type=int)
+    parser.add_argument('-E', '--engine', help='Simulator engine implementation', default=DEFAULT_ENGINE,
+                        choices=ENGINES)
+    parser.add_argument('--seed', help='Seed of the simulator random stream (random if not given)', type=int)
     args = parser.parse_args()
 
-    simulator = RumorSpreadingSimulator(
+    simulator = ENGINES[args.engine](
         world_size=args.size,
         population_density=args.density,
         rumor_cool_down=args.cool_down,
-        skepticism_dist=dict(zip(SkepticismLevel, args.rumor_dist))
+        skepticism_dist=dict(zip(SkepticismLevel, args.rumor_dist)),
+        seed=args.seed
     )
 
-    simulation_loop(simulator, args.rate, args.generations)
+    try:
+        simulation_loop(simulator, args.rate, args.generations)
+    finally:
+        # The tiled and mapped engines hold worker processes, shared memory and board files
+        close = getattr(simulator, "close", None)
+        if close is not None:
+            close()
 
     plt.title("Spread rumor process by generation")
     plt.xlabel('Generations')
@@ -1,10 +1,16 @@
+import functools
+import multiprocessing
+
 import pygame
+import numpy as np
 from easygui import multenterbox
 from collections import namedtuple
 import matplotlib.pyplot as plt
 
 from rumor_spreading_simulator.engine.person import SkepticismLevel
-from rumor_spreading_simulator.engine.simulator import RumorSpreadingSimulator
+from rumor_spreading_simulator.engine.numpy_kernel import EMPTY_CELL
+from rumor_spreading_simulator.engine.engines import ENGINES, DEFAULT_ENGINE, simulator_planes
+from rumor_spreading_simulator.interactive.frame_ring import Frame, FrameRing
 
 
 # GUI Consts
@@ -25,7 +31,8 @@ UserParams = namedtuple(
         "rumor_cool_down",
         "skepticism_dist",
         "rate",
-        "rounds"
+        "rounds",
+        "engine"
     ]
 )
 
@@ -38,12 +45,12 @@ def parse_user_params(user_params):
         rumor_cool_down=int(user_params.rumor_cool_down),
         skepticism_dist=dict(zip(SkepticismLevel, skepticism_dist_list)),
         rate=float(user_params.rate),
-        rounds=int(user_params.rounds)
+        rounds=int(user_params.rounds),
+        engine=user_params.engine.strip()
     )
 
 
 def receive_user_params():
-    RumorSpreadingSimulator()
     window_title = "Rumor Spreading Simulator"
     message_to_user = "Please choose simulator execution parameters"
     user_params_desc = [
@@ -52,96 +59,277 @@ def receive_user_params():
         "Rumor Cool Down Generations",
         "Skepticism Distribution (S1 S2 S3 S4)",
         "Simulator Generations Rate (seconds)",
-        "Simulator Generations Rounds"
+        "Simulator Generations Rounds",
+        f"Simulator Engine ({'/'.join(ENGINES)})"
     ]
-    user_default_params = ["100", "0.8", "5", "0.25 0.25 0.25 0.25", "0.2", "150"]
+    user_default_params = ["100", "0.8", "5", "0.25 0.25 0.25 0.25", "0.2", "150", DEFAULT_ENGINE]
 
     user_params = multenterbox(message_to_user, window_title, user_params_desc, user_default_params)
     return parse_user_params(UserParams(*user_params))
 
 
-def simulation_loop(simulator, rate, rounds):
+class BoardSurface:
+    """
+    Renders the world board as a colour index frame, blitted through a palette surface and scaled once.
+
+    Only the bounding box of the cells changed since the last frame is redrawn.
+    """
+    # Colour of every frame index: no person, S1 - S4 (current skepticism), rumor
+    PALETTE = [WHITE, GREEN, YELLOW, ORANGE, RED, BLACK]
+    EMPTY_INDEX = 0
+    RUMOR_INDEX = 5
+
+    def __init__(self, size, position, width):
+        """
+        :param size: world board size
+        :type size: int
+        :param position: top left corner of the board in the window
+        :type position: (int, int)
+        :param width: maximal width of the board in the window
+        :type width: int
+        """
+        self._position = position
+        self._width = width
+        self._scale = width // size                             # window pixels per cell (0 for boards wider than width)
+        self._surface = pygame.Surface((size, size), depth=8)   # a pixel per cell, x is the row and y the column
+        self._surface.set_palette(self.PALETTE)
+        self._frame = None                                      # last rendered frame
+
+    @classmethod
+    def board_frame(cls, planes):
+        """
+        Colour index of every cell.
+
+        :type planes: rumor_spreading_simulator.engine.numpy_kernel.StatePlanes
+        :rtype: numpy.ndarray
+        """
+        frame = np.where(planes.skepticism == EMPTY_CELL, cls.EMPTY_INDEX, planes.curr_skepticism + 1)
+        frame[planes.has_rumor] = cls.RUMOR_INDEX
+        return frame.astype(np.uint8)
+
+    def draw(self, win, frame):
+        """
+        Draw the cells changed since the last frame.
+
+        :type frame: numpy.ndarray
+        :returns: the window area redrawn (None if nothing changed)
+        :rtype: pygame.Rect
+        """
+        if self._frame is None or not self._scale:
+            rows, cols = (0, frame.shape[0]), (0, frame.shape[1])
+        else:
+            changed = frame != self._frame
+            changed_rows = np.flatnonzero(changed.any(axis=1))
+            if not len(changed_rows):
+                return None
+            changed_cols = np.flatnonzero(changed.any(axis=0))
+            rows, cols = (changed_rows[0], changed_rows[-1] + 1), (changed_cols[0], changed_cols[-1] + 1)
+
+        self._frame = frame
+        pygame.surfarray.blit_array(self._surface, frame)
+
+        dirty = pygame.Rect(rows[0], cols[0], rows[1] - rows[0], cols[1] - cols[0])
+        if not self._scale:
+            scaled = pygame.transform.scale(self._surface, (self._width, self._width))
+            return win.blit(scaled, self._position)
+
+        scaled = pygame.transform.scale(
+            self._surface.subsurface(dirty), (dirty.width * self._scale, dirty.height * self._scale)
+        )
+        return win.blit(scaled, (self._position[0] + dirty.x * self._scale, self._position[1] + dirty.y * self._scale))
+
+
+def draw_text(win, font, text, y, height):
+    """
+    Redraw a centered line of text over a white band.
+
+    :rtype: pygame.Rect
+    """
+    band = pygame.draw.rect(win, WHITE, (0, y, WINDOW_WIDTH, height))
+    text_box = font.render(text, 1, (100, 100, 100))
+    win.blit(text_box, ((WINDOW_WIDTH - text_box.get_width()) // 2, y))
+    return band
+
+
+SimulationInfo = namedtuple(
+    "SimulationInfo",
+    [
+        "world_size",
+        "population_density",
+        "population_size",
+        "rumor_cool_down",
+        "skepticism_dist"
+    ]
+)
+
+
+def simulation_worker(create_simulator, frame_ring_spec, rounds, stop_event, connection):
+    """
+    Background simulation process, running at full speed and publishing every generation to the frame ring.
+
+    Sends the simulation info once the simulator is created, and the spread rumors counts when done.
+    """
+    simulator = create_simulator()
+    frame_ring = None
+    try:
+        connection.send(SimulationInfo(
+            world_size=simulator.world_board.size,
+            population_density=simulator.world_board.population_density,
+            population_size=simulator.world_board.population_size,
+            rumor_cool_down=simulator.rumor_cool_down,
+            skepticism_dist=simulator.skepticism_dist
+        ))
+
+        frame_ring = FrameRing(**frame_ring_spec)
+        for sequence in range(rounds + 1):
+            frame_ring.publish(sequence, Frame(
+                metrics=simulator.population_metrics,
+                cells=BoardSurface.board_frame(simulator_planes(simulator))
+            ))
+            if sequence == rounds or stop_event.is_set():
+                break
+            simulator.next_generation()
+
+        connection.send(simulator.rumors_spread_count)
+    finally:
+        # The tiled and mapped engines hold worker processes, shared memory and board files
+        close = getattr(simulator, "close", None)
+        if close is not None:
+            close()
+        if frame_ring is not None:
+            frame_ring.close()
+
+
+def simulation_loop(frame_ring, simulation_info, worker, rate, rounds):
+    """
+    Display the latest simulated frame every rate seconds (skipping frames the simulation went past),
+    until the last generation is displayed or the window is closed.
+    """
     win = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     large_font = pygame.font.SysFont('arialblack', 35)
     small_font = pygame.font.SysFont('arialblack', 10)
     clock = pygame.time.Clock()
+    board_surface = BoardSurface(simulation_info.world_size, (0, 100), WINDOW_WIDTH)
+
+    # rendering the screen with white color
+    pygame.draw.rect(win, WHITE, (0, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    different = 40
+    x = 100
+    # blit legend to the window
+    for text, color in [("S1", GREEN), ("S2", YELLOW), ("S3", ORANGE), ("S4", RED), ("RUMOR", BLACK)]:
+        text_box = large_font.render(text, 1, color)
+        win.blit(text_box, (x + different, 50))
+        x += different + text_box.get_width()
 
-    should_run = True
-    for _ in range(rounds):
-        if not should_run:
-            break
+    skepticism_dist_message = {skepticism.name: dist for skepticism, dist in simulation_info.skepticism_dist.items()}
+    parameters = f"size = {simulation_info.world_size}, density = {simulation_info.population_density}, cooldown = {simulation_info.rumor_cool_down}, skepticism = {skepticism_dist_message}, rate = {rate}, rounds = {rounds}"
+    draw_text(win, small_font, parameters, WINDOW_HEIGHT - 30, 30)
+    pygame.display.update()
+
+    shown_sequence = None
+    while shown_sequence != rounds:
         clock.tick(1/rate)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                should_run = False
-
-        # rendering the screen with white color
-        pygame.draw.rect(win, WHITE, (0, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
-
-        generation_number_txt = large_font.render(f"Generation Number: {simulator.generation}", 1, (100, 100, 100))
-        win.blit(generation_number_txt, ((WINDOW_WIDTH - generation_number_txt.get_width()) // 2, 0))
-
-        different = 40
-        x = 100
-        # blit legend to the window
-        for text, color in [("S1", GREEN), ("S2", YELLOW), ("S3", ORANGE), ("S4", RED), ("RUMOR", BLACK)]:
-            text_box = large_font.render(text, 1, color)
-            win.blit(text_box, (x + different, 50))
-            x += different + text_box.get_width()
-
-        parameters = f"Rumor Count: {simulator.rumor_count}, Rumor Relative: {simulator.rumor_relative}"
-        parameters_text = small_font.render(parameters, 1, (100, 100, 100))
-        win.blit(parameters_text, ((WINDOW_WIDTH - parameters_text.get_width()) // 2, WINDOW_HEIGHT - 50))
-
-        skepticism_dist_message = {skepticism.name: dist for skepticism, dist in simulator.skepticism_dist.items()}
-        parameters = f"size = {simulator.world_board.size}, density = {simulator.world_board.population_density}, cooldown = {simulator.rumor_cool_down}, skepticism = {skepticism_dist_message}, rate = {rate}, rounds = {rounds}"
-        parameters_text = small_font.render(parameters, 1, (100, 100, 100))
-        win.blit(parameters_text, ((WINDOW_WIDTH - parameters_text.get_width()) // 2, WINDOW_HEIGHT - 30))
-
-        # rendering each cell into the window
-        for person_id in simulator.world_board.world_iterator():
-            person = simulator.world_board.person_by_id(person_id)
-            if person.has_rumor:
-                color = BLACK
-            elif person.curr_skepticism == SkepticismLevel.S1:
-                color = GREEN
-            elif person.curr_skepticism == SkepticismLevel.S2:
-                color = YELLOW
-            elif person.curr_skepticism == SkepticismLevel.S3:
-                color = ORANGE
-            elif person.curr_skepticism == SkepticismLevel.S4:
-                color = RED
-
-            scale = WINDOW_WIDTH // simulator.world_board.size
-            pygame.draw.rect(win, color, (person_id.row * scale, person_id.col * scale + 100, scale, scale))
-
-        simulator.next_generation()
-        pygame.display.update()
-
-
-def simulate(simulator, rate, rounds):
-    pygame.init()
-    pygame.display.set_caption("Rumor Spreading Simulation")
-    simulation_loop(simulator, rate, rounds)
+                return
+
+        latest = frame_ring.latest()
+        if latest is None or latest[0] == shown_sequence:
+            if not worker.is_alive():
+                return
+            continue
+
+        shown_sequence, frame = latest
+        dirty_rects = [
+            draw_text(win, large_font, f"Generation Number: {frame.metrics.generation}", 0, 50),
+            draw_text(win, small_font, metrics_message(frame.metrics), WINDOW_HEIGHT - 50, 20),
+            board_surface.draw(win, frame.cells),
+        ]
+        pygame.display.update([rect for rect in dirty_rects if rect is not None])
+
+
+def metrics_message(metrics):
+    skepticism_message = ", ".join(
+        f"{level.name}: {count}" for level, count in zip(SkepticismLevel, metrics.skepticism_counts)
+    )
+    return (
+        f"Rumor Count: {metrics.rumor_count}, Rumor Relative: {metrics.rumor_count / metrics.population_size:.4f}, "
+        f"Holding: {metrics.holding_rumor}, Cooling Down: {metrics.cooling_down}, {skepticism_message}"
+    )
+
+
+def receive_from_worker(connection, worker):
+    """
+    Receive the next message of the background simulation process.
+
+    :type connection: multiprocessing.connection.Connection
+    :type worker: multiprocessing.Process
+    :raises RuntimeError: the process died before sending it
+    """
+    try:
+        return connection.recv()
+    except EOFError:
+        worker.join()
+        raise RuntimeError(f"The simulation process died (exit code {worker.exitcode})") from None
+
+
+def simulate(create_simulator, world_size, rate, rounds):
+    """
+    Simulate in a background process, displaying its frames at the GUI own rate.
+
+    :param create_simulator: simulator factory, called in the background process
+    :type create_simulator: callable
+    :type world_size: int
+    :param rate: seconds between displayed frames
+    :type rate: float
+    :param rounds: number of generations to simulate
+    :type rounds: int
+    :raises RuntimeError: the simulation process died
+    """
+    frame_ring = FrameRing(world_size)
+    stop_event = multiprocessing.Event()
+    connection, worker_connection = multiprocessing.Pipe()
+    worker = multiprocessing.Process(
+        target=simulation_worker,
+        args=(create_simulator, frame_ring.spec, rounds, stop_event, worker_connection)
+    )
+    try:
+        worker.start()
+        worker_connection.close()           # a dead worker is seen as the end of the connection
+
+        pygame.init()
+        pygame.display.set_caption("Rumor Spreading Simulation")
+        simulation_loop(frame_ring, receive_from_worker(connection, worker), worker, rate, rounds)
+
+        stop_event.set()
+        rumors_spread_count = receive_from_worker(connection, worker)
+        worker.join()
+    finally:
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+        frame_ring.close()
+        frame_ring.unlink()
+        pygame.quit()
 
     plt.title("Spread rumor process by generation")
     plt.xlabel('Generations')
     plt.ylabel('Spread Process')
-    plt.plot(range(len(simulator.rumors_spread_count)), simulator.rumors_spread_count)
+    plt.plot(range(len(rumors_spread_count)), rumors_spread_count)
     plt.show()
 
-    pygame.quit()
-
 
 def main():
     user_params = receive_user_params()
-    simulator = RumorSpreadingSimulator(
+    create_simulator = functools.partial(
+        ENGINES[user_params.engine],
         world_size=user_params.world_size,
         population_density=user_params.population_density,
         rumor_cool_down=user_params.rumor_cool_down,
         skepticism_dist=user_params.skepticism_dist
     )
-    simulate(simulator, user_params.rate, user_params.rounds)
+    simulate(create_simulator, user_params.world_size, user_params.rate, user_params.rounds)
 
 
 if __name__ == '__main__':
@@ -1,35 +1,174 @@
 import argparse
-import matplotlib.pyplot as plt
+import collections
+import functools
+import itertools
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
 
 from rumor_spreading_simulator.engine.person import SkepticismLevel
-from rumor_spreading_simulator.engine.simulator import RumorSpreadingSimulator
+from rumor_spreading_simulator.engine.engines import ENGINES, DEFAULT_ENGINE, create_simulator
+from rumor_spreading_simulator.engine.ensemble_simulator import EnsembleRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.random_stream import spawn_seeds
+from rumor_spreading_simulator.interactive.trial_statistics import TrialAggregator
+
+# A finished trial, and the population size of its world (the coverage denominator)
+Trial = namedtuple("Trial", ["rumors_spread_count", "population_size"])
+
+
+def simulation_loop(
+        engine, simulator_params, times, generations, workers=1, seed=None, ensemble=False, output=None,
+        plot="stats.png"
+):
+    trial_aggregator = create_aggregator(simulator_params, generations)
+    trials = simulate_trials(engine, simulator_params, times, generations, workers, seed, ensemble)
+    for t, trial in enumerate(trials):
+        print(f"Finished round #{t+1}...")
+        trial_aggregator.add(trial.rumors_spread_count, trial.population_size)
+
+    report(trial_aggregator, output, plot)
+
+
+def adaptive_simulation_loop(
+        engine, simulator_params, precision, max_times, generations, workers=1, seed=None, confidence=0.95,
+        relative=False, output=None, plot="stats.png"
+):
+    """
+    Simulate trials until the confidence interval of every generation mean is within the precision
+    (or max_times trials were simulated), then plot the mean and its confidence interval.
+    """
+    trial_aggregator = create_aggregator(simulator_params, generations)
+    trial_statistics = trial_aggregator.statistics
+    trials = simulate_ordered_trials(engine, simulator_params, max_times, generations, workers, seed)
+    for trial in trials:
+        trial_aggregator.add(trial.rumors_spread_count, trial.population_size)
+        half_width = trial_statistics.confidence_half_width(confidence).max()
+        print(f"Finished round #{trial_statistics.count}... confidence interval half width: {half_width:.4f}")
+
+        if trial_statistics.converged(precision, confidence, relative):
+            trials.close()
+            print(f"Converged after {trial_statistics.count} rounds")
+            break
+    else:
+        print(f"Not converged after {trial_statistics.count} rounds")
+
+    report(trial_aggregator, output, plot, confidence)
+
+
+def create_aggregator(simulator_params, generations):
+    """
+    Aggregator of the trials of a world, its counts bounded by the board cells (the coverages are relative to the
+    population of every trial, see Trial).
+
+    :rtype: TrialAggregator
+    """
+    return TrialAggregator(generations + 1, max(simulator_params["world_size"] ** 2, 1))
+
+
+def report(trial_aggregator, output=None, plot=None, confidence=None):
+    """
+    Print the distributions summary, and save the aggregated results and plot.
+
+    :type trial_aggregator: TrialAggregator
+    """
+    exposure_times = ", ".join(f"{value:.1f}" for value in trial_aggregator.exposure_time_quantiles())
+    coverages = ", ".join(f"{value:.3f}" for value in trial_aggregator.coverage_quantiles())
+    print(f"First exposure generation (p5, p50, p95): {exposure_times}")
+    print(f"Final coverage (p5, p50, p95): {coverages}")
+
+    if output:
+        trial_aggregator.save(output)
+    if plot:
+        trial_aggregator.plot(plot, confidence)
+        print(f"Plot saved to {plot}")
+
+
+def simulate_ordered_trials(engine, simulator_params, times, generations, workers=1, seed=None):
+    """
+    Simulate independent trials lazily, yielding each Trial in seed order.
+
+    Trials are only simulated a few ahead of the consumer, so closing the generator stops the simulation,
+    and the trials before a stop are the same ones whatever the number of workers.
+    """
+    seeds = iter(spawn_seeds(seed, times))
+    if workers == 1:
+        for trial_seed in seeds:
+            yield from run_trials(engine, simulator_params, generations, [trial_seed])
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            futures = collections.deque(
+                executor.submit(run_trials, engine, simulator_params, generations, [trial_seed])
+                for trial_seed in itertools.islice(seeds, 2 * workers)
+            )
+            while futures:
+                trials = futures.popleft().result()
+                for trial_seed in itertools.islice(seeds, 1):
+                    futures.append(executor.submit(run_trials, engine, simulator_params, generations, [trial_seed]))
+
+                yield from trials
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+def simulate_trials(engine, simulator_params, times, generations, workers=1, seed=None, ensemble=False):
+    """
+    Simulate independent trials, yielding each Trial as it finishes.
+
+    Every trial gets its own seed spawned from the given seed, so the set of results
+    does not depend on the number of workers (nor on ensemble, for the numpy engine).
+    """
+    seeds = spawn_seeds(seed, times)
+    if ensemble:
+        # A batch of trials per worker, simulated as the replicas of a single ensemble simulator
+        tasks = [
+            functools.partial(run_ensemble, simulator_params, generations, batch.tolist())
+            for batch in np.array_split(np.array(seeds, dtype=np.uint64), workers) if len(batch)
+        ]
+    else:
+        tasks = [
+            functools.partial(run_trials, engine, simulator_params, generations, [trial_seed])
+            for trial_seed in seeds
+        ]
+
+    if workers == 1:
+        for task in tasks:
+            yield from task()
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(task) for task in tasks]
+        for future in as_completed(futures):
+            yield from future.result()
 
 
-def simulation_loop(simulator, times, generations):
-    rumors_spread_count_summary = None
-    rumors_spread_count_size = 0
-    for t in range(times):
-        print(f"Simulating round #{t+1}...")
+def run_trials(engine, simulator_params, generations, seeds):
+    """
+    :rtype: list[Trial]
+    """
+    trials = []
+    for seed in seeds:
+        simulator = create_simulator(engine, seed=seed, **simulator_params)
         simulator.jump_generation(generations)
+        trials.append(Trial(simulator.rumors_spread_count, simulator.world_board.population_size))
 
-        # Keep the spread rumor sum of all previous simulations
-        if rumors_spread_count_summary:
-            rumors_spread_count_summary = [
-                x + y for x, y in zip(rumors_spread_count_summary, simulator.rumors_spread_count)
-            ]
-        else:
-            rumors_spread_count_summary = simulator.rumors_spread_count
-            rumors_spread_count_size = len(simulator.rumors_spread_count)
+    return trials
 
-        simulator = simulator.generate_new_age()
 
-    # Plot the average graph
-    rumors_spread_count_summary = [x / times for x in rumors_spread_count_summary]
-    plt.title("Spread rumor process by generation")
-    plt.xlabel('Generations')
-    plt.ylabel('Spread Process')
-    plt.plot(range(rumors_spread_count_size), rumors_spread_count_summary)
-    plt.show()
+def run_ensemble(simulator_params, generations, seeds):
+    """
+    :rtype: list[Trial]
+    """
+    simulator = EnsembleRumorSpreadingSimulator(seeds=seeds, **simulator_params)
+    simulator.jump_generation(generations)
+    return [
+        Trial(rumors_spread_count, int(population_size))
+        for rumors_spread_count, population_size in zip(
+            simulator.rumors_spread_count.tolist(), simulator.population_size
+        )
+    ]
 
 
 def main():
@@ -44,16 +183,47 @@ def main():
                         default=[0.25, 0.25, 0.25, 0.25], type=float)
     parser.add_argument('-T', '--times', help='Number of times to simulate execution', default=1, type=int)
     parser.add_argument('-G', '--generations', help='Number of generation to simulate', default=60, type=int)
+    parser.add_argument('-E', '--engine', choices=ENGINES,
+                        help=f'Simulator engine implementation ({DEFAULT_ENGINE} by default, numpy with --ensemble)')
+    parser.add_argument('-W', '--workers', help='Number of processes simulating trials', default=1, type=int)
+    parser.add_argument('--seed', help='Seed of the trials random streams (random if not given)', type=int)
+    parser.add_argument('--ensemble', help='Simulate the trials of every worker at once, as replicas of the numpy engine',
+                        action='store_true')
+    parser.add_argument('--precision', type=float,
+                        help='Simulate trials until the confidence interval half width of every generation mean is '
+                             'within the precision (instead of a fixed number of times)')
+    parser.add_argument('--max-times', help='Maximal number of times to simulate execution (with --precision)',
+                        default=1000, type=int)
+    parser.add_argument('--confidence', help='Confidence level of the intervals (with --precision)', default=0.95,
+                        type=float)
+    parser.add_argument('--relative', action='store_true',
+                        help='Precision is relative to the peak of the mean curve (with --precision)')
+    parser.add_argument('-O', '--output', help='File of the aggregated results (.csv summary, or .npz)')
+    parser.add_argument('--plot', help='Image file of the aggregated results plot', default='stats.png')
     args = parser.parse_args()
+    if args.precision is not None and args.ensemble:
+        parser.error("--precision does not support --ensemble")
+    if args.ensemble and args.engine not in (None, 'numpy'):
+        parser.error(f"--ensemble simulates the numpy engine only, it does not support --engine {args.engine}")
+    engine = args.engine or ('numpy' if args.ensemble else DEFAULT_ENGINE)
 
-    simulator = RumorSpreadingSimulator(
+    simulator_params = dict(
         world_size=args.size,
         population_density=args.density,
         rumor_cool_down=args.cool_down,
         skepticism_dist=dict(zip(SkepticismLevel, args.rumor_dist))
     )
 
-    simulation_loop(simulator, args.times, args.generations)
+    if args.precision is not None:
+        adaptive_simulation_loop(
+            engine, simulator_params, args.precision, args.max_times, args.generations, args.workers,
+            args.seed, args.confidence, args.relative, args.output, args.plot
+        )
+    else:
+        simulation_loop(
+            engine, simulator_params, args.times, args.generations, args.workers, args.seed, args.ensemble,
+            args.output, args.plot
+        )
 
 
 if __name__ == '__main__':
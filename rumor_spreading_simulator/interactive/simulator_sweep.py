@@ -0,0 +1,64 @@
+import os
+import csv
+import argparse
+
+from rumor_spreading_simulator.engine.engines import ENGINES, DEFAULT_ENGINE
+from rumor_spreading_simulator.sweep.result_cache import ResultCache
+from rumor_spreading_simulator.sweep.sweep_runner import run_sweep, sweep_grid
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "rumor-spreading-simulator")
+
+
+def write_results(results, output):
+    with open(output, "w", newline="") as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow([
+            "world_size", "population_density", "rumor_cool_down", "S1", "S2", "S3", "S4",
+            "seed", "rumor_count", "extinction_generation", "rumors_spread_count"
+        ])
+        for result in results:
+            writer.writerow([
+                result.point.world_size,
+                result.point.population_density,
+                result.point.rumor_cool_down,
+                *result.point.skepticism_dist,
+                result.seed,
+                sum(result.rumors_spread_count),
+                "" if result.extinction_generation is None else result.extinction_generation,
+                " ".join(str(count) for count in result.rumors_spread_count)
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rumor Spreading Parameters Sweep",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('-M', '--size', nargs='+', help='Sizes of the MxM world board', default=[100], type=int)
+    parser.add_argument('-P', '--density', nargs='+', help='Population densities to randomize', default=[0.8],
+                        type=float)
+    parser.add_argument('-L', '--cool-down', nargs='+', help='Cool down times between spreading rumor again',
+                        default=[5], type=int)
+    parser.add_argument('-S', '--rumor-dist', nargs=4, action='append', type=float,
+                        help='Population spread types distribution <S1 S2 S3 S4> (may be repeated)')
+    parser.add_argument('-G', '--generations', help='Number of generation to simulate', default=60, type=int)
+    parser.add_argument('--seeds', nargs='+', help='Seeds to simulate every point with', default=[0], type=int)
+    parser.add_argument('-E', '--engine', help='Simulator engine implementation', default=DEFAULT_ENGINE,
+                        choices=ENGINES)
+    parser.add_argument('-W', '--workers', help='Number of processes simulating points', default=1, type=int)
+    parser.add_argument('--cache-dir', help='Results cache directory', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--cache-size', help='Maximal results cache size (MB)', default=256, type=float)
+    parser.add_argument('-O', '--output', help='CSV file of the sweep results', default='sweep.csv')
+    args = parser.parse_args()
+
+    points = sweep_grid(args.size, args.density, args.cool_down, args.rumor_dist or [[0.25, 0.25, 0.25, 0.25]])
+    cache = ResultCache(args.cache_dir, max_bytes=int(args.cache_size * 2 ** 20))
+    results = run_sweep(points, args.seeds, args.generations, args.engine, cache, args.workers)
+
+    cached_count = sum(result.cached for result in results)
+    print(f"Swept {len(points)} points x {len(args.seeds)} seeds, {cached_count} results from cache")
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+import statistics
+
+import numpy as np
+
+# Trials required before a confidence interval is trusted (the normal approximation is poor below)
+MIN_TRIALS = 10
+
+
+class TrialStatistics:
+    """
+    Per-generation mean and variance of the trials rumors_spread_count, from exact integer sums updated
+    as every trial finishes, without keeping the trials. The sums do not depend on the order the trials
+    are added in, so neither do the statistics (trials may finish in any order across workers).
+    """
+    def __init__(self):
+        self._count = 0             # number of trials added
+        self._sum = None            # sum of every generation (int64)
+        self._sum_sq = None         # sum of squares of every generation (Python ints, may overflow int64)
+
+    def add(self, rumors_spread_count):
+        """
+        Add the rumors_spread_count of a finished trial.
+
+        :type rumors_spread_count: list[int]
+        """
+        series = np.asarray(rumors_spread_count, dtype=np.int64)
+        if self._sum is None:
+            self._sum = np.zeros(series.shape, dtype=np.int64)
+            self._sum_sq = np.zeros(series.shape, dtype=object)
+
+        self._count += 1
+        self._sum += series
+        squares = series.astype(object)
+        self._sum_sq += squares * squares
+
+    def confidence_half_width(self, confidence=0.95):
+        """
+        Half width of the confidence interval of every generation mean (normal approximation).
+
+        :type confidence: float
+        :rtype: numpy.ndarray
+        """
+        z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+        return z * np.sqrt(self.variance / self._count)
+
+    def converged(self, precision, confidence=0.95, relative=False, min_count=MIN_TRIALS):
+        """
+        Check whether the confidence interval of every generation mean is within the precision.
+
+        :param precision: maximal confidence interval half width
+        :type precision: float
+        :type confidence: float
+        :param relative: precision is relative to the peak of the mean curve
+        :type relative: bool
+        :param min_count: trials required before checking
+        :type min_count: int
+        :rtype: bool
+        """
+        if self._count < max(min_count, 2):
+            return False
+
+        if relative:
+            precision *= self.mean.max()
+
+        return bool(self.confidence_half_width(confidence).max() <= precision)
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def mean(self):
+        if self._sum is None:
+            return None
+
+        return self._sum / self._count
+
+    @property
+    def variance(self):
+        """
+        Sample variance of every generation (zeros for less than 2 trials).
+
+        :rtype: numpy.ndarray
+        """
+        if self._count < 2:
+            return np.zeros(self._sum.shape) if self._sum is not None else None
+
+        # n * sum_sq - sum ** 2 is computed exactly, then divided once
+        sums = self._sum.astype(object)
+        deviations = self._count * self._sum_sq - sums * sums
+        return deviations.astype(np.float64) / (self._count * (self._count - 1))
+
+
+class TrialAggregator:
+    """
+    Fold the trials rumors_spread_count into fixed size accumulators, so the memory does not depend on
+    the number of trials: the per-generation mean and variance, a histogram sketch of every generation
+    (for streaming quantiles), the first exposure time histogram of all exposed persons, and the final
+    coverage histogram of the trials.
+    """
+    QUANTILES = (0.05, 0.5, 0.95)
+
+    def __init__(self, generations, population_size, bins=256, coverage_bins=100):
+        """
+        :param generations: length of a trial rumors_spread_count (shorter ones are padded with zeros)
+        :type generations: int
+        :param population_size: largest count of a generation, and the coverage denominator of the trials added
+                                without their own population size
+        :type population_size: int
+        :param bins: histogram bins of every generation (geometric, exact for small counts)
+        :type bins: int
+        :param coverage_bins: histogram bins of the final coverage
+        :type coverage_bins: int
+        """
+        self._generations = generations
+        self._population_size = population_size
+        self._statistics = TrialStatistics()
+
+        self._edges = _geometric_edges(population_size, bins)                           # count histogram bin edges
+        self._histograms = np.zeros((generations, len(self._edges) - 1), dtype=np.int64)
+        self._exposure_times = np.zeros(generations, dtype=np.int64)                   # exposures by generation
+        self._coverages = np.zeros(coverage_bins, dtype=np.int64)                      # trials by coverage bin
+
+    def add(self, rumors_spread_count, population_size=None):
+        """
+        Fold the rumors_spread_count of a finished trial.
+
+        :type rumors_spread_count: list[int]
+        :param population_size: population size of the trial world (its coverage denominator)
+        :type population_size: int
+        """
+        series = np.asarray(rumors_spread_count, dtype=np.int64)
+        if len(series) > self._generations:
+            raise ValueError(f"Trial of {len(series)} generations, aggregating {self._generations} generations")
+
+        series = np.pad(series, (0, self._generations - len(series)))
+        self._statistics.add(series)
+
+        bins = np.searchsorted(self._edges, series, side="right") - 1
+        self._histograms[np.arange(self._generations), np.minimum(bins, self._histograms.shape[1] - 1)] += 1
+        self._exposure_times += series
+
+        coverage = series.sum() / (population_size or self._population_size)
+        self._coverages[min(int(coverage * len(self._coverages)), len(self._coverages) - 1)] += 1
+
+    def quantiles(self, quantiles=QUANTILES):
+        """
+        Quantiles of every generation count, estimated from its histogram sketch.
+
+        :rtype: numpy.ndarray
+        """
+        return np.array([_histogram_quantiles(histogram, self._edges, quantiles) for histogram in self._histograms]).T
+
+    def exposure_time_quantiles(self, quantiles=QUANTILES):
+        """
+        Quantiles of the generation persons were first exposed to the rumor in, over all trials.
+
+        :rtype: numpy.ndarray
+        """
+        return _histogram_quantiles(self._exposure_times, np.arange(self._generations + 1), quantiles)
+
+    def coverage_quantiles(self, quantiles=QUANTILES):
+        """
+        Quantiles of the final share of the population exposed to the rumor in a trial.
+
+        :rtype: numpy.ndarray
+        """
+        return _histogram_quantiles(
+            self._coverages, np.linspace(0, 1, len(self._coverages) + 1), quantiles, discrete=False
+        )
+
+    def save(self, path):
+        """
+        Save the aggregated results, a per-generation summary as CSV (.csv) or all the accumulators as .npz.
+
+        :type path: str
+        """
+        quantiles = self.quantiles()
+        if path.endswith(".csv"):
+            header = ["generation", "mean", "std", *(f"p{round(100 * q)}" for q in self.QUANTILES), "exposures"]
+            columns = [
+                np.arange(self._generations), self.mean, np.sqrt(self.variance), *quantiles, self._exposure_times
+            ]
+            np.savetxt(path, np.column_stack(columns), delimiter=",", header=",".join(header), comments="", fmt="%.6g")
+            return
+
+        np.savez_compressed(
+            path,
+            count=self.count,
+            population_size=self._population_size,
+            mean=self.mean,
+            variance=self.variance,
+            quantiles=np.array(self.QUANTILES),
+            generation_quantiles=quantiles,
+            histogram_edges=self._edges,
+            histograms=self._histograms,
+            exposure_times=self._exposure_times,
+            coverages=self._coverages,
+        )
+
+    def plot(self, path, confidence=None):
+        """
+        Plot the mean, quantiles band (and confidence interval) of every generation to an image file (headless).
+
+        :type path: str
+        :param confidence: confidence level of the mean interval to shade (not shaded if not given)
+        :type confidence: float
+        """
+        # A bare Figure is drawn without pyplot, so no display (or interactive backend) is needed
+        from matplotlib.figure import Figure
+
+        figure = Figure(figsize=(10, 4))
+        generations_axes, coverage_axes = figure.subplots(1, 2, gridspec_kw=dict(width_ratios=(3, 1)))
+        generations = np.arange(self._generations)
+        low, median, high = self.quantiles((self.QUANTILES[0], 0.5, self.QUANTILES[-1]))
+
+        generations_axes.set_title(f"Spread rumor process by generation ({self.count} trials)")
+        generations_axes.set_xlabel('Generations')
+        generations_axes.set_ylabel('Spread Process')
+        generations_axes.fill_between(generations, low, high, alpha=0.2, label="p5 - p95")
+        generations_axes.plot(generations, median, linestyle="--", label="median")
+        generations_axes.plot(generations, self.mean, label="mean")
+        if confidence is not None:
+            half_width = self._statistics.confidence_half_width(confidence)
+            generations_axes.fill_between(
+                generations, self.mean - half_width, self.mean + half_width, alpha=0.4,
+                label=f"{confidence:.0%} confidence"
+            )
+        generations_axes.legend()
+
+        coverage_axes.set_title("Final coverage")
+        coverage_axes.set_xlabel('Population exposed')
+        coverage_axes.set_ylabel('Trials')
+        coverage_axes.stairs(self._coverages, np.linspace(0, 1, len(self._coverages) + 1), fill=True)
+
+        figure.tight_layout()
+        figure.savefig(path)
+
+    @property
+    def statistics(self):
+        return self._statistics
+
+    @property
+    def count(self):
+        return self._statistics.count
+
+    @property
+    def mean(self):
+        return self._statistics.mean
+
+    @property
+    def variance(self):
+        return self._statistics.variance
+
+    @property
+    def exposure_times(self):
+        return self._exposure_times
+
+    @property
+    def coverages(self):
+        return self._coverages
+
+
+def _geometric_edges(max_value, bins):
+    """
+    Integer histogram bin edges over [0, max_value], of width 1 for small values and growing geometrically.
+    """
+    return np.unique(np.concatenate(([0], np.geomspace(1, max_value + 1, bins))).astype(np.int64))
+
+
+def _histogram_quantiles(histogram, edges, quantiles, discrete=True):
+    """
+    Quantiles of the values counted in a histogram, interpolated linearly inside a bin.
+
+    A discrete bin [a, b) holds the integers a to b - 1, a continuous one the whole range.
+    """
+    cumulative = np.cumsum(histogram)
+    if cumulative[-1] == 0:
+        return np.full(len(quantiles), np.nan)
+
+    ranks = np.asarray(quantiles) * cumulative[-1]
+    bins = np.minimum(np.searchsorted(cumulative, ranks, side="right"), len(histogram) - 1)
+    before = np.where(bins > 0, cumulative[bins - 1], 0)
+    fraction = (ranks - before) / np.maximum(histogram[bins], 1)
+    return edges[bins] + np.clip(fraction, 0, 1) * (edges[bins + 1] - edges[bins] - discrete)
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+
+class ResultCache:
+    """
+    Local content-addressed cache of simulation results, with size based (least recently used) eviction.
+
+    A result is a set of named compact arrays (e.g. a per-generation series) stored in a single file, so it is
+    cached and evicted as a whole, under the hash of everything that determines it.
+    """
+    _SUFFIX = ".npz"
+
+    def __init__(self, root, max_bytes=256 * 2 ** 20):
+        """
+        :param root: cache directory
+        :type root: str
+        :param max_bytes: maximal total size of the cached results
+        :type max_bytes: int
+        """
+        self._root = root
+        self._max_bytes = max_bytes
+        self._entries = {}          # result path -> (last use time, size in bytes)
+
+        os.makedirs(root, exist_ok=True)
+        for directory, _, files in os.walk(root):
+            for file_name in files:
+                if file_name.endswith(self._SUFFIX):
+                    path = os.path.join(directory, file_name)
+                    stat = os.stat(path)
+                    self._entries[path] = (stat.st_mtime, stat.st_size)
+        self._evict()
+
+    @staticmethod
+    def key(**result_params):
+        """
+        Content address of a result, by the parameters determining it.
+
+        :rtype: str
+        """
+        canonical = json.dumps(result_params, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Get a cached result by key.
+
+        :type key: str
+        :returns: the result arrays by name, or None when not cached
+        :rtype: dict[str, numpy.ndarray]
+        """
+        path = self._path(key)
+        if path not in self._entries:
+            return None
+
+        with np.load(path) as result_file:
+            result = dict(result_file)
+        self._entries[path] = (_touch(path), self._entries[path][1])
+        return result
+
+    def put(self, key, **result):
+        """
+        Cache a result by key, evicting least recently used results when the cache is full.
+
+        :type key: str
+        :param result: result arrays by name (non-negative integers, stored in their smallest type)
+        :type result: list[int]
+        """
+        result = {name: np.asarray(array) for name, array in result.items()}
+        result = {
+            name: array.astype(np.min_scalar_type(int(array.max(initial=0)))) for name, array in result.items()
+        }
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as temp_file:
+            np.savez(temp_file, **result)
+        os.replace(temp_path, path)
+
+        self._entries[path] = (_touch(path), os.stat(path).st_size)
+        self._evict()
+
+    def _evict(self):
+        total_bytes = sum(size for _, size in self._entries.values())
+        for path, (_, size) in sorted(self._entries.items(), key=lambda entry: entry[1][0]):
+            if total_bytes <= self._max_bytes:
+                break
+
+            os.remove(path)
+            del self._entries[path]
+            total_bytes -= size
+
+    def _path(self, key):
+        return os.path.join(self._root, key[:2], key + self._SUFFIX)
+
+    def __contains__(self, key):
+        return self._path(key) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return sum(size for _, size in self._entries.values())
+
+
+def _touch(path):
+    """
+    Stamp the last use time of a cached result (in nanoseconds, the system file times may be a few ms coarse).
+
+    :returns: the last use time
+    :rtype: float
+    """
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+    return os.stat(path).st_mtime
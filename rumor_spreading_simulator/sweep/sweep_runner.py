@@ -0,0 +1,120 @@
+import itertools
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from rumor_spreading_simulator.engine.engines import ENGINE_VERSION, create_simulator
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+
+SweepPoint = namedtuple(
+    "SweepPoint",
+    [
+        "world_size",
+        "population_density",
+        "rumor_cool_down",
+        "skepticism_dist",      # tuple of S1 S2 S3 S4 densities
+    ]
+)
+
+SweepResult = namedtuple(
+    "SweepResult",
+    [
+        "point",
+        "seed",
+        "rumors_spread_count",
+        "extinction_generation",    # first generation nobody holds the rumor nor cools down (None if never)
+        "cached",
+    ]
+)
+
+
+def sweep_grid(world_sizes, population_densities, rumor_cool_downs, skepticism_dists):
+    """
+    All the points of a parameters grid.
+
+    :rtype: list[SweepPoint]
+    """
+    return [
+        SweepPoint(*params)
+        for params in itertools.product(
+            world_sizes, population_densities, rumor_cool_downs, [tuple(dist) for dist in skepticism_dists]
+        )
+    ]
+
+
+def result_key(cache, engine, point, seed, generations):
+    return cache.key(
+        engine=engine,
+        engine_version=ENGINE_VERSION,
+        params=point._asdict(),
+        seed=seed,
+        generations=generations,
+    )
+
+
+def run_sweep(points, seeds, generations, engine, cache, workers=1):
+    """
+    Simulate every point of the sweep for every seed, never recomputing a cached result.
+
+    :type points: list[SweepPoint]
+    :type seeds: list[int]
+    :type generations: int
+    :type engine: str
+    :type cache: rumor_spreading_simulator.sweep.result_cache.ResultCache
+    :type workers: int
+    :rtype: list[SweepResult]
+    """
+    results = {}
+    missing = []
+    for point, seed in itertools.product(points, seeds):
+        cached = cache.get(result_key(cache, engine, point, seed, generations))
+        if cached is None:
+            missing.append((point, seed))
+        else:
+            # The extinction generation is cached as an array of its own, empty when the rumor never died out
+            extinction = cached["extinction_generation"]
+            extinction_generation = int(extinction[0]) if len(extinction) else None
+            results[point, seed] = SweepResult(
+                point, seed, cached["rumors_spread_count"].tolist(), extinction_generation, cached=True
+            )
+
+    computed = simulate_points(engine, missing, generations, workers)
+    for (point, seed), (series, extinction_generation) in zip(missing, computed):
+        cache.put(
+            result_key(cache, engine, point, seed, generations),
+            rumors_spread_count=series,
+            extinction_generation=[] if extinction_generation is None else [extinction_generation],
+        )
+        results[point, seed] = SweepResult(point, seed, series, extinction_generation, cached=False)
+
+    return [results[point, seed] for point, seed in itertools.product(points, seeds)]
+
+
+def simulate_points(engine, points_seeds, generations, workers=1):
+    """
+    Simulate (point, seed) pairs, yielding each rumors_spread_count and extinction generation in order.
+    """
+    if workers == 1:
+        for point, seed in points_seeds:
+            yield run_point(engine, point, seed, generations)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_point, engine, point, seed, generations)
+            for point, seed in points_seeds
+        ]
+        for future in futures:
+            yield future.result()
+
+
+def run_point(engine, point, seed, generations):
+    simulator = create_simulator(
+        engine,
+        seed=seed,
+        world_size=point.world_size,
+        population_density=point.population_density,
+        rumor_cool_down=point.rumor_cool_down,
+        skepticism_dist=dict(zip(SkepticismLevel, point.skepticism_dist))
+    )
+    simulator.jump_generation(generations)
+    return simulator.rumors_spread_count, simulator.extinction_generation
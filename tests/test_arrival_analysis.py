@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.analysis.arrival_analysis import (
+    arrival_origin, front_radius, reached_cluster, spread_velocity
+)
+from rumor_spreading_simulator.engine.numpy_kernel import NOT_ARRIVED
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+
+
+def ring_arrivals(size, origin):
+    """
+    Arrival times of a front moving a ring of friends per generation.
+    """
+    rows, cols = np.indices((size, size))
+    return np.maximum(np.abs(rows - origin[0]), np.abs(cols - origin[1]))
+
+
+def test_ring_front():
+    arrival_times = ring_arrivals(11, (5, 3))
+    arrival_times[0, 0] = NOT_ARRIVED
+
+    assert arrival_origin(arrival_times) == (5, 3)
+    assert front_radius(arrival_times).tolist() == list(range(8))
+    assert front_radius(arrival_times, generations=3).tolist() == [0, 1, 2, 3]
+    assert spread_velocity(front_radius(arrival_times)) == pytest.approx(1.0)
+
+
+def test_wrapped_distances():
+    arrival_times = np.full((10, 10), NOT_ARRIVED)
+    arrival_times[0, 0] = 0
+    arrival_times[9, 9] = 1
+
+    assert front_radius(arrival_times).tolist() == [0, 9]
+    assert front_radius(arrival_times, wrap=True).tolist() == [0, 1]
+    assert front_radius(arrival_times, metric='euclidean', wrap=True)[1] == np.hypot(1, 1)
+
+
+def test_stalled_front_has_no_velocity():
+    assert spread_velocity(np.zeros(5)) == 0.0
+    assert spread_velocity(np.array([0, 2, 4, 4, 4])) == pytest.approx(2.0)
+
+
+def test_reached_cluster():
+    arrival_times = np.full((4, 4), NOT_ARRIVED)
+    arrival_times[:, 1] = [3, 2, 0, 5]
+
+    assert reached_cluster(arrival_times) == (4, True, False)
+    assert reached_cluster(arrival_times, generation=3) == (3, False, False)
+    assert reached_cluster(arrival_times[1:, 1]) == (3, None, None)
+
+
+def test_simulated_front_moves_a_ring_per_generation_at_most():
+    simulator = NumpyRumorSpreadingSimulator(world_size=40, population_density=0.9, rumor_cool_down=1, seed=1)
+    simulator.jump_generation(30)
+    radius = front_radius(simulator.arrival_times)
+
+    assert reached_cluster(simulator.arrival_times).size == simulator.rumor_count
+    assert np.all(np.diff(radius) <= 1)
+    assert 0 < spread_velocity(radius) <= 1
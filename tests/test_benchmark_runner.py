@@ -0,0 +1,44 @@
+from rumor_spreading_simulator.benchmark.benchmark_runner import (
+    BenchmarkResult, benchmark_matrix, compare_results, load_results, measure_case, measure_layout, save_results
+)
+
+UNIFORM_DIST = (0.25, 0.25, 0.25, 0.25)
+
+
+def result(case, setup_seconds, generations_per_second, peak_rss_bytes):
+    return BenchmarkResult(case, setup_seconds, generations_per_second, peak_rss_bytes, base_rss_bytes=0)
+
+
+def test_slow_layout_cases_only_for_the_object_engines():
+    cases = benchmark_matrix(["object", "numpy"], [10, 20], [0.8], [5], [UNIFORM_DIST], ["random", "slow"])
+
+    assert len(cases) == 6
+    assert {case.engine for case in cases if case.layout == "slow"} == {"object"}
+
+
+def test_measured_results_round_trip(tmp_path):
+    case, = benchmark_matrix(["numpy"], [20], [0.8], [5], [UNIFORM_DIST], ["random"])
+    setup_seconds, generations_per_second, peak_rss_bytes, base_rss_bytes = measure_case(case, 5, seed=1)
+    assert setup_seconds > 0 and generations_per_second > 0
+
+    results = [result(case, setup_seconds, generations_per_second, peak_rss_bytes)]
+    path = str(tmp_path / "results.json")
+    save_results(path, results, generations=5, repeats=1)
+    assert load_results(path) == results
+
+
+def test_regressions_beyond_the_threshold():
+    numpy_case, object_case = benchmark_matrix(["numpy", "object"], [20], [0.8], [5], [UNIFORM_DIST], ["random"])
+    baseline = [result(numpy_case, 1.0, 100.0, 1000)]
+
+    assert compare_results(baseline, [result(numpy_case, 1.05, 95.0, 1000)]) == []
+    regressions = compare_results(baseline, [result(numpy_case, 1.5, 50.0, 1000)])
+    assert [(regression.metric, regression.change) for regression in regressions] == [
+        ("setup_seconds", 0.5), ("generations_per_second", -0.5)
+    ]
+    assert compare_results(baseline, [result(object_case, 2.0, 1.0, 9000)]) == []
+    assert len(compare_results(baseline, [result(object_case, 2.0, 1.0, 9000)], ignore_engine=True)) == 3
+
+
+def test_layout_is_measured():
+    assert measure_layout(100, repeats=2) > 0
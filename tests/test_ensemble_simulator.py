@@ -0,0 +1,27 @@
+import numpy as np
+
+from rumor_spreading_simulator.engine.ensemble_simulator import EnsembleRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.interactive.simulator_stats import simulate_trials
+
+SIMULATOR_PARAMS = dict(world_size=25, population_density=0.7, rumor_cool_down=2)
+
+
+def test_replicas_match_the_numpy_engine():
+    ensemble = EnsembleRumorSpreadingSimulator(replicas=4, seed=9, **SIMULATOR_PARAMS)
+    ensemble.jump_generation(20)
+
+    for replica, seed in enumerate(ensemble.seeds):
+        simulator = NumpyRumorSpreadingSimulator(seed=seed, **SIMULATOR_PARAMS)
+        simulator.jump_generation(20)
+        assert ensemble.rumors_spread_count[replica].tolist() == simulator.rumors_spread_count
+        assert ensemble.rumor_count[replica] == simulator.rumor_count
+        for ensemble_plane, plane in zip(ensemble.planes, simulator.world_board.planes):
+            assert np.array_equal(ensemble_plane[replica], plane)
+
+
+def test_ensemble_trials_match_the_numpy_trials():
+    trials = list(simulate_trials("numpy", SIMULATOR_PARAMS, 5, 10, seed=2))
+    ensemble_trials = list(simulate_trials("numpy", SIMULATOR_PARAMS, 5, 10, workers=2, seed=2, ensemble=True))
+
+    assert sorted(ensemble_trials) == sorted(trials)
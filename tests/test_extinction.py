@@ -0,0 +1,34 @@
+import pytest
+
+from rumor_spreading_simulator.engine.engines import ENGINES
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+
+# Mostly skeptical persons, the rumor goes extinct within a few generations
+SIMULATOR_PARAMS = dict(
+    world_size=30, population_density=0.5, rumor_cool_down=2,
+    skepticism_dist=dict(zip(SkepticismLevel, [0.0, 0.1, 0.2, 0.7])), seed=3
+)
+
+
+def run(engine, jumps):
+    simulator = ENGINES[engine](**SIMULATOR_PARAMS)
+    for steps in jumps:
+        simulator.jump_generation(steps)
+    if hasattr(simulator, "close"):
+        simulator.close()
+    return simulator
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_fast_forward_matches_stepping(engine):
+    stepped = run(engine, [1] * 60)
+    jumped = run(engine, [7, 53])
+
+    assert stepped.extinction_generation is not None and stepped.extinction_generation < 40
+    assert jumped.extinction_generation == stepped.extinction_generation
+    assert jumped.generation == stepped.generation == 60
+    assert jumped.rumors_spread_count == stepped.rumors_spread_count
+    assert len(jumped.rumors_spread_count) == 61
+    assert not any(jumped.rumors_spread_count[stepped.extinction_generation + 1:])
+    assert jumped.population_metrics == stepped.population_metrics
+    assert jumped.population_metrics.holding_rumor == jumped.population_metrics.cooling_down == 0
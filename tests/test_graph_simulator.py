@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.graph_simulator import GraphRumorSpreadingSimulator, node_levels
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.random_stream import CounterRandom
+
+
+@pytest.fixture
+def edge_list(tmp_path):
+    path = tmp_path / "edges.txt"
+    edges = np.random.default_rng(3).integers(0, 300, size=(900, 2)) * 7
+    np.savetxt(path, edges, fmt="%d", header="random contacts")
+    return str(path)
+
+
+def graph_simulators(edge_list):
+    return [
+        GraphRumorSpreadingSimulator(world_size=24, rumor_cool_down=2, topology='torus', seed=1),
+        GraphRumorSpreadingSimulator(world_size=24, rumor_cool_down=2, topology='k_nearest', k=6, seed=2),
+        GraphRumorSpreadingSimulator(rumor_cool_down=2, topology='edge_list', edge_list=edge_list, seed=3),
+    ]
+
+
+def test_snapshot_resumes_the_same_run(tmp_path, edge_list):
+    for simulator, twin in zip(graph_simulators(edge_list), graph_simulators(edge_list)):
+        path = str(tmp_path / f"{simulator.topology}.snapshot")
+        simulator.jump_generation(4)
+        simulator.save_snapshot(path)
+        resumed = GraphRumorSpreadingSimulator.load_snapshot(path)
+
+        assert resumed.topology == simulator.topology
+        assert np.array_equal(resumed.world_board.labels, simulator.world_board.labels)
+        resumed.jump_generation(8)
+        twin.jump_generation(12)
+        assert resumed.rumors_spread_count == twin.rumors_spread_count
+        assert np.array_equal(resumed.arrival_times, twin.arrival_times)
+
+
+def test_grid_and_graph_snapshots_do_not_mix(tmp_path):
+    graph_path, grid_path = str(tmp_path / "graph.snapshot"), str(tmp_path / "grid.snapshot")
+    GraphRumorSpreadingSimulator(world_size=10, seed=1).save_snapshot(graph_path)
+    NumpyRumorSpreadingSimulator(world_size=10, seed=1).save_snapshot(grid_path)
+
+    with pytest.raises(ValueError):
+        NumpyRumorSpreadingSimulator.load_snapshot(graph_path)
+    with pytest.raises(ValueError):
+        GraphRumorSpreadingSimulator.load_snapshot(grid_path)
+
+
+@pytest.mark.parametrize("node_count", [1, 7, 10, 1001])
+def test_node_levels_apportion_every_node(node_count):
+    skepticism_dist = {level: 1 / 3 for level in (SkepticismLevel.S1, SkepticismLevel.S2, SkepticismLevel.S4)}
+    counts = np.bincount(node_levels(node_count, skepticism_dist, CounterRandom(0)), minlength=4)
+
+    assert counts.sum() == node_count
+    assert counts[2] == 0                   # S3 is not in the distribution
+    assert counts.max() - counts[[0, 1, 3]].min() <= 1
+
+
+def test_node_levels_normalize_the_distribution():
+    skepticism_dist = {SkepticismLevel.S1: 0.2, SkepticismLevel.S2: 0.2}
+    counts = np.bincount(node_levels(11, skepticism_dist, CounterRandom(0)), minlength=4)
+
+    assert counts.tolist() == [6, 5, 0, 0]
@@ -0,0 +1,40 @@
+import pytest
+
+from rumor_spreading_simulator.engine.instrumentation import HOT_PATHS, HotPathProfile
+from rumor_spreading_simulator.engine.person import Person
+from rumor_spreading_simulator.engine.simulator import RumorSpreadingSimulator
+
+
+def hot_path_methods():
+    return {(cls, name): cls.__dict__[name] for cls, names in HOT_PATHS.items() for name in names}
+
+
+def test_profile_counts_and_restores_the_methods():
+    originals = hot_path_methods()
+    simulator = RumorSpreadingSimulator(world_size=20, seed=2)
+    metrics = []
+    simulator.add_observer(metrics.append)
+
+    with HotPathProfile(timed=True) as profile:
+        simulator.jump_generation(3)
+
+    calls = {stats.name: stats.calls for stats in profile.stats}
+    assert calls["Person.notify_generation_start"] == sum(generation.evaluated_persons for generation in metrics)
+    assert calls["Person.notify_rumor"] == sum(generation.spreads for generation in metrics)
+    assert hot_path_methods() == originals
+
+
+def test_nested_profile_raises():
+    originals = hot_path_methods()
+    with HotPathProfile() as profile:
+        with pytest.raises(RuntimeError, match="already active"):
+            with HotPathProfile():
+                pass
+        with pytest.raises(RuntimeError, match="already active"):
+            with profile:
+                pass
+        assert Person.__dict__["notify_rumor"] is not originals[Person, "notify_rumor"]
+
+    assert hot_path_methods() == originals
+    with HotPathProfile():
+        pass
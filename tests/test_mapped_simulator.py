@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.mapped_simulator import MappedRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.packed_simulator import PackedRumorSpreadingSimulator
+
+
+@pytest.mark.parametrize("world_size, rumor_cool_down", [(40, 20), (1100, 3)])
+def test_runs_match_the_packed_engine(tmp_path, world_size, rumor_cool_down):
+    params = dict(world_size=world_size, population_density=0.7, rumor_cool_down=rumor_cool_down, seed=5)
+    packed = PackedRumorSpreadingSimulator(**params)
+    packed.jump_generation(12)
+
+    with MappedRumorSpreadingSimulator(directory=str(tmp_path), **params) as mapped:
+        mapped.next_generation()
+        mapped.jump_generation(11)
+        assert mapped.rumors_spread_count == packed.rumors_spread_count
+        assert mapped.population_metrics == packed.population_metrics
+        assert np.array_equal(mapped.arrival_times, packed.arrival_times)
+        assert np.array_equal(mapped.world_board.packed, packed.world_board.packed)
+
+
+def test_board_file_is_removed_on_close(tmp_path):
+    with MappedRumorSpreadingSimulator(world_size=30, directory=str(tmp_path), seed=1) as simulator:
+        path = simulator.world_board.path
+        assert os.path.dirname(path) == str(tmp_path)
+        assert os.path.getsize(path) == simulator.world_board.bytes_per_cell * 30 ** 2
+
+        new_age = simulator.generate_new_age()
+        assert new_age.directory == str(tmp_path)
+        new_age.close()
+
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.engines import simulator_planes
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.simulator import RumorSpreadingSimulator
+
+SKEWED_DIST = dict(zip(SkepticismLevel, [0.1, 0.2, 0.3, 0.4]))
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_runs_match_the_object_engine(seed):
+    params = dict(world_size=30, population_density=0.7, rumor_cool_down=2, skepticism_dist=SKEWED_DIST, seed=seed)
+    numpy = NumpyRumorSpreadingSimulator(**params)
+    objects = RumorSpreadingSimulator(**params)
+    numpy.jump_generation(25)
+    objects.jump_generation(25)
+
+    assert numpy.rumors_spread_count == objects.rumors_spread_count
+    assert numpy.rumor_count == objects.rumor_count
+    assert numpy.population_metrics == objects.population_metrics
+    assert np.array_equal(numpy.arrival_times, objects.arrival_times)
+    for numpy_plane, object_plane in zip(simulator_planes(numpy), simulator_planes(objects)):
+        assert np.array_equal(numpy_plane, object_plane)
+
+
+def test_generate_new_age_keeps_the_parameters():
+    simulator = NumpyRumorSpreadingSimulator(world_size=20, population_density=0.5, rumor_cool_down=4, seed=1)
+    new_age = simulator.generate_new_age()
+
+    assert new_age.world_board.size == 20
+    assert new_age.world_board.population_density == 0.5
+    assert new_age.rumor_cool_down == 4
+    assert new_age.seed != simulator.seed
+    assert new_age.rumors_spread_count == [1]
@@ -0,0 +1,48 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.packed_simulator import PackedRumorSpreadingSimulator, PackedWorldBoard2D
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.random_stream import CounterRandom
+
+UNIFORM_DIST = {skepticism_level: 0.25 for skepticism_level in SkepticismLevel}
+
+
+@pytest.mark.parametrize("rumor_cool_down, bytes_per_cell", [(5, 2), (15, 2), (16, 4), (200, 4)])
+def test_bytes_per_cell(rumor_cool_down, bytes_per_cell):
+    simulator = PackedRumorSpreadingSimulator(world_size=50, rumor_cool_down=rumor_cool_down, seed=1)
+    world_board = simulator.world_board
+
+    assert world_board.bytes_per_cell == bytes_per_cell
+    assert world_board.packed.nbytes == bytes_per_cell * 50 ** 2
+
+
+def test_setup_memory_is_bounded_by_a_band():
+    size = 4000
+    tracemalloc.start()
+    try:
+        world_board, _ = PackedWorldBoard2D.generate_board(size, 0.8, UNIFORM_DIST, CounterRandom(1), 5)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # A full board layout alone (evaluation keys and skepticism, 9 bytes per cell) would take 137 MiB here
+    assert world_board.packed.nbytes == 2 * size ** 2
+    assert peak - world_board.packed.nbytes < 128 * 2 ** 20
+
+
+@pytest.mark.parametrize("world_size, rumor_cool_down", [(40, 20), (1100, 3)])
+def test_runs_match_the_numpy_engine(world_size, rumor_cool_down):
+    params = dict(world_size=world_size, population_density=0.7, rumor_cool_down=rumor_cool_down, seed=4)
+    packed = PackedRumorSpreadingSimulator(**params)
+    numpy = NumpyRumorSpreadingSimulator(**params)
+    packed.jump_generation(12)
+    numpy.jump_generation(12)
+
+    assert packed.rumors_spread_count == numpy.rumors_spread_count
+    assert np.array_equal(packed.arrival_times, numpy.arrival_times)
+    for packed_plane, numpy_plane in zip(packed.world_board.planes, numpy.world_board.planes):
+        assert np.array_equal(packed_plane, numpy_plane)
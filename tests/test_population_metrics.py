@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine import numpy_kernel
+from rumor_spreading_simulator.engine.engines import ENGINES, simulator_planes
+from rumor_spreading_simulator.engine.numpy_kernel import StatePlanes
+from rumor_spreading_simulator.engine.population_metrics import add_counts, count_population
+
+SIMULATOR_PARAMS = dict(world_size=30, population_density=0.7, rumor_cool_down=3, seed=3)
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_kept_metrics_match_a_board_scan(engine):
+    simulator = ENGINES[engine](**SIMULATOR_PARAMS)
+    for steps in (1, 1, 4, 10):
+        simulator.jump_generation(steps)
+        planes = simulator_planes(simulator)
+        metrics = simulator.population_metrics
+
+        assert metrics.generation == simulator.generation
+        assert metrics.rumor_count == simulator.rumor_count == np.count_nonzero(planes.ever_has_rumor)
+        assert metrics[3:] == tuple(count_population(planes))
+        assert sum(metrics.skepticism_counts) == metrics.population_size
+
+    if hasattr(simulator, "close"):
+        simulator.close()
+
+
+@pytest.mark.parametrize("rumor_cool_down", [0, 1, 4])
+def test_count_changes_match_a_recount(rumor_cool_down):
+    simulator = ENGINES["numpy"](**dict(SIMULATOR_PARAMS, rumor_cool_down=rumor_cool_down))
+    for _ in range(15):
+        planes = simulator.world_board.planes
+        spreaders = numpy_kernel.spreaders_mask(planes)
+        draws = np.random.default_rng(simulator.generation).random(planes.skepticism.shape)
+        new_planes, _, count_changes = numpy_kernel.advance(
+            planes, spreaders, simulator.world_board.spreader_counts(spreaders), rumor_cool_down, draws
+        )
+
+        assert add_counts(count_population(planes), count_changes) == count_population(new_planes)
+        simulator.next_generation()
+
+
+def test_strip_counts_add_up():
+    simulator = ENGINES["numpy"](**SIMULATOR_PARAMS)
+    simulator.jump_generation(5)
+    planes = simulator.world_board.planes
+    strips = [
+        count_population(StatePlanes(*(plane[rows] for plane in planes))) for rows in np.array_split(np.arange(30), 4)
+    ]
+
+    assert add_counts(*strips) == count_population(planes)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.engines import create_simulator
+from rumor_spreading_simulator.engine.random_stream import CounterRandom, counter_uniform, spawn_seeds
+
+SIMULATOR_PARAMS = dict(world_size=25, population_density=0.7, rumor_cool_down=2)
+
+
+def test_draws_do_not_depend_on_how_cells_are_split():
+    random_stream = CounterRandom(7)
+    cells = np.arange(1000)
+    draws = random_stream.uniform(3, cells)
+
+    assert np.array_equal(np.concatenate([random_stream.uniform(3, part) for part in np.split(cells, 4)]), draws)
+    assert np.array_equal(random_stream.uniform(3, cells[::-1]), draws[::-1])
+    assert not np.array_equal(random_stream.uniform(4, cells), draws)
+    assert draws.min() >= 0 and draws.max() < 1
+    assert abs(draws.mean() - 0.5) < 0.05
+
+
+def test_keys_broadcast_against_cells():
+    keys = np.array([CounterRandom(seed).key for seed in (1, 2)]).reshape(-1, 1)
+    cells = np.arange(10)
+    draws = counter_uniform(keys, 5, cells)
+
+    assert draws.shape == (2, 10)
+    assert np.array_equal(draws[1], CounterRandom(2).uniform(5, cells))
+
+
+def test_restored_stream_continues_the_same_draws():
+    random_stream = CounterRandom(3)
+    random_stream.generator.random(10)
+    restored = CounterRandom.from_state(random_stream.state)
+
+    assert restored.key == random_stream.key
+    assert restored.spawn_seed() == random_stream.spawn_seed()
+
+
+def test_spawned_seeds_are_reproducible():
+    assert spawn_seeds(5, 4) == spawn_seeds(5, 4)
+    assert spawn_seeds(5, 4)[:2] == spawn_seeds(5, 2)
+    assert len(set(spawn_seeds(5, 4))) == 4
+
+
+@pytest.mark.parametrize("engine", ["object", "numpy", "packed"])
+def test_seeded_runs_are_reproducible(engine):
+    runs = []
+    for seed in (11, 11, 12):
+        simulator = create_simulator(engine, seed=seed, **SIMULATOR_PARAMS)
+        simulator.jump_generation(15)
+        runs.append((simulator.rumors_spread_count, simulator.arrival_times))
+
+    assert runs[0][0] == runs[1][0]
+    assert np.array_equal(runs[0][1], runs[1][1])
+    assert not np.array_equal(runs[0][1], runs[2][1])
@@ -0,0 +1,36 @@
+import numpy as np
+
+from rumor_spreading_simulator.sweep.result_cache import ResultCache
+
+
+def test_key_does_not_depend_on_the_parameters_order():
+    assert ResultCache.key(world_size=10, seed=1) == ResultCache.key(seed=1, world_size=10)
+    assert ResultCache.key(world_size=10, seed=1) != ResultCache.key(world_size=10, seed=2)
+
+
+def test_results_round_trip_in_their_smallest_type(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = ResultCache.key(seed=1)
+    cache.put(key, rumors_spread_count=[1, 4, 300, 0], extinction_generation=[])
+
+    result = ResultCache(str(tmp_path)).get(key)
+    assert result["rumors_spread_count"].tolist() == [1, 4, 300, 0]
+    assert result["rumors_spread_count"].dtype == np.uint16
+    assert result["extinction_generation"].tolist() == []
+    assert cache.get(ResultCache.key(seed=2)) is None
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    first, second, third = (ResultCache.key(seed=seed) for seed in range(3))
+    cache.put(first, rumors_spread_count=[1, 2, 3])
+    entry_bytes = cache.size_bytes
+
+    cache = ResultCache(str(tmp_path), max_bytes=2 * entry_bytes)
+    cache.put(second, rumors_spread_count=[4, 5, 6])
+    cache.get(first)
+    cache.put(third, rumors_spread_count=[7, 8, 9])
+
+    assert first in cache and third in cache
+    assert second not in cache
+    assert len(cache) == 2
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.engines import simulator_planes
+from rumor_spreading_simulator.engine.simulator import RumorSpreadingSimulator
+
+PARAMS = dict(world_size=40, population_density=0.6, rumor_cool_down=3)
+
+
+@pytest.mark.parametrize("seed", [1, 5, 8])
+def test_sparse_runs_match_dense_runs(seed):
+    dense = RumorSpreadingSimulator(seed=seed, **PARAMS)
+    sparse = RumorSpreadingSimulator(sparse=True, seed=seed, **PARAMS)
+    for _ in range(30):
+        dense.next_generation()
+        sparse.next_generation()
+
+    assert sparse.rumors_spread_count == dense.rumors_spread_count
+    assert np.array_equal(sparse.arrival_times, dense.arrival_times)
+    # The sparse mode does not redraw the spread decisions of idle persons, only those of rumor holders matter
+    dense_planes, sparse_planes = simulator_planes(dense), simulator_planes(sparse)
+    dense_planes = dense_planes._replace(should_spread=dense_planes.should_spread & dense_planes.has_rumor)
+    sparse_planes = sparse_planes._replace(should_spread=sparse_planes.should_spread & sparse_planes.has_rumor)
+    for dense_plane, sparse_plane in zip(dense_planes, sparse_planes):
+        assert np.array_equal(sparse_plane, dense_plane)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_kept_planes_export_matches_a_new_export(sparse):
+    simulator = RumorSpreadingSimulator(sparse=sparse, seed=2, **PARAMS)
+    for steps in [1, 1, 3, 1, 5]:
+        simulator.jump_generation(steps)
+        planes = simulator.state_planes()
+        exported_planes, _ = simulator.world_board.state_planes(simulator.rumor_cool_down)
+        for plane, exported_plane in zip(planes, exported_planes):
+            assert np.array_equal(plane, exported_plane)
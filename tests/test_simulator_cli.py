@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.interactive import simulator_cli
+from rumor_spreading_simulator.interactive.simulator_cli import TerminalBoard
+
+TERMINAL_SIZE = os.terminal_size((80, 40))
+
+
+def test_only_changed_cells_are_redrawn():
+    simulator = NumpyRumorSpreadingSimulator(world_size=20, population_density=0.8, rumor_cool_down=2, seed=1)
+    terminal_board = TerminalBoard(20, 3, TERMINAL_SIZE)
+    planes = simulator.world_board.planes
+
+    assert terminal_board.draw(planes).count("\x1b[") > 20
+    assert terminal_board.draw(planes) == ""
+    assert terminal_board.bottom == 23
+
+    changed_planes = planes._replace(has_rumor=planes.has_rumor.copy())
+    row, col = np.argwhere((planes.skepticism >= 0) & ~planes.has_rumor)[0]
+    changed_planes.has_rumor[row, col] = True
+    assert terminal_board.draw(changed_planes) == f"\x1b[{3 + row};{2 * col + 1}H" + TerminalBoard.CELL_GLYPHS[1]
+
+
+def test_big_boards_are_drawn_as_density_blocks():
+    simulator = NumpyRumorSpreadingSimulator(world_size=200, population_density=0.5, rumor_cool_down=2, seed=1)
+    terminal_board = TerminalBoard(200, 3, TERMINAL_SIZE)
+    frame = terminal_board.frame(simulator.world_board.planes)
+
+    # 200 cells in 37 lines, blocks of 6 x 6 cells
+    assert frame.shape == (34, 34)
+    assert "6x6" in terminal_board.legend
+    occupied = np.zeros((34 * 6, 34 * 6), dtype=bool)
+    occupied[:200, :200] = simulator.world_board.planes.skepticism >= 0
+    assert np.array_equal(frame > 0, occupied.reshape(34, 6, 34, 6).any(axis=(1, 3)))
+    assert np.count_nonzero(frame > len(TerminalBoard.DENSITY_SHADES)) == 1
+
+
+def test_simulator_is_closed_when_the_run_fails(monkeypatch):
+    simulators = []
+
+    class ClosedSimulator(NumpyRumorSpreadingSimulator):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    def create_simulator(**params):
+        simulators.append(ClosedSimulator(**params))
+        return simulators[-1]
+
+    def failing_loop(*args):
+        raise ZeroDivisionError("injected")
+
+    monkeypatch.setitem(simulator_cli.ENGINES, "numpy", create_simulator)
+    monkeypatch.setattr(simulator_cli, "simulation_loop", failing_loop)
+    monkeypatch.setattr("sys.argv", ["rumor-sim-cli", "-M", "10", "-E", "numpy"])
+
+    with pytest.raises(ZeroDivisionError):
+        simulator_cli.main()
+    simulator, = simulators
+    assert simulator.closed
@@ -0,0 +1,76 @@
+import multiprocessing
+import threading
+
+import numpy as np
+import pygame
+import pytest
+
+from rumor_spreading_simulator.engine.numpy_kernel import EMPTY_CELL
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.interactive import simulator_gui
+from rumor_spreading_simulator.interactive.frame_ring import FrameRing
+from rumor_spreading_simulator.interactive.simulator_gui import BoardSurface
+
+
+def failing_simulator():
+    raise ZeroDivisionError("injected")
+
+
+def test_dead_simulation_process_raises_and_releases_the_frame_ring(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    frame_rings = []
+
+    class RecordedFrameRing(FrameRing):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            frame_rings.append(self)
+
+    monkeypatch.setattr(simulator_gui, "FrameRing", RecordedFrameRing)
+    quits = []
+    monkeypatch.setattr(simulator_gui.pygame, "quit", lambda: quits.append(True))
+
+    with pytest.raises(RuntimeError, match="simulation process died"):
+        simulator_gui.simulate(failing_simulator, world_size=10, rate=0.01, rounds=5)
+
+    assert quits
+    frame_ring, = frame_rings
+    with pytest.raises(FileNotFoundError):
+        FrameRing(10, name=frame_ring.spec["name"])
+
+
+class ClosedSimulator(NumpyRumorSpreadingSimulator):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_simulation_worker_closes_the_simulator_when_it_fails():
+    simulator = ClosedSimulator(world_size=10, seed=1)
+    connection, worker_connection = multiprocessing.Pipe()
+
+    # The frame ring to attach does not exist
+    with pytest.raises(FileNotFoundError):
+        simulator_gui.simulation_worker(
+            lambda: simulator, dict(size=10, name="no_such_frame_ring"), 5, threading.Event(), worker_connection
+        )
+    assert simulator.closed
+    assert connection.recv().world_size == 10
+
+
+def test_board_surface_redraws_the_changed_cells_only():
+    simulator = NumpyRumorSpreadingSimulator(world_size=10, population_density=0.8, rumor_cool_down=2, seed=1)
+    planes = simulator.world_board.planes
+    frame = BoardSurface.board_frame(planes)
+    assert np.array_equal(frame == BoardSurface.EMPTY_INDEX, planes.skepticism == EMPTY_CELL)
+    assert np.array_equal(frame == BoardSurface.RUMOR_INDEX, planes.has_rumor)
+
+    win = pygame.Surface((100, 100))
+    board_surface = BoardSurface(10, (0, 0), 100)
+    assert board_surface.draw(win, frame) == pygame.Rect(0, 0, 100, 100)
+    assert board_surface.draw(win, frame.copy()) is None
+
+    changed = frame.copy()
+    changed[2, 7] = BoardSurface.RUMOR_INDEX if frame[2, 7] != BoardSurface.RUMOR_INDEX else 1
+    assert board_surface.draw(win, changed) == pygame.Rect(20, 70, 10, 10)
+    assert win.get_at((25, 75))[:3] == BoardSurface.PALETTE[changed[2, 7]]
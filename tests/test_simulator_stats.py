@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.random_stream import spawn_seeds
+from rumor_spreading_simulator.interactive import simulator_stats
+from rumor_spreading_simulator.interactive.simulator_stats import run_trials, simulate_ordered_trials, simulate_trials
+from rumor_spreading_simulator.interactive.trial_statistics import TrialStatistics
+
+SIMULATOR_PARAMS = dict(world_size=20, population_density=0.8, rumor_cool_down=3)
+
+
+def test_trials_do_not_depend_on_workers():
+    single = list(simulate_trials("object", SIMULATOR_PARAMS, 6, 8, workers=1, seed=3))
+    pooled = list(simulate_trials("object", SIMULATOR_PARAMS, 6, 8, workers=2, seed=3))
+
+    assert len(single) == 6
+    assert sorted(single) == sorted(pooled)
+
+
+def test_trials_are_the_seeded_runs():
+    seeds = spawn_seeds(4, 3)
+    trials = list(simulate_trials("numpy", SIMULATOR_PARAMS, 3, 8, seed=4))
+
+    assert trials == run_trials("numpy", SIMULATOR_PARAMS, 8, seeds)
+    assert len({tuple(trial.rumors_spread_count) for trial in trials}) > 1
+
+
+def test_ordered_trials_are_in_seed_order_whatever_the_workers():
+    seeds = spawn_seeds(6, 5)
+    expected = run_trials("numpy", SIMULATOR_PARAMS, 8, seeds)
+
+    assert list(simulate_ordered_trials("numpy", SIMULATOR_PARAMS, 5, 8, workers=1, seed=6)) == expected
+    assert list(simulate_ordered_trials("numpy", SIMULATOR_PARAMS, 5, 8, workers=2, seed=6)) == expected
+
+
+def test_ordered_trials_stop_when_closed():
+    trials = simulate_ordered_trials("numpy", SIMULATOR_PARAMS, 100, 8, workers=2, seed=6)
+    first = next(trials)
+    trials.close()
+
+    assert first == run_trials("numpy", SIMULATOR_PARAMS, 8, spawn_seeds(6, 1))[0]
+    assert next(trials, None) is None
+
+
+def test_confidence_interval_convergence():
+    trial_statistics = TrialStatistics()
+    for value in [10, 12] * 5:
+        trial_statistics.add([1, value])
+
+    # sd of [10, 12] * 5 is sqrt(10 / 9), the 95% interval half width is 1.96 sd / sqrt(10)
+    half_width = trial_statistics.confidence_half_width(0.95)
+    assert half_width[0] == 0
+    assert half_width[1] == pytest.approx(1.959964 * np.sqrt(10 / 9 / 10))
+    assert trial_statistics.converged(0.7)
+    assert not trial_statistics.converged(0.6)
+    assert trial_statistics.converged(0.7 / 11, relative=True)
+    assert not trial_statistics.converged(0.7, min_count=11)
+
+
+@pytest.mark.parametrize("engine", ["object", "numpy", "packed"])
+def test_trials_hold_their_world_population(engine):
+    trial, = run_trials(engine, SIMULATOR_PARAMS, 40, spawn_seeds(2, 1))
+    persons = 4 * int(0.25 * int(0.8 * 20 ** 2))
+
+    assert trial.population_size == persons
+    assert sum(trial.rumors_spread_count) <= persons
+
+
+def test_ensemble_rejects_other_engines(monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["rumor-sim-stats", "--ensemble", "-E", "packed"])
+
+    with pytest.raises(SystemExit):
+        simulator_stats.main()
+    assert "--ensemble simulates the numpy engine only" in capsys.readouterr().err
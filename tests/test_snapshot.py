@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.engines import simulator_planes
+from rumor_spreading_simulator.engine import snapshot
+from rumor_spreading_simulator.engine.graph_simulator import GraphRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.mapped_simulator import MappedRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.packed_simulator import PackedRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.simulator import RumorSpreadingSimulator
+from rumor_spreading_simulator.engine.tiled_simulator import TiledRumorSpreadingSimulator
+
+SIMULATOR_PARAMS = dict(world_size=30, population_density=0.7, rumor_cool_down=3, seed=4)
+ENGINES = {
+    "object": RumorSpreadingSimulator,
+    "numpy": NumpyRumorSpreadingSimulator,
+    "tiled": TiledRumorSpreadingSimulator,
+}
+
+
+def close(simulator):
+    if hasattr(simulator, "close"):
+        simulator.close()        # the tiled engine workers, its state is kept
+
+
+def assert_same_run(simulator, other):
+    assert simulator.generation == other.generation
+    assert simulator.rumors_spread_count == other.rumors_spread_count
+    assert simulator.rumor_count == other.rumor_count
+    assert simulator.extinction_generation == other.extinction_generation
+    assert simulator.population_metrics == other.population_metrics
+    assert np.array_equal(simulator.arrival_times, other.arrival_times)
+    planes, other_planes = simulator_planes(simulator), simulator_planes(other)
+    # Only the spread decisions of the rumor holders are kept up to date by every engine
+    planes = planes._replace(should_spread=planes.should_spread & planes.has_rumor)
+    other_planes = other_planes._replace(should_spread=other_planes.should_spread & other_planes.has_rumor)
+    for plane, other_plane in zip(planes, other_planes):
+        assert np.array_equal(plane, other_plane)
+
+
+@pytest.mark.parametrize("saving_engine", list(ENGINES))
+@pytest.mark.parametrize("resuming_engine", list(ENGINES))
+def test_resumed_runs_match_uninterrupted_runs(tmp_path, saving_engine, resuming_engine):
+    path = str(tmp_path / "run.snapshot")
+    uninterrupted = NumpyRumorSpreadingSimulator(**SIMULATOR_PARAMS)
+    uninterrupted.jump_generation(20)
+
+    simulator = ENGINES[saving_engine](**SIMULATOR_PARAMS)
+    simulator.jump_generation(8)
+    simulator.save_snapshot(path)
+    close(simulator)
+    resumed = ENGINES[resuming_engine].load_snapshot(path)
+    resumed.jump_generation(12)
+    close(resumed)
+
+    assert_same_run(resumed, uninterrupted)
+
+
+def test_slow_layout_resumes_in_the_numpy_engine(tmp_path):
+    path = str(tmp_path / "run.snapshot")
+    simulator = RumorSpreadingSimulator(slow_layout=True, **SIMULATOR_PARAMS)
+    simulator.jump_generation(3)
+    simulator.save_snapshot(path)
+    resumed = NumpyRumorSpreadingSimulator.load_snapshot(path)
+
+    simulator.jump_generation(10)
+    resumed.jump_generation(10)
+    assert_same_run(resumed, simulator)
+    assert RumorSpreadingSimulator.load_snapshot(path).slow_layout
+
+
+def test_forks_are_seeded_continuations(tmp_path):
+    path = str(tmp_path / "run.snapshot")
+    simulator = NumpyRumorSpreadingSimulator(**SIMULATOR_PARAMS)
+    simulator.jump_generation(5)
+    simulator.save_snapshot(path)
+
+    forks = [NumpyRumorSpreadingSimulator.load_snapshot(path, seed=seed) for seed in (1, 1, 2)]
+    for fork in forks:
+        fork.jump_generation(10)
+        assert fork.rumors_spread_count[:6] == simulator.rumors_spread_count
+
+    assert_same_run(forks[0], forks[1])
+    assert forks[0].rumors_spread_count != forks[2].rumors_spread_count
+
+
+def test_grid_and_graph_snapshots_do_not_mix(tmp_path):
+    grid_path, graph_path = str(tmp_path / "grid.snapshot"), str(tmp_path / "graph.snapshot")
+    NumpyRumorSpreadingSimulator(**SIMULATOR_PARAMS).save_snapshot(grid_path)
+    GraphRumorSpreadingSimulator(topology="torus", **SIMULATOR_PARAMS).save_snapshot(graph_path)
+
+    with pytest.raises(ValueError, match="grid world"):
+        GraphRumorSpreadingSimulator.load_snapshot(grid_path)
+    with pytest.raises(ValueError, match="graph world"):
+        NumpyRumorSpreadingSimulator.load_snapshot(graph_path)
+
+
+def test_order_is_saved_as_compact_ranks(tmp_path):
+    path = str(tmp_path / "run.snapshot")
+    simulator = NumpyRumorSpreadingSimulator(**SIMULATOR_PARAMS)
+    simulator.save_snapshot(path)
+    order, saved_order = simulator.world_board.order, snapshot.load_snapshot(path).order
+
+    assert saved_order.dtype == np.int16
+    assert np.array_equal(saved_order < 0, order < 0)
+    assert np.array_equal(np.argsort(saved_order[order >= 0]), np.argsort(order[order >= 0]))
+    assert sorted(saved_order[order >= 0]) == list(range(simulator.world_board.population_size))
+
+
+def test_packed_engines_do_not_save_snapshots(tmp_path):
+    path = str(tmp_path / "run.snapshot")
+    with pytest.raises(NotImplementedError, match="does not save snapshots"):
+        PackedRumorSpreadingSimulator(**SIMULATOR_PARAMS).save_snapshot(path)
+    with MappedRumorSpreadingSimulator(directory=str(tmp_path), **SIMULATOR_PARAMS) as mapped:
+        with pytest.raises(NotImplementedError, match="does not save snapshots"):
+            mapped.save_snapshot(path)
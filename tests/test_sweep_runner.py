@@ -0,0 +1,47 @@
+import os
+
+from rumor_spreading_simulator.sweep.result_cache import ResultCache
+from rumor_spreading_simulator.sweep.sweep_runner import result_key, run_sweep, sweep_grid
+
+POINTS = sweep_grid([12], [0.8], [2], [(0.25, 0.25, 0.25, 0.25), (0.0, 0.0, 0.1, 0.9)])
+SEEDS = [1, 2]
+
+
+def cached_files(root):
+    return [file_name for _, _, files in os.walk(root) for file_name in files]
+
+
+def test_cached_results_match_simulated_ones(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    simulated = run_sweep(POINTS, SEEDS, 30, "numpy", cache)
+    cached = run_sweep(POINTS, SEEDS, 30, "numpy", ResultCache(str(tmp_path)))
+
+    assert not any(result.cached for result in simulated)
+    assert all(result.cached for result in cached)
+    assert [result[:4] for result in cached] == [result[:4] for result in simulated]
+    assert any(result.extinction_generation is not None for result in simulated)
+
+
+def test_a_result_is_a_single_cache_entry(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    results = run_sweep(POINTS, SEEDS, 30, "numpy", cache)
+
+    assert len(cache) == len(results)
+    assert len(cached_files(tmp_path)) == len(results)
+
+    point, seed = POINTS[0], SEEDS[0]
+    cached = cache.get(result_key(cache, "numpy", point, seed, 30))
+    assert set(cached) == {"rumors_spread_count", "extinction_generation"}
+
+
+def test_evicted_results_are_simulated_again(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    run_sweep(POINTS, SEEDS, 30, "numpy", cache)
+    entry_bytes = cache.size_bytes // len(cache)
+
+    small_cache = ResultCache(str(tmp_path), max_bytes=entry_bytes * 2)
+    results = run_sweep(POINTS, SEEDS, 30, "numpy", small_cache)
+
+    assert sum(result.cached for result in results) >= 1
+    assert not all(result.cached for result in results)
+    assert len(cached_files(tmp_path)) == len(small_cache) <= 2
@@ -0,0 +1,61 @@
+import multiprocessing
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine import tiled_simulator
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.tiled_simulator import TiledRumorSpreadingSimulator
+
+PARAMS = dict(world_size=60, population_density=0.8, rumor_cool_down=3, seed=6)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 5])
+def test_runs_match_the_numpy_engine(workers):
+    numpy = NumpyRumorSpreadingSimulator(**PARAMS)
+    numpy.jump_generation(40)
+    with TiledRumorSpreadingSimulator(workers=workers, **PARAMS) as tiled:
+        tiled.next_generation()
+        tiled.jump_generation(39)
+        assert tiled.rumors_spread_count == numpy.rumors_spread_count
+        assert tiled.extinction_generation == numpy.extinction_generation
+        assert np.array_equal(tiled.arrival_times, numpy.arrival_times)
+        for tiled_plane, numpy_plane in zip(tiled.world_board.planes, numpy.world_board.planes):
+            assert np.array_equal(tiled_plane, numpy_plane)
+
+
+def test_board_is_generated_straight_into_shared_memory():
+    # Only the private order plane and a few band temporaries, no full board to copy into shared memory
+    tracemalloc.start()
+    try:
+        with TiledRumorSpreadingSimulator(world_size=2048, population_density=0.8, workers=1, seed=1) as tiled:
+            peak = tracemalloc.get_traced_memory()[1]
+            assert peak < 3 * tiled.world_board.order.nbytes
+    finally:
+        tracemalloc.stop()
+
+
+def test_dead_worker_raises():
+    simulator = TiledRumorSpreadingSimulator(workers=3, **PARAMS)
+    simulator.jump_generation(2)
+    simulator._processes[1].kill()
+    simulator._processes[1].join()
+
+    with pytest.raises(RuntimeError, match="worker 1"):
+        simulator.jump_generation(10)
+    assert not any(process.is_alive() for process in simulator._processes)
+    simulator.close()
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="the failure is injected before forking")
+def test_failing_worker_raises(monkeypatch):
+    def advance(*args):
+        raise ZeroDivisionError("injected")
+
+    monkeypatch.setattr(tiled_simulator.numpy_kernel, "advance", advance)
+    simulator = TiledRumorSpreadingSimulator(workers=3, **PARAMS)
+
+    with pytest.raises(RuntimeError, match="ZeroDivisionError: injected"):
+        simulator.jump_generation(10)
+    assert not any(process.is_alive() for process in simulator._processes)
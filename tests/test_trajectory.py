@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine.engines import simulator_planes
+from rumor_spreading_simulator.engine.numpy_simulator import NumpyRumorSpreadingSimulator
+from rumor_spreading_simulator.engine.simulator import RumorSpreadingSimulator
+from rumor_spreading_simulator.engine.trajectory import (
+    TrajectoryReader, TrajectoryRecorder, decode_cells, encode_cells
+)
+
+SIMULATOR_PARAMS = dict(world_size=20, population_density=0.7, rumor_cool_down=3, seed=2)
+
+
+def assert_same_frame(frame, other):
+    assert frame.generation == other.generation
+    for field, other_field in zip(frame[1:], other[1:]):
+        assert np.array_equal(field, other_field)
+
+
+@pytest.mark.parametrize("engine", [RumorSpreadingSimulator, NumpyRumorSpreadingSimulator])
+def test_recorded_boards_match_the_run(tmp_path, engine):
+    path = str(tmp_path / "run.trajectory")
+    simulator = engine(**SIMULATOR_PARAMS)
+    expected_frames = []
+    with TrajectoryRecorder(path, keyframe_interval=4) as recorder:
+        simulator.attach_recorder(recorder)
+        for generation in range(15):
+            expected_frames.append(decode_cells(generation, encode_cells(simulator_planes(simulator)), 20))
+            simulator.next_generation()
+        simulator.jump_generation(3)
+
+    reader = TrajectoryReader(path)
+    assert reader.generations == list(range(19))
+    assert reader.size == 20
+    for frame, expected_frame in zip(reader, expected_frames):
+        assert_same_frame(frame, expected_frame)
+    assert_same_frame(reader.board(18), decode_cells(18, encode_cells(simulator_planes(simulator)), 20))
+    with pytest.raises(KeyError):
+        reader.board(19)
+
+
+def test_codes_round_trip_the_planes():
+    simulator = NumpyRumorSpreadingSimulator(**SIMULATOR_PARAMS)
+    simulator.jump_generation(6)
+    planes = simulator.world_board.planes
+    frame = decode_cells(6, encode_cells(planes), 20)
+
+    assert np.array_equal(frame.occupied, planes.skepticism >= 0)
+    assert np.array_equal(frame.curr_skepticism, planes.curr_skepticism)
+    for name in ("has_rumor", "ever_has_rumor", "rumor_count", "cool_down"):
+        assert np.array_equal(getattr(frame, name), getattr(planes, name))
@@ -0,0 +1,71 @@
+import numpy as np
+
+from rumor_spreading_simulator.interactive.simulator_stats import create_aggregator, simulate_trials
+from rumor_spreading_simulator.interactive.trial_statistics import TrialAggregator, TrialStatistics
+
+SIMULATOR_PARAMS = dict(world_size=20, population_density=0.8, rumor_cool_down=3)
+
+
+def test_statistics_match_numpy():
+    trials = np.random.default_rng(1).integers(0, 400, size=(30, 12))
+    trial_statistics = TrialStatistics()
+    for trial in trials:
+        trial_statistics.add(trial.tolist())
+
+    assert trial_statistics.count == len(trials)
+    np.testing.assert_allclose(trial_statistics.mean, trials.mean(axis=0))
+    np.testing.assert_allclose(trial_statistics.variance, trials.var(axis=0, ddof=1))
+
+
+def test_statistics_do_not_depend_on_trials_order():
+    trials = np.random.default_rng(2).integers(0, 10 ** 6, size=(50, 8))
+    forward, backward = TrialStatistics(), TrialStatistics()
+    for trial in trials:
+        forward.add(trial)
+    for trial in trials[::-1]:
+        backward.add(trial)
+
+    assert np.array_equal(forward.mean, backward.mean)
+    assert np.array_equal(forward.variance, backward.variance)
+
+
+def test_single_trial_variance():
+    trial_statistics = TrialStatistics()
+    trial_statistics.add([1, 2, 3])
+
+    assert np.array_equal(trial_statistics.variance, np.zeros(3))
+    assert not trial_statistics.converged(1.0, min_count=1)
+
+
+def test_aggregator_pads_short_trials():
+    trial_aggregator = TrialAggregator(5, 100)
+    trial_aggregator.add([1, 2])
+    trial_aggregator.add([3, 4, 5, 6, 7])
+
+    assert np.array_equal(trial_aggregator.mean, [2, 3, 2.5, 3, 3.5])
+    assert trial_aggregator.exposure_times.tolist() == [4, 6, 5, 6, 7]
+    assert trial_aggregator.coverages.sum() == 2
+
+
+def test_coverage_is_relative_to_the_trial_population():
+    trial_aggregator = TrialAggregator(3, 100, coverage_bins=10)
+    trial_aggregator.add([1, 2, 2])
+    trial_aggregator.add([1, 2, 2], population_size=5)
+
+    assert trial_aggregator.coverages[0] == 1
+    assert trial_aggregator.coverages[-1] == 1
+
+
+def test_aggregated_results_do_not_depend_on_workers():
+    aggregators = []
+    for workers in (1, 3):
+        trial_aggregator = create_aggregator(SIMULATOR_PARAMS, 10)
+        for trial in simulate_trials("numpy", SIMULATOR_PARAMS, 9, 10, workers, seed=5):
+            trial_aggregator.add(trial.rumors_spread_count, trial.population_size)
+        aggregators.append(trial_aggregator)
+
+    single, pooled = aggregators
+    assert np.array_equal(single.mean, pooled.mean)
+    assert np.array_equal(single.variance, pooled.variance)
+    assert np.array_equal(single.quantiles(), pooled.quantiles())
+    assert np.array_equal(single.coverages, pooled.coverages)
@@ -0,0 +1,49 @@
+import pytest
+
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.random_stream import CounterRandom
+from rumor_spreading_simulator.engine.world_board_2D import PersonWorldID, WorldBoard2D
+
+UNIFORM_DIST = {skepticism_level: 0.25 for skepticism_level in SkepticismLevel}
+
+
+@pytest.mark.parametrize("generate_board", [WorldBoard2D.generate_board, WorldBoard2D.generate_slow_board])
+def test_friends_index_holds_the_occupied_neighbours(generate_board):
+    size = 15
+    world_board = generate_board(size, 0.6, UNIFORM_DIST, CounterRandom(3))
+
+    for person_id in world_board.world_iterator():
+        neighbours = [
+            PersonWorldID(person_id.row + row_step, person_id.col + col_step)
+            for row_step in (-1, 0, 1) for col_step in (-1, 0, 1) if row_step or col_step
+        ]
+        expected = {neighbour for neighbour in neighbours if world_board.person_by_id(neighbour) is not None}
+        friends = world_board.get_person_friends(person_id)
+
+        assert len(friends) == len(expected)
+        assert set(friends) == expected
+
+
+def test_person_ids_and_indices_agree():
+    world_board = WorldBoard2D.generate_board(12, 0.5, UNIFORM_DIST, CounterRandom(4))
+
+    for index, person_id in enumerate(world_board.world_iterator()):
+        assert world_board.index_by_id(person_id) == index
+    assert world_board.index_by_id(PersonWorldID(-1, 0)) is None
+    assert world_board.person_by_id(PersonWorldID(12, 0)) is None
+
+
+def test_double_buffered_generation():
+    world_board = WorldBoard2D.generate_board(10, 0.8, UNIFORM_DIST, CounterRandom(5))
+    persons, next_persons = world_board.persons, world_board.next_persons
+    persons[0].notify_rumor()
+    persons[1].notify_rumor()
+
+    world_board.prepare_next_board([0])
+    assert next_persons[0].has_rumor and not next_persons[1].has_rumor
+    world_board.prepare_next_board()
+    assert next_persons[1].has_rumor
+    assert not set(map(id, persons)) & set(map(id, next_persons))
+
+    world_board.swap_boards()
+    assert world_board.persons is next_persons and world_board.next_persons is persons
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from rumor_spreading_simulator.engine import world_generation
+from rumor_spreading_simulator.engine.numpy_kernel import EMPTY_CELL
+from rumor_spreading_simulator.engine.person import SkepticismLevel
+from rumor_spreading_simulator.engine.random_stream import CounterRandom
+
+UNIFORM_DIST = {skepticism_level: 0.25 for skepticism_level in SkepticismLevel}
+
+
+@pytest.mark.parametrize("size", [1, 9, 64, 1100])
+def test_place_persons_counts(size):
+    cells, levels, keys = world_generation.place_persons(size, 0.7, UNIFORM_DIST, CounterRandom(size))
+    persons = int(0.7 * size ** 2)
+
+    assert len(cells) == len(levels) == len(keys) == 4 * int(0.25 * persons)
+    assert np.all(np.diff(cells) > 0)
+    assert np.all((0 <= cells) & (cells < size ** 2))
+    assert np.bincount(levels, minlength=4).tolist() == [int(0.25 * persons)] * 4
+    assert len(np.unique(keys)) == len(keys)
+
+
+def test_place_persons_is_uniform():
+    size, trials = 6, 4000
+    occupancy = np.zeros(size ** 2)
+    level_counts = np.zeros((size ** 2, 4))
+    for seed in range(trials):
+        cells, levels, _ = world_generation.place_persons(size, 0.5, UNIFORM_DIST, CounterRandom(seed))
+        occupancy[cells] += 1
+        level_counts[cells, levels] += 1
+
+    # 16 persons out of 36 cells, 4 of every level
+    np.testing.assert_allclose(occupancy / trials, 16 / 36, atol=0.04)
+    np.testing.assert_allclose(level_counts / occupancy[:, None], 0.25, atol=0.05)
+
+
+def test_layout_planes_of_bands_match_the_world():
+    size = 1100
+    random_stream = CounterRandom(3)
+    bands = list(world_generation.place_band_persons(size, 0.8, UNIFORM_DIST, random_stream))
+    assert len(bands) > 1
+
+    random_stream = CounterRandom(3)
+    skepticism, order = world_generation.layout_planes(
+        size, *world_generation.place_persons(size, 0.8, UNIFORM_DIST, random_stream)
+    )
+    for (start, end), cells, levels, keys in bands:
+        band_skepticism, band_order = world_generation.layout_planes(size, cells, levels, keys, start, end)
+        assert np.array_equal(band_skepticism, skepticism[start:end])
+        assert np.array_equal(band_order, order[start:end])
+
+    assert np.array_equal(skepticism == EMPTY_CELL, order < 0)
+
+
+def test_place_slow_persons_prefer_row_levels():
+    size = 40
+    cells, levels, keys = world_generation.place_slow_persons(size, 0.8, UNIFORM_DIST, CounterRandom(1))
+
+    assert np.bincount(levels, minlength=4).tolist() == [int(0.25 * int(0.8 * size ** 2))] * 4
+    assert np.array_equal(keys, np.arange(len(cells)))
+    preferred = (cells // size) % 4 == levels
+    assert preferred[:len(cells) // 2].all()
+
+
+def test_target_size_layout():
+    size = 4000
+    skepticism, order = world_generation.layout_planes(
+        size, *world_generation.place_persons(size, 0.8, UNIFORM_DIST, CounterRandom(1))
+    )
+    persons = 4 * int(0.25 * int(0.8 * size ** 2))
+
+    assert skepticism.shape == order.shape == (size, size)
+    assert np.array_equal(skepticism == EMPTY_CELL, order < 0)
+    assert np.bincount(skepticism[skepticism != EMPTY_CELL], minlength=4).tolist() == [persons // 4] * 4